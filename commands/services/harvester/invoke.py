@@ -135,8 +135,10 @@ def extend_resource_cache(ctx, mode):
     "dataset": "Name of the dataset (a Greek letter) that you want to create indices for",
     "version": "Version of the harvester that created the dataset version you want to index. "
                "Defaults to latest version",
+    "streaming": "Reads documents with a database cursor and pushes all languages simultaneously "
+                 "to keep memory usage constant",
 })
-def index_dataset_version(ctx, mode, dataset, version=None, skip_evaluation=False):
+def index_dataset_version(ctx, mode, dataset, version=None, skip_evaluation=False, streaming=False):
     """
     Starts a task on the AWS container cluster or localhost to create the ES indices for a DatasetVersion
     """
@@ -145,6 +147,8 @@ def index_dataset_version(ctx, mode, dataset, version=None, skip_evaluation=Fals
         command += [f"--harvester-version={version}"]
     if skip_evaluation:
         command += ["--skip-evaluation"]
+    if streaming:
+        command += ["--streaming"]
     run_harvester_task(ctx, mode, command)
 
 
@@ -3,10 +3,19 @@ import vobject
 from mimetypes import guess_type
 from hashlib import sha1
 from dateutil.parser import parse as date_parser
+from lxml import etree
 
 from django.conf import settings
 from django.utils.text import slugify
 
+from harvester.utils.extraction import cache_per_record
+from harvester.utils.oaipmh import OAIPMH_NAMESPACES, OAIPMH_EXTERNAL_ID, OAIPMH_RECORD_STATE
+
+
+# Anatomy Tool declares LOM elements without a prefix, which puts them in the OAI-PMH namespace
+def xpath(path):
+    return etree.XPath(path, namespaces=OAIPMH_NAMESPACES)
+
 
 class AnatomyToolExtraction(object):
 
@@ -15,6 +24,40 @@ class AnatomyToolExtraction(object):
                               re.IGNORECASE)
     cc_code_regex = re.compile(r"^cc([ \-][a-z]{2})+$", re.IGNORECASE)
 
+    #############################
+    # SELECTORS
+    #############################
+
+    first_string = xpath("(.//oai:string)[1]")
+    title = xpath("(.//oai:title)[1]")
+    language = xpath("(.//oai:language)[1]")
+    general_keywords = xpath("(.//oai:general)[1]//oai:keyword")
+    description = xpath("(.//oai:description)[1]")
+    formats = xpath(".//oai:format")
+    locations = xpath(".//oai:location")
+    aggregation_level_value = xpath("(.//oai:aggregationLevel)[1]//oai:value")
+    lifecycle_entities = xpath("(.//oai:lifecycle)[1]//oai:entity")
+    created_datetime = xpath("(.//text()[. = 'Created'])[1]/ancestor::oai:contribute[1]//oai:datetime")
+    rights = xpath("(.//oai:rights)[1]")
+    classification_blocks = {
+        "entry": xpath(".//text()[. = $classification_type]/ancestor::oai:classification[1]//oai:entry"),
+        "id": xpath(".//text()[. = $classification_type]/ancestor::oai:classification[1]//oai:id"),
+    }
+
+    @staticmethod
+    def get_text(node):
+        return "".join(node.itertext())
+
+    @staticmethod
+    def find(selector, el, **variables):
+        nodes = selector(el, **variables)
+        return nodes[0] if nodes else None
+
+    @classmethod
+    def get_string(cls, node):
+        translation = cls.find(cls.first_string, node)
+        return cls.get_text(translation) if translation is not None else None
+
     #############################
     # OAI-PMH
     #############################
@@ -40,45 +83,34 @@ class AnatomyToolExtraction(object):
             license = "cc-" + license
         return slugify(f"{license}-{url_match.group('version')}")
 
-    @staticmethod
-    def parse_vcard_element(el):
-        card = "\n".join(field.strip() for field in el.text.strip().split("\n"))
+    @classmethod
+    def parse_vcard_element(cls, el):
+        card = "\n".join(field.strip() for field in cls.get_text(el).strip().split("\n"))
         card = card.replace("BEGIN:VCARD - VERSION:3.0 -", "BEGIN:VCARD\nVERSION:3.0")
         return vobject.readOne(card)
 
-    @classmethod
-    def get_oaipmh_records(cls, soup):
-        return soup.find_all('record')
-
     @classmethod
     def get_oaipmh_external_id(cls, soup, el):
-        return el.find('identifier').text.strip()
+        return OAIPMH_EXTERNAL_ID(el)
 
     @classmethod
     def get_oaipmh_record_state(cls, soup, el):
-        header = el.find('header')
-        return header.get("status", "active")
+        return OAIPMH_RECORD_STATE(el)
 
     #############################
     # GENERIC
     #############################
 
-    @staticmethod
-    def find_all_classification_blocks(element, classification_type, output_type):
+    @classmethod
+    def find_all_classification_blocks(cls, element, classification_type, output_type):
         assert output_type in ["entry", "id"]
-        entries = element.find_all(string=classification_type)
-        blocks = []
-        for entry in entries:
-            classification_element = entry.find_parent('classification')
-            if not classification_element:
-                continue
-            blocks += classification_element.find_all(output_type)
-        return blocks
+        return cls.classification_blocks[output_type](element, classification_type=classification_type)
 
     @classmethod
+    @cache_per_record
     def get_files(cls, soup, el):
-        mime_types = el.find_all('format')
-        urls = el.find_all('location')
+        mime_types = cls.formats(el)
+        urls = cls.locations(el)
         default_copyright = cls.get_copyright(soup, el)
         return [
             {
@@ -90,8 +122,8 @@ class AnatomyToolExtraction(object):
                 "access_rights": "OpenAccess" if default_copyright != "yes" else "RestrictedAccess"
             }
             for mime_type, url, title in zip(
-                [mime_node.text.strip() for mime_node in mime_types],
-                [url_node.text.strip() for url_node in urls],
+                [cls.get_text(mime_node).strip() for mime_node in mime_types],
+                [cls.get_text(url_node).strip() for url_node in urls],
                 [f"URL {ix+1}" for ix, mime_node in enumerate(mime_types)],
             )
         ]
@@ -117,41 +149,34 @@ class AnatomyToolExtraction(object):
 
     @classmethod
     def get_title(cls, soup, el):
-        node = el.find('title')
+        node = cls.find(cls.title, el)
         if node is None:
             return
-        translation = node.find('string')
-        return translation.text.strip() if translation else None
+        translation = cls.get_string(node)
+        return translation.strip() if translation is not None else None
 
     @classmethod
     def get_language(cls, soup, el):
-        node = el.find('language')
-        return node.text.strip() if node else None
+        node = cls.find(cls.language, el)
+        return cls.get_text(node).strip() if node is not None else None
 
     @classmethod
     def get_keywords(cls, soup, el):
-        general = el.find('general')
-        if not general:
-            return []
-        nodes = general.find_all('keyword')
-        return [
-            node.find('string').text.strip()
-            for node in nodes if node.find('string').text
-        ]
+        keywords = [cls.get_string(node) for node in cls.general_keywords(el)]
+        return [keyword.strip() for keyword in keywords if keyword]
 
     @classmethod
     def get_description(cls, soup, el):
-        node = el.find('description')
+        node = cls.find(cls.description, el)
         if node is None:
             return
-        translation = node.find('string')
-        return translation.text if translation else None
+        return cls.get_string(node)
 
     @classmethod
     def get_mime_type(cls, soup, el):
-        node = el.find('format')
-        if node:
-            return node.text.strip()
+        node = cls.find(cls.formats, el)
+        if node is not None:
+            return cls.get_text(node).strip()
         url = cls.get_url(soup, el)
         if not url:
             return
@@ -171,20 +196,13 @@ class AnatomyToolExtraction(object):
 
     @classmethod
     def get_aggregation_level(cls, soup, el):
-        node = el.find('aggregationlevel', None)
-        if node is None:
-            return None
-        return node.find('value').text.strip() if node else None
+        node = cls.find(cls.aggregation_level_value, el)
+        return cls.get_text(node).strip() if node is not None else None
 
     @classmethod
     def get_authors(cls, soup, el):
-        lifecycle = el.find('lifecycle')
-        if not lifecycle:
-            return []
-        nodes = lifecycle.find_all('entity')
-
         authors = []
-        for node in nodes:
+        for node in cls.lifecycle_entities(el):
             author = cls.parse_vcard_element(node)
             if hasattr(author, "fn"):
                 authors.append({
@@ -226,16 +244,10 @@ class AnatomyToolExtraction(object):
 
     @classmethod
     def get_publisher_date(cls, soup, el):
-        publisher = el.find(string='Created')
-        if not publisher:
+        datetime = cls.find(cls.created_datetime, el)
+        if datetime is None:
             return
-        contribution = publisher.find_parent('contribute')
-        if not contribution:
-            return
-        datetime = contribution.find('datetime')
-        if not datetime:
-            return
-        return datetime.text.strip()
+        return cls.get_text(datetime).strip()
 
     @classmethod
     def get_publisher_year(cls, soup, el):
@@ -256,7 +268,7 @@ class AnatomyToolExtraction(object):
     @classmethod
     def get_studies(cls, soup, el):
         blocks = cls.find_all_classification_blocks(el, "discipline", "id")
-        return list(set([block.text.strip() for block in blocks]))
+        return list(set([cls.get_text(block).strip() for block in blocks]))
 
     @classmethod
     def get_ideas(cls, soup, el):
@@ -289,11 +301,12 @@ class AnatomyToolExtraction(object):
 
     @classmethod
     def get_copyright_description(cls, soup, el):
-        node = el.find('rights')
-        if not node:
+        node = cls.find(cls.rights, el)
+        if node is None:
             return
-        description = node.find('description')
-        return description.find('string').text.strip() if description else None
+        description = cls.find(cls.description, node)
+        translation = cls.get_string(description) if description is not None else None
+        return translation.strip() if translation is not None else None
 
     @classmethod
     def get_learning_material_disciplines(cls, soup, el):
@@ -4,10 +4,11 @@ from django.db import models
 from urlobject import URLObject
 
 from datagrowth.configuration import create_config
-from datagrowth.processors import ExtractProcessor
 
 from core.models import HarvestHttpResource
-from anatomy_tool.extraction import AnatomyToolExtraction, ANATOMY_TOOL_EXTRACTION_OBJECTIVE
+from harvester.utils.oaipmh import (OAIPMHExtractProcessor, OAIPMH_RECORD_TAG, OAIPMH_EXTERNAL_ID, OAIPMH_RECORD_STATE,
+                                    get_oaipmh_resumption_token)
+from anatomy_tool.extraction import ANATOMY_TOOL_EXTRACTION_OBJECTIVE
 
 
 logger = logging.getLogger("harvester")
@@ -23,18 +24,17 @@ class AnatomyToolOAIPMHManager(models.Manager):
         )
 
         oaipmh_objective = {
-            "@": AnatomyToolExtraction.get_oaipmh_records,
-            "external_id": AnatomyToolExtraction.get_oaipmh_external_id,
-            "state": AnatomyToolExtraction.get_oaipmh_record_state
+            "@": OAIPMH_RECORD_TAG,
+            "external_id": OAIPMH_EXTERNAL_ID,
+            "state": OAIPMH_RECORD_STATE
         }
         oaipmh_objective.update(ANATOMY_TOOL_EXTRACTION_OBJECTIVE)
         extract_config = create_config("extract_processor", {
             "objective": oaipmh_objective
         })
-        prc = ExtractProcessor(config=extract_config)
+        prc = OAIPMHExtractProcessor(config=extract_config)
 
-        results = []
-        for harvest in queryset:
+        for harvest in queryset.iterator(chunk_size=1):  # resources are large, so we load them one by one
             seed_resource = {
                 "resource": f"{harvest._meta.app_label}.{harvest._meta.model_name}",
                 "id": harvest.id,
@@ -43,10 +43,9 @@ class AnatomyToolOAIPMHManager(models.Manager):
             try:
                 for seed in prc.extract_from_resource(harvest):
                     seed["seed_resource"] = seed_resource
-                    results.append(seed)
+                    yield seed
             except ValueError as exc:
                 logger.warning("Invalid XML:", exc, harvest.uri)
-        return results
 
 
 class AnatomyToolOAIPMH(HarvestHttpResource):
@@ -67,13 +66,12 @@ class AnatomyToolOAIPMH(HarvestHttpResource):
         return super().send(method, *args, **kwargs)
 
     def next_parameters(self):
-        content_type, soup = self.content
-        resumption_token = soup.find("resumptiontoken")
-        if not resumption_token or not resumption_token.text:
+        resumption_token = get_oaipmh_resumption_token(self.body)
+        if not resumption_token:
             return {}
         return {
             "verb": "ListRecords",
-            "resumptionToken": resumption_token.text
+            "resumptionToken": resumption_token
         }
 
     def create_next_request(self):
@@ -25,7 +25,7 @@ class DatasetVersionAdmin(AdminConfirmMixin, admin.ModelAdmin):
     readonly_fields = ("is_current",)
 
     def harvest_count(self, obj):
-        return obj.document_set.filter(properties__state="active", dataset_version=obj).count()
+        return obj.document_set.filter_properties(state="active").count()
 
     def index_count(self, obj):
         es_client = get_opensearch_client()
@@ -99,10 +99,10 @@ class CollectionAdmin(DataStorageAdmin):
     ordering = ('-created_at',)
 
     def active_document_count(self, obj):
-        return obj.document_set.filter(properties__state="active").count()
+        return obj.document_set.filter_properties(state="active").count()
 
     def deleted_document_count(self, obj):
-        return obj.document_set.filter(properties__state="deleted").count()
+        return obj.document_set.filter_properties(state="deleted").count()
 
     def inactive_document_count(self, obj):
-        return obj.document_set.filter(properties__state="inactive").count()
+        return obj.document_set.filter_properties(state="inactive").count()
@@ -69,6 +69,13 @@ class HarvestLogger(object):
         })
         harvester.info(f"Ending: {phase}", extra=extra)
 
+    def report_changes(self, phase, changed, unchanged):
+        extra = self._get_extra_info(phase=phase, result={
+            "changed": changed,
+            "unchanged": unchanged
+        })
+        harvester.info(f"Changes: {phase} => {changed} changed, {unchanged} unchanged", extra=extra)
+
     def report_material(self, external_id, title=None, url=None, pipeline=None, state="upsert", copyright=None,
                         lowest_educational_level=None):
         material_info = {
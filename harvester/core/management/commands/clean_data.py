@@ -5,7 +5,7 @@ from django.apps import apps
 from django.utils.timezone import make_aware
 from django.core.management.base import BaseCommand
 
-from core.models import Dataset, DatasetVersion, Document, ElasticIndex, Extension
+from core.models import Dataset, DatasetVersion, Document, DocumentRevision, ElasticIndex, Extension
 
 
 class Command(BaseCommand):
@@ -27,6 +27,13 @@ class Command(BaseCommand):
             stale_dataset_versions = DatasetVersion.objects.get_stale_versions(purge_time, dataset)
             for stale_dataset_version in stale_dataset_versions:
                 stale_dataset_version.delete()
+            # Retained versions that are no longer in use share unchanged Documents with other versions
+            latest_version = dataset.versions.order_by("created_at").last()
+            if latest_version:
+                for retained_version in dataset.versions.filter(is_current=False).exclude(id=latest_version.id):
+                    retained_version.compact_documents()
+        # Delete revisions that are no longer shared by any Document
+        DocumentRevision.objects.delete_unused()
         # Delete old is_addition Extensions that got deleted
         Extension.objects.filter(deleted_at__lte=purge_time).delete()
         # Now go over all resources and delete old ones without matching documents
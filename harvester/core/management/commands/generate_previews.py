@@ -19,6 +19,7 @@ class Command(PipelineCommand):
         dataset_name = options["dataset"]
         dataset_version = DatasetVersion.objects.get_latest_version(dataset_name=dataset_name)
         asynchronous = options["async"]
+        collections = dataset_version.collection_set.all()
         results = []
 
         youtube_documents = Document.objects.filter(
@@ -52,8 +53,8 @@ class Command(PipelineCommand):
                 }
             }
         })
-        results.append(youtube_dl_processor(youtube_documents))
-        results.append(youtube_dl_processor(vimeo_documents))
+        results.append(youtube_dl_processor(youtube_documents, collections=collections))
+        results.append(youtube_dl_processor(vimeo_documents, collections=collections))
 
         pdf_documents = Document.objects.filter(
             dataset_version=dataset_version,
@@ -82,7 +83,7 @@ class Command(PipelineCommand):
                 }
             }
         })
-        results.append(pdf_processor(pdf_documents))
+        results.append(pdf_processor(pdf_documents, collections=collections))
 
         self.logger.start("previews")
         if asynchronous and len(results):
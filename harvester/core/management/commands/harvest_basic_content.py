@@ -58,7 +58,7 @@ class Command(PipelineCommand):
                     }
                 }
             })
-            results.append(tika_processor(collection.documents.exclude(properties__url=None)))
+            results.append(tika_processor(collection.documents.exclude(properties__url=None), collections=[collection]))
 
             extruct_processor = HttpPipelineProcessor({
                 "pipeline_app_label": "core",
@@ -81,7 +81,9 @@ class Command(PipelineCommand):
                     }
                 }
             })
-            results.append(extruct_processor(collection.documents.filter(properties__from_youtube=True)))
+            results.append(
+                extruct_processor(collection.documents.filter(properties__from_youtube=True), collections=[collection])
+            )
 
         if asynchronous and len(results):
             while not all([result.ready() for result in results if result]):
@@ -1,4 +1,5 @@
-from collections import Counter, defaultdict
+from collections import Counter
+from threading import Lock
 
 from django.core.management import CommandError
 from django.utils.timezone import now
@@ -8,9 +9,13 @@ from core.constants import HarvestStages, get_repository_id
 from core.management.base import PipelineCommand
 from core.models import (Collection, DatasetVersion, Document, Extension,
                          Harvest)
+from core.utils.harvest import get_harvest_politeness, harvest_in_parallel, send_concurrently
 from datagrowth.configuration import create_config
-from datagrowth.resources.http.tasks import send
-from harvester.utils.extraction import get_harvest_seeds
+from harvester.utils.extraction import iterate_harvest_seeds
+
+
+# Repositories get harvested at the same time by different threads and may share collections
+collection_lock = Lock()
 
 
 class Command(PipelineCommand):
@@ -21,17 +26,18 @@ class Command(PipelineCommand):
         super().add_arguments(parser)
         parser.add_argument('-r', '--repository', action="store")
 
-    def harvest_seeds(self, harvest, current_time):
+    def harvest_seeds(self, harvest, current_time, politeness):
         send_config = create_config("http_resource", {
             "resource": harvest.source.repository,
             "continuation_limit": 10000,
+            "interval_duration": politeness["interval_duration"],
         })
 
         set_specification = harvest.source.spec
-        scc, err = send(
+        scc, err = send_concurrently(
             set_specification,
             f"{harvest.latest_update_at:%Y-%m-%dT%H:%M:%SZ}",
-            config=send_config, method="get"
+            config=send_config, method="get", max_workers=politeness["concurrent_requests"]
         )
 
         if len(err):
@@ -42,47 +48,59 @@ class Command(PipelineCommand):
         harvest.harvested_at = current_time
         harvest.save()
 
-        return len(scc), len(err)
+        return harvest.source.spec, len(scc), len(err)
 
-    def preprocess_seeds(self, harvest_queryset):
-        self.logger.start("preprocess")
-        seeds_by_collection = defaultdict(list)
-        source_count = harvest_queryset.count()
-        for harvest in harvest_queryset:
-            set_specification = harvest.source.spec
-            upserts = []
-            deletes = []
-            for seed in get_harvest_seeds(harvest.source.repository, harvest.source.spec, harvest.latest_update_at,
-                                          include_no_url=True):
-                if seed.get("state", "active") == "active":
-                    upserts.append(seed)
-                else:
-                    deletes.append(seed)
-            seeds_by_collection[(harvest.source.repository, harvest.source.spec)] += (upserts, deletes,)
-            self.logger.progress(f"preprocess.{set_specification}", source_count, success=len(upserts) + len(deletes))
-        self.logger.end("preprocess")
-        return seeds_by_collection
+    def handle_seeds(self, collection, seeds):
+        """
+        Upserts and deletes Documents for an iterator of seeds.
+        Seeds get handled in batches while they are being extracted,
+        so that only the current batches are in memory at any time.
+        When a seed for the same material is waiting in the other batch, it gets replaced by the later seed.
+        """
+        self.logger.start("documents.upsert")
+        self.logger.start("documents.delete")
+        upserts_count = 0
+        deletes_count = 0
+        upserts = {}
+        deletes = {}
+        for seed in seeds:
+            key = seed.get("external_id", None) or id(seed)
+            if seed.get("state", "active") == "active":
+                deletes.pop(key, None)
+                upserts[key] = seed
+            else:
+                upserts.pop(key, None)
+                deletes[key] = seed
+            if len(upserts) >= self.batch_size:
+                upserts_count += len(upserts)
+                self.handle_upsert_seeds(collection, list(upserts.values()))
+                upserts = {}
+            if len(deletes) >= self.batch_size:
+                deletes_count += len(deletes)
+                self.handle_deletion_seeds(collection, list(deletes.values()))
+                deletes = {}
+        if upserts:
+            upserts_count += len(upserts)
+            self.handle_upsert_seeds(collection, list(upserts.values()))
+        if deletes:
+            deletes_count += len(deletes)
+            self.handle_deletion_seeds(collection, list(deletes.values()))
+        self.logger.end("documents.upsert", success=upserts_count, fail=0)
+        self.logger.end("update.delete", success=deletes_count)
+        return upserts_count, deletes_count
 
     def handle_upsert_seeds(self, collection, seeds):
-        self.logger.start("documents.upsert")
         documents_count = 0
+        unchanged_count = 0
         for seeds_batch in self.batchify("documents.upsert", seeds, len(seeds)):
             seeds = list(seeds_batch)
-            existing_documents = {
-                reference: identifier
-                for reference, identifier in Document.objects.filter(
-                    reference__in=[seed["external_id"] for seed in seeds if seed["external_id"]],
-                    collection=collection
-                ).values_list("reference", "id")
-            }
             existing_extensions = {
                 identifier
                 for identifier in Extension.objects.filter(
                     id__in=[seed["external_id"] for seed in seeds if seed["external_id"]]
                 ).values_list("id", flat=True)
             }
-            updates = []
-            inserts = []
+            documents = []
             for seed in seeds:
                 self.logger.report_material(seed["external_id"], title=seed["title"], url=seed["url"])
                 document = Document.objects.build_from_seed(
@@ -92,22 +110,17 @@ class Command(PipelineCommand):
                 )
                 if not document.extension and document.reference in existing_extensions:
                     document.extension_id = document.reference
-                if document.reference in existing_documents:
-                    document.id = existing_documents[document.reference]
-                    document.modified_at = now()
-                    updates.append(document)
-                else:
-                    inserts.append(document)
-            Document.objects.bulk_create(inserts)
-            Document.objects.bulk_update(updates, ["properties", "pipeline", "modified_at", "extension"])
-            documents_count += len(updates)
-            documents_count += len(inserts)
-
-        self.logger.end("documents.upsert", success=documents_count, fail=0)
+                documents.append(document)
+            changed, unchanged = Document.objects.bulk_upsert(
+                documents,
+                ["properties", "pipeline", "modified_at", "extension"]
+            )
+            documents_count += len(changed)
+            unchanged_count += unchanged
+        self.logger.report_changes("documents.upsert", documents_count, unchanged_count)
         return documents_count
 
     def handle_deletion_seeds(self, collection, deletion_seeds):
-        self.logger.start("documents.delete")
         document_delete_total = 0
         for seeds_batch in self.batchify("update.delete.batch", deletion_seeds, len(deletion_seeds)):
             seeds = list(seeds_batch)
@@ -121,7 +134,6 @@ class Command(PipelineCommand):
             ids = [seed["external_id"] for seed in seeds]
             delete_total, delete_details = collection.documents.filter(reference__in=ids).delete()
             document_delete_total += delete_total
-        self.logger.end("update.delete", success=document_delete_total)
         return document_delete_total
 
     def handle(self, *args, **options):
@@ -148,10 +160,14 @@ class Command(PipelineCommand):
         total_success_count = 0
         total_fail_count = 0
         sources_count = harvest_queryset.count()
+        politeness = get_harvest_politeness(repository_resource)
 
-        for harvest in harvest_queryset:
-            success_count, error_count = self.harvest_seeds(harvest, current_time)
-            set_specification = harvest.source.spec
+        results = harvest_in_parallel(
+            lambda harvest: self.harvest_seeds(harvest, current_time, politeness),
+            harvest_queryset.select_related("source"),
+            politeness["concurrent_sets"]
+        )
+        for set_specification, success_count, error_count in results:
             total_success_count += success_count
             total_fail_count += error_count
             self.logger.progress(f"{harvest_phase}.{set_specification}", total=sources_count, success=success_count,
@@ -160,23 +176,23 @@ class Command(PipelineCommand):
         self.logger.end(harvest_phase, total_success_count, total_fail_count)
 
         # Processing the meta data into Documents
-        for info, seeds in self.preprocess_seeds(harvest_queryset).items():
-            # Unpacking
-            repository, spec_name = info
-            upserts, deletes = seeds
+        for harvest in harvest_queryset:
+            repository = harvest.source.repository
+            spec_name = harvest.source.spec
             # Get or create the collection these seeds belong to
-            collection, created = Collection.objects.get_or_create(
-                name=spec_name,
-                dataset_version=dataset_version,
-                defaults={
-                    "referee": "external_id"
-                }
-            )
+            with collection_lock:
+                collection, created = Collection.objects.get_or_create(
+                    name=spec_name,
+                    dataset_version=dataset_version,
+                    defaults={
+                        "referee": "external_id"
+                    }
+                )
             if created:
                 self.logger.debug(f"Created collection '{spec_name}'")
             else:
                 self.logger.debug(f"Adding to existing collection '{spec_name}'")
 
-            self.handle_upsert_seeds(collection, upserts)
-            self.handle_deletion_seeds(collection, deletes)
+            seeds = iterate_harvest_seeds(repository, spec_name, harvest.latest_update_at, include_no_url=True)
+            self.handle_seeds(collection, seeds)
             self.logger.report_collection(collection, repository)
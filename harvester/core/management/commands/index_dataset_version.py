@@ -1,10 +1,15 @@
+from datetime import datetime
+
 from django.urls import reverse
+from django.utils.timezone import make_aware
 from django.contrib.sites.models import Site
 
 from core.models import Dataset, ElasticIndex, EducationalLevels
 from core.management.base import PipelineCommand
 from core.utils.notifications import send_admin_notification
+from core.utils.indexing import push_streaming, push_simultaneously
 from core.constants import SITE_SHORTHAND_BY_DOMAIN
+from metadata.utils.normalization import clear_root_values
 
 
 class Command(PipelineCommand):
@@ -18,6 +23,12 @@ class Command(PipelineCommand):
         parser.add_argument('-se', '--skip-evaluation', action="store_true")
         parser.add_argument('-si', '--site', type=int, default=1)
         parser.add_argument('-el', '--educational-level', type=int, required=False)
+        parser.add_argument('-st', '--streaming', action="store_true")
+        parser.add_argument('-pl', '--parallel-languages', action="store_true")
+        parser.add_argument('-bb', '--bulk-build', action="store_true")
+        parser.add_argument('-bt', '--bulk-threads', type=int, required=False)
+        parser.add_argument('-cs', '--chunk-size', type=int, required=False)
+        parser.add_argument('-cb', '--max-chunk-bytes', type=int, required=False)
 
     def handle(self, *args, **options):
 
@@ -27,6 +38,14 @@ class Command(PipelineCommand):
         skip_evaluation = options["skip_evaluation"] or version
         site = Site.objects.get(id=options["site"])
         educational_level = options.get("educational_level", None)
+        streaming = options["streaming"]
+        parallel_languages = options["parallel_languages"]
+        self.bulk_build = options["bulk_build"]
+        self.bulk_options = {
+            "thread_count": options.get("bulk_threads", None),
+            "chunk_size": options.get("chunk_size", None),
+            "max_chunk_bytes": options.get("max_chunk_bytes", None),
+        }
 
         dataset = Dataset.objects.get(name=dataset_name)
         version_filter = {}
@@ -43,39 +62,111 @@ class Command(PipelineCommand):
             dataset_version.document_set.filter(collection__name=collection.name).update(dataset_version=None)
             dataset_version.copy_collection(collection)
 
+        # Metadata lookups get loaded once per run and may have changed since a previous run in this process
+        clear_root_values()
         self.logger.start(f"index.site.{SITE_SHORTHAND_BY_DOMAIN[site.domain]}")
-        self._create_indices(dataset_version, site, educational_level, should_promote)
+        if streaming:
+            self._stream_indices(dataset_version, site, educational_level, should_promote)
+        elif parallel_languages:
+            self._create_indices_simultaneously(dataset_version, site, educational_level, should_promote)
+        else:
+            self._create_indices(dataset_version, site, educational_level, should_promote)
         self.logger.end(f"index.site.{SITE_SHORTHAND_BY_DOMAIN[site.domain]}")
 
+    def _get_index(self, dataset_version, site, educational_level, language):
+        index, created = ElasticIndex.objects.get_or_create(
+            name=f"{dataset_version.dataset.name}-{dataset_version.version}-{dataset_version.id}",
+            language=language,
+            site=site,
+            educational_level=educational_level if educational_level else EducationalLevels.APPLIED_SCIENCE,
+            defaults={
+                "dataset_version": dataset_version,
+                "configuration": ElasticIndex.get_index_config(language)
+            }
+        )
+        index.configuration = None  # gets recreated by the clean method below
+        index.clean()
+        index.save()
+        return index
+
+    @staticmethod
+    def _get_filters(educational_level):
+        if not educational_level:
+            return {}
+        return {"lowest_educational_level__gte": educational_level}
+
     def _create_indices(self, dataset_version, site, educational_level, should_promote):
-        filters = {}
-        if educational_level:
-            filters = {"properties__lowest_educational_level__gte": educational_level}
+        filters = self._get_filters(educational_level)
+        current_time = make_aware(datetime.now())
         lang_doc_dict = dataset_version.get_search_documents_by_language(**filters)
         for lang in lang_doc_dict.keys():
             self.logger.info(f'{lang}:{len(lang_doc_dict[lang])}')
 
         for lang in ["nl", "en", "unk"]:
             self.logger.start(f"index.{lang}")
-            index, created = ElasticIndex.objects.get_or_create(
-                name=f"{dataset_version.dataset.name}-{dataset_version.version}-{dataset_version.id}",
-                language=lang,
-                site=site,
-                educational_level=educational_level if educational_level else EducationalLevels.APPLIED_SCIENCE,
-                defaults={
-                    "dataset_version": dataset_version,
-                    "configuration": ElasticIndex.get_index_config(lang)
-                }
-            )
-            index.configuration = None  # gets recreated by the clean method below
-            index.clean()
-            index.save()
-            errors = index.push(lang_doc_dict[lang], recreate=True)
+            index = self._get_index(dataset_version, site, educational_level, lang)
+            errors = index.push(lang_doc_dict[lang], recreate=True, bulk_build=self.bulk_build, **self.bulk_options)
             self.logger.open_search_errors(errors)
+            # The index contains the Documents as they were before the push, which matters for truncating changes
+            index.pushed_at = current_time
+            index.save()
             if should_promote:
-                self.logger.info(f"Promoting index { index.remote_name } to latest")
+                self.logger.info(f"Promoting index {index.remote_name} to latest")
                 index.promote_to_latest()
             self.logger.end(f"index.{lang}", fail=index.error_count)
 
         if should_promote:
             dataset_version.set_current()
+
+    def _prepare_indices(self, dataset_version, site, educational_level):
+        indices = {}
+        for lang in ["nl", "en", "unk"]:
+            self.logger.start(f"index.{lang}")
+            index = self._get_index(dataset_version, site, educational_level, lang)
+            index.prepare_push(recreate=True, bulk_build=self.bulk_build)
+            indices[lang] = index
+        return indices
+
+    def _finish_indices(self, dataset_version, indices, errors, pushed_at, should_promote):
+        for lang, index in indices.items():
+            self.logger.open_search_errors(errors[lang])
+            if self.bulk_build:
+                index.finish_bulk_build()
+            index.pushed_at = pushed_at
+            index.save()
+            if should_promote:
+                self.logger.info(f"Promoting index {index.remote_name} to latest")
+                index.promote_to_latest()
+            self.logger.end(f"index.{lang}", fail=index.error_count)
+
+        if should_promote:
+            dataset_version.set_current()
+
+    def _create_indices_simultaneously(self, dataset_version, site, educational_level, should_promote):
+        filters = self._get_filters(educational_level)
+        current_time = make_aware(datetime.now())
+        lang_doc_dict = dataset_version.get_search_documents_by_language(**filters)
+        for lang in lang_doc_dict.keys():
+            self.logger.info(f'{lang}:{len(lang_doc_dict[lang])}')
+
+        indices = self._prepare_indices(dataset_version, site, educational_level)
+        documents = {
+            lang: [doc for doc in lang_doc_dict[lang] if doc.get("_op_type", None) != "delete"]
+            for lang in indices.keys()
+        }
+        errors = push_simultaneously(indices, documents, **self.bulk_options)
+        self._finish_indices(dataset_version, indices, errors, current_time, should_promote)
+
+    def _stream_indices(self, dataset_version, site, educational_level, should_promote):
+        filters = self._get_filters(educational_level)
+        current_time = make_aware(datetime.now())
+        indices = self._prepare_indices(dataset_version, site, educational_level)
+        errors, counts = push_streaming(
+            indices,
+            dataset_version.iterate_search_documents(chunk_size=self.batch_size, **filters),
+            recreate=True,
+            **self.bulk_options
+        )
+        for lang in indices.keys():
+            self.logger.info(f'{lang}:{counts[lang]}')
+        self._finish_indices(dataset_version, indices, errors, current_time, should_promote)
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-18 12:00
+
+import logging
+
+from django.db import migrations, models
+
+
+logger = logging.getLogger("harvester")
+
+
+def delete_duplicate_documents(apps, schema_editor):
+    # Only the latest Document for a reference within a collection gets kept before adding the constraint.
+    # Deletes happen through the ORM to also delete related objects like ProcessResults.
+    Document = apps.get_model("core", "Document")
+    newer_documents = Document.objects.filter(
+        collection_id=models.OuterRef("collection_id"),
+        reference=models.OuterRef("reference"),
+        id__gt=models.OuterRef("id")
+    )
+    duplicate_ids = list(
+        Document.objects
+        .filter(reference__isnull=False)
+        .filter(models.Exists(newer_documents))
+        .values_list("id", flat=True)
+    )
+    deleted_total = 0
+    deleted_counts = {}
+    for start in range(0, len(duplicate_ids), 1000):
+        deleted, counts = Document.objects.filter(id__in=duplicate_ids[start:start + 1000]).delete()
+        deleted_total += deleted
+        for label, count in counts.items():
+            deleted_counts[label] = deleted_counts.get(label, 0) + count
+    if duplicate_ids:
+        logger.warning(
+            f"Deleted {len(duplicate_ids)} duplicate documents and {deleted_total} objects in total: {deleted_counts}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_documentchange'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_documents, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='document',
+            constraint=models.UniqueConstraint(condition=models.Q(('reference__isnull', False)), fields=('collection', 'reference'), name='unique_document_reference_per_collection'),
+        ),
+    ]
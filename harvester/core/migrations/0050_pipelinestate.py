@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_document_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('success', 'Success'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.document')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pipelinestate',
+            index=models.Index(fields=['phase', 'status', 'next_attempt_at'], name='core_pipeli_phase_30bd44_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pipelinestate',
+            constraint=models.UniqueConstraint(fields=('document', 'phase'), name='unique_pipeline_state_phase'),
+        ),
+    ]
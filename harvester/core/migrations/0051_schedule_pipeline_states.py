@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:00
+
+from django.db import migrations
+
+
+# Documents of the latest version of every dataset get a state for every phase in their pipeline,
+# when their metadata phase is complete. Successful phases are complete, other phases become pending.
+# Processors schedule phases that Documents didn't go through yet and later versions copy these states,
+# so Documents that don't change won't get processed again.
+SCHEDULE_PIPELINE_STATES = """
+INSERT INTO core_pipelinestate (document_id, phase, status, attempts, next_attempt_at, modified_at)
+SELECT
+    document.id,
+    phase.key,
+    CASE WHEN phase.value ->> 'success' = 'true' THEN 'success' ELSE 'pending' END,
+    0,
+    NOW(),
+    NOW()
+FROM core_document AS document
+CROSS JOIN LATERAL jsonb_each(document.pipeline) AS phase
+WHERE document.pipeline -> 'metadata' ->> 'success' = 'true'
+AND document.dataset_version_id IN (SELECT MAX(id) FROM core_datasetversion GROUP BY dataset_id)
+ON CONFLICT (document_id, phase) DO NOTHING
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_pipelinestate'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SCHEDULE_PIPELINE_STATES, migrations.RunSQL.noop),
+    ]
@@ -9,13 +9,13 @@ from .resources.matomo import MatomoVisitsResource
 
 from .datatypes.dataset import Dataset, DatasetVersion
 from .datatypes.collection import Collection
-from .datatypes.document import Document
-from .datatypes.pipeline import Batch, ProcessResult
+from .datatypes.document import Document, DocumentRevision
+from .datatypes.pipeline import Batch, ProcessResult, PipelineState
 from .datatypes.extension import Extension
 
 from .harvest import Harvest, HarvestSource
 
-from .search import ElasticIndex, ElasticIndexSerializer, Query
+from .search import ElasticIndex, ElasticIndexSerializer, Query, DocumentChange
 
 from .extraction import ExtractionMapping, ExtractionMethod, MethodExtractionField, JSONExtractionField
 
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.timezone import now
 
 from datagrowth.datatypes import CollectionBase, DocumentCollectionMixin
 
@@ -19,5 +20,45 @@ class Collection(DocumentCollectionMixin, CollectionBase):
         doc.dataset_version = self.dataset_version
         return doc
 
+    def update(self, data, by_property, batch_size=32, collection=None, modified_at=None, validate=True):
+        from core.models.search import DocumentChange
+        data = list(data)
+        changes = DocumentChange.objects.build_from_seeds(data)
+        collection = collection or self
+        if by_property == collection.referee:
+            # Documents are referenced by this property, so they can be upserted by reference in bulk
+            changed, unchanged = self.upsert(data, collection=collection, modified_at=modified_at)
+            changed = set(changed)
+            changes = [change for change in changes if change.reference in changed]
+            count = len(changed)
+        else:
+            count = super().update(data, by_property, batch_size=batch_size, collection=collection,
+                                   modified_at=modified_at, validate=validate)
+        # Changes get recorded after the update to prevent syncing Documents before they are updated
+        DocumentChange.objects.bulk_create(changes)
+        return count
+
+    def upsert(self, data, collection=None, modified_at=None):
+        """
+        Merges data into existing Documents with the same reference or adds it as new Documents.
+        Data that is the same as the data used for the last update of a Document gets skipped.
+        Returns the references of changed Documents and the number of unchanged Documents.
+        """
+        collection = collection or self
+        modified_at = modified_at or now()
+        Document = collection.get_document_model()
+        documents = []
+        for properties in data:
+            document = collection.init_document(properties, collection=collection)
+            document.content_hash = Document.get_content_hash(properties)
+            document.clean()
+            documents.append(document)
+        changed, unchanged = Document.objects.bulk_upsert(documents, ["properties", "identity", "modified_at"],
+                                                          merge_properties=True)
+        if collection.modified_at.replace(microsecond=0) != modified_at.replace(microsecond=0):
+            collection.modified_at = modified_at
+            collection.save()
+        return changed, unchanged
+
     def __str__(self):
         return "{} (id={})".format(self.name, self.id)
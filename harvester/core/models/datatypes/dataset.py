@@ -6,7 +6,6 @@ from django.conf import settings
 from django.db import models, transaction
 
 from datagrowth.datatypes import CollectionBase, DocumentCollectionMixin
-from datagrowth.utils import ibatch
 
 from core.models.datatypes.extension import Extension
 
@@ -140,36 +139,57 @@ class DatasetVersion(models.Model):
         collection.id = None
         collection.dataset_version = self
         collection.save()
-        for batch in ibatch(Document.objects.filter(collection_id=source_id), batch_size=100):
-            for doc in batch:
-                doc.collection_id = collection.id
-                doc.dataset_version = self
-                doc.pk = None
-                doc.id = None
-            Document.objects.bulk_create(batch)
+        Document.objects.copy_documents(source_id, collection)
         return collection
 
-    def get_search_documents_by_language(self, **filters):
-        by_language = defaultdict(list)
+    def iterate_search_documents(self, chunk_size=100, **filters):
+        """
+        Yields (language, search_document) tuples for all documents and additional extensions of this version.
+        Documents get read through a server side cursor, which means that memory usage stays flat
+        regardless of the amount of documents that are in the version.
+        Filters are lookups for the properties of Documents, which also apply to compacted Documents.
+        """
         documents = self.document_set \
-            .select_related("extension") \
-            .filter(**filters)
+            .filter_properties(**filters) \
+            .select_related("extension", "collection", "revision") \
+            .iterator(chunk_size=chunk_size)
         for document in documents:
+            if document.revision:
+                document.properties = document.revision.properties
             language = document.get_language()
             if language not in settings.OPENSEARCH_ANALYSERS:
                 language = "unk"
-            by_language[language] += list(document.to_search())
-        for extension in Extension.objects.filter(is_addition=True):
+            for search_document in document.to_search():
+                yield language, search_document
+        for extension in Extension.objects.filter(is_addition=True).iterator(chunk_size=chunk_size):
             language = extension.get_language()
             if language not in settings.OPENSEARCH_ANALYSERS:
                 language = "unk"
-            by_language[language] += list(extension.to_search())
+            for search_document in extension.to_search():
+                yield language, search_document
+
+    def get_search_documents_by_language(self, **filters):
+        by_language = defaultdict(list)
+        for language, search_document in self.iterate_search_documents(**filters):
+            by_language[language].append(search_document)
         return by_language
 
     def set_current(self):
+        from core.models.search import DocumentChange
         DatasetVersion.objects.all().update(is_current=False)
         self.is_current = True
         self.save()
+        # Changes from before the indices of this version got pushed shouldn't get pushed again by sync_indices
+        DocumentChange.objects.truncate(self)
+        # Versions that are no longer in use get compacted by clean_data
+        # and a version that becomes current again gets its own Documents back
+        self.expand_documents()
+
+    def compact_documents(self):
+        return self.document_set.model.objects.compact(self.id)
+
+    def expand_documents(self):
+        return self.document_set.model.objects.expand(self.id)
 
     def aggregate(self):
         return {
@@ -1,13 +1,21 @@
 import re
+import json
 from copy import copy
+from hashlib import sha256
 from unidecode import unidecode
-from django.db import models
+from django.db import models, connection
+from django.db.models import Q
+from django.utils.timezone import now
 
+from datagrowth import settings as datagrowth_settings
 from datagrowth.datatypes import DocumentBase
-from metadata.models import MetadataValue
+from datagrowth.utils import ibatch
+from metadata.utils.normalization import normalize_values
+from core.models.datatypes.pipeline import PipelineState
 
 
 PRIVATE_PROPERTIES = ["from_youtube", "lowest_educational_level"]
+CONTENT_HASH_EXCLUDED_PROPERTIES = ["seed_resource"]
 
 
 class DocumentManager(models.Manager):
@@ -17,12 +25,199 @@ class DocumentManager(models.Manager):
         properties["id"] = seed["external_id"]
 
         metadata_pipeline = properties.pop(metadata_pipeline_key, None)
-        document = Document(properties=properties, collection=collection, pipeline={"metadata": metadata_pipeline})
+        document = Document(properties=properties, collection=collection, pipeline={"metadata": metadata_pipeline},
+                            content_hash=Document.get_content_hash(seed))
         if collection:
             document.dataset_version = collection.dataset_version
         document.clean()
         return document
 
+    def bulk_upsert(self, documents, update_fields, merge_properties=False):
+        """
+        Inserts Documents or updates the Documents with the same reference in the same collection
+        using INSERT ... ON CONFLICT DO UPDATE statements, instead of looking up existing Documents first.
+        Only the update_fields get updated for existing Documents.
+        When merge_properties is True new properties get merged into existing properties like Document.update does.
+        Otherwise properties get replaced.
+        Existing Documents with the same content hash as the new Document are left untouched.
+        Pipeline states of inserted and updated Documents get replaced by a state for the metadata phase,
+        when that phase was successful. Processors of phases that depend on metadata will schedule these Documents.
+        Returns the references of inserted and updated Documents and the number of unchanged Documents.
+        """
+        documents = self._deduplicate_references(documents, merge_properties)
+        fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        updates = []
+        for field_name in update_fields:
+            column = connection.ops.quote_name(self.model._meta.get_field(field_name).column)
+            if field_name == "properties" and merge_properties:
+                # Like Document.update this never overwrites an existing language
+                updates.append(
+                    f"{column} = {table}.{column} || CASE WHEN {table}.{column} ? 'language' "
+                    f"THEN EXCLUDED.{column} - 'language' ELSE EXCLUDED.{column} END"
+                )
+            else:
+                updates.append(f"{column} = EXCLUDED.{column}")
+        updates.append("content_hash = EXCLUDED.content_hash")
+        row_placeholder = "(" + ", ".join(["%s"] * len(fields)) + ")"
+        changed = []
+        for batch in ibatch(documents, batch_size=datagrowth_settings.DATAGROWTH_MAX_BATCH_SIZE):
+            parameters = []
+            for document in batch:
+                parameters += [
+                    field.get_db_prep_save(field.pre_save(document, True), connection)
+                    for field in fields
+                ]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES {', '.join([row_placeholder] * len(batch))} "
+                    f"ON CONFLICT (collection_id, reference) WHERE reference IS NOT NULL "
+                    f"DO UPDATE SET {', '.join(updates)} "
+                    f"WHERE EXCLUDED.content_hash IS NULL "
+                    f"OR {table}.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+                    f"RETURNING id, reference, pipeline -> 'metadata' ->> 'success' = 'true'",
+                    parameters
+                )
+                rows = cursor.fetchall()
+            # Changed Documents need to go through all phases again, which processors schedule after metadata
+            PipelineState.objects.filter(document_id__in=[document_id for document_id, _, _ in rows]).delete()
+            PipelineState.objects.bulk_create([
+                PipelineState(document_id=document_id, phase="metadata", status=PipelineState.Status.SUCCESS)
+                for document_id, _, success in rows if success
+            ])
+            changed += [reference for _, reference, _ in rows]
+        return changed, len(documents) - len(changed)
+
+    def copy_documents(self, source_collection_id, collection):
+        """
+        Copies all Documents of a source collection into collection with a single INSERT ... SELECT statement,
+        without loading any Documents into Python.
+        Properties of compacted Documents get copied from their revision, so copies are never compacted.
+        Pipeline states get copied as well, so unchanged Documents don't get processed again.
+        Returns the number of copied Documents.
+        """
+        current_time = now()
+        overrides = {
+            "collection": collection.id,
+            "dataset_version": collection.dataset_version_id,
+            "revision": None,
+            "created_at": current_time,
+            "modified_at": current_time
+        }
+        fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        revision_table = connection.ops.quote_name(DocumentRevision._meta.db_table)
+        columns = []
+        selects = []
+        parameters = []
+        for field in fields:
+            column = connection.ops.quote_name(field.column)
+            columns.append(column)
+            if field.name in overrides:
+                selects.append("%s")
+                parameters.append(field.get_db_prep_save(overrides[field.name], connection))
+            elif field.name == "properties":
+                selects.append(f"COALESCE(revision.{column}, document.{column})")
+            else:
+                selects.append(f"document.{column}")
+        parameters.append(source_collection_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(selects)} FROM {table} AS document "
+                f"LEFT JOIN {revision_table} AS revision ON revision.content_hash = document.revision_id "
+                f"WHERE document.collection_id = %s ORDER BY document.id",
+                parameters
+            )
+            copied = cursor.rowcount
+        PipelineState.objects.copy_states(source_collection_id, collection.id)
+        return copied
+
+    def filter_properties(self, **lookups):
+        """
+        Filters Documents on their properties.
+        Compacted Documents get filtered on the properties of their revision instead.
+        """
+        properties_filter = Q(**{f"properties__{lookup}": value for lookup, value in lookups.items()})
+        revision_filter = Q(**{f"revision__properties__{lookup}": value for lookup, value in lookups.items()})
+        return self.get_queryset().filter(properties_filter | revision_filter)
+
+    def compact(self, dataset_version_id):
+        """
+        Moves the properties of all Documents in a DatasetVersion into DocumentRevisions, which are stored once
+        for every distinct content hash of properties. Unchanged Documents in different versions share revisions.
+        Returns the number of compacted Documents.
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        revision_table = connection.ops.quote_name(DocumentRevision._meta.db_table)
+        content_hash = "encode(sha256(convert_to(properties::text, 'UTF8')), 'hex')"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {revision_table} (content_hash, properties, created_at) "
+                f"SELECT DISTINCT ON (content_hash) {content_hash} AS content_hash, properties, %s FROM {table} "
+                f"WHERE dataset_version_id = %s AND revision_id IS NULL "
+                f"ON CONFLICT (content_hash) DO NOTHING",
+                [now(), dataset_version_id]
+            )
+            cursor.execute(
+                f"UPDATE {table} SET revision_id = {content_hash}, properties = '{{}}' "
+                f"WHERE dataset_version_id = %s AND revision_id IS NULL",
+                [dataset_version_id]
+            )
+            return cursor.rowcount
+
+    def expand(self, dataset_version_id):
+        """
+        Restores the properties of compacted Documents in a DatasetVersion from their revisions.
+        Returns the number of expanded Documents.
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        revision_table = connection.ops.quote_name(DocumentRevision._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS document SET properties = revision.properties, revision_id = NULL "
+                f"FROM {revision_table} AS revision "
+                f"WHERE document.revision_id = revision.content_hash AND document.dataset_version_id = %s",
+                [dataset_version_id]
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _deduplicate_references(documents, merge_properties):
+        # A single upsert statement can't affect the same row twice, so Documents for one reference get combined
+        deduplicated = {}
+        for document in documents:
+            key = (document.collection_id, document.reference) if document.reference else id(document)
+            if merge_properties and key in deduplicated:
+                deduplicated[key].properties.update(document.properties)
+                deduplicated[key].content_hash = None  # combined properties don't match any single seed
+            else:
+                deduplicated[key] = document
+        return list(deduplicated.values())
+
+
+class DocumentRevisionManager(models.Manager):
+
+    def delete_unused(self):
+        return self.get_queryset().filter(document__isnull=True).delete()
+
+
+class DocumentRevision(models.Model):
+    """
+    Stores Document properties once for every distinct content hash.
+    Documents of DatasetVersions that are no longer in use get compacted into revisions by clean_data,
+    which means that they share revisions with the same Documents in other versions.
+    """
+
+    objects = DocumentRevisionManager()
+
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    properties = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"DocumentRevision {self.content_hash}"
+
 
 class Document(DocumentBase):
 
@@ -36,8 +231,17 @@ class Document(DocumentBase):
     dataset_version = models.ForeignKey("DatasetVersion", blank=True, null=True, on_delete=models.CASCADE)
     pipeline = models.JSONField(default=dict, blank=True)
     extension = models.ForeignKey("core.Extension", null=True, blank=True, on_delete=models.SET_NULL)
+    # The hash of the seed that was last used to create or update the Document
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+    # Compacted Documents have empty properties and store them in a shared revision instead
+    revision = models.ForeignKey(DocumentRevision, null=True, blank=True, on_delete=models.PROTECT)
     # NB: Collection foreign key is added by the base class
 
+    @staticmethod
+    def get_content_hash(seed):
+        content = {key: value for key, value in seed.items() if key not in CONTENT_HASH_EXCLUDED_PROPERTIES}
+        return sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
     def update(self, data, commit=True, validate=True):
         if "language" in self.properties:
             data.pop("language", None)
@@ -61,11 +265,10 @@ class Document(DocumentBase):
             alpha_pattern.sub("", unidecode(word))
             for word in suggest_completion
         ]
-        learning_material_disciplines_normalized = set([
-            metadata_value.get_root().value if metadata_value.get_root() else metadata_value.value
-            for metadata_value in MetadataValue.objects.filter(value__in=learning_material_disciplines,
-                                                               field__name="learning_material_disciplines")
-        ])
+        learning_material_disciplines_normalized = normalize_values(
+            "learning_material_disciplines",
+            learning_material_disciplines
+        )
         extras = {
             '_id': reference_id,
             "language": self.get_language(),
@@ -140,3 +343,12 @@ class Document(DocumentBase):
         )
         search_details.update(search_base)
         yield search_details
+
+    class Meta(DocumentBase.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["collection", "reference"],
+                condition=Q(reference__isnull=False),
+                name="unique_document_reference_per_collection"
+            )
+        ]
@@ -1,5 +1,11 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction, connection
+from django.db.models import F, Exists, OuterRef
 from django.contrib.contenttypes.fields import GenericForeignKey, ContentType
+from django.utils.timezone import now
+
+from datagrowth.utils import ibatch
 
 
 class Batch(models.Model):
@@ -19,3 +25,137 @@ class ProcessResult(models.Model):
     result = GenericForeignKey(ct_field="result_type", fk_field="result_id")
     result_type = models.ForeignKey(ContentType, null=True, blank=True, on_delete=models.CASCADE)
     result_id = models.PositiveIntegerField(null=True, blank=True)
+
+
+class PipelineStateManager(models.Manager):
+
+    def schedule(self, phase, depends_on, collections):
+        """
+        Creates pending states for a phase for Documents in the collections
+        that completed the phase it depends on and that don't have a state for the phase yet.
+        """
+        existing_states = self.get_queryset().filter(document_id=OuterRef("document_id"), phase=phase)
+        document_ids = self.get_queryset() \
+            .filter(phase=depends_on, status=PipelineState.Status.SUCCESS, document__collection__in=collections) \
+            .filter(~Exists(existing_states)) \
+            .values_list("document_id", flat=True)
+        states = (self.model(document_id=document_id, phase=phase) for document_id in document_ids.iterator())
+        for batch in ibatch(states, batch_size=500):
+            self.bulk_create(batch, ignore_conflicts=True)
+
+    def ready(self, phase, collections):
+        """
+        Returns the states of Documents in the collections that are ready to get processed for a phase.
+        """
+        return self.get_queryset().filter(
+            phase=phase,
+            status__in=[PipelineState.Status.PENDING, PipelineState.Status.FAILED, PipelineState.Status.PROCESSING],
+            next_attempt_at__lte=now(),
+            attempts__lt=PipelineState.MAX_ATTEMPTS,
+            document__collection__in=collections
+        )
+
+    def pick(self, phase, collections, document_ids=None):
+        """
+        Returns the ids of Documents in the collections that are ready to get processed for a phase.
+        When document_ids are given only these Documents get picked.
+        The states of these Documents get leased for processing,
+        which means that they become ready again when processing doesn't finish within the lease duration.
+        """
+        current_time = now()
+        with transaction.atomic():
+            states = self.ready(phase, collections)
+            if document_ids is not None:
+                states = states.filter(document_id__in=document_ids)
+            states = states.select_for_update(skip_locked=True, of=("self",))
+            picked_ids = list(states.values_list("document_id", flat=True))
+            self.get_queryset().filter(phase=phase, document_id__in=picked_ids).update(
+                status=PipelineState.Status.PROCESSING,
+                attempts=F("attempts") + 1,
+                next_attempt_at=current_time + PipelineState.LEASE_DURATION
+            )
+        return picked_ids
+
+    def complete(self, document_ids, phase):
+        return self.get_queryset().filter(phase=phase, document_id__in=document_ids).update(
+            status=PipelineState.Status.SUCCESS
+        )
+
+    def fail(self, document_ids, phase):
+        """
+        Marks states as failed and schedules a retry with an exponential backoff based on the attempts so far.
+        """
+        current_time = now()
+        states = self.get_queryset().filter(phase=phase, document_id__in=document_ids)
+        for attempts in set(states.values_list("attempts", flat=True)):
+            backoff = PipelineState.RETRY_BACKOFF * pow(2, max(attempts - 1, 0))
+            states.filter(attempts=attempts).update(
+                status=PipelineState.Status.FAILED,
+                next_attempt_at=current_time + backoff
+            )
+
+    def copy_states(self, source_collection_id, collection_id):
+        """
+        Copies the states of Documents in a source collection to the Documents with the same reference
+        in another collection with a single INSERT ... SELECT statement.
+        Leases of states that are processing don't carry over, so these states become pending instead.
+        Returns the number of copied states.
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        document_table = connection.ops.quote_name(self.model._meta.get_field("document").related_model._meta.db_table)
+        current_time = now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (document_id, phase, status, attempts, next_attempt_at, modified_at) "
+                f"SELECT copy.id, state.phase, "
+                f"CASE WHEN state.status = %s THEN %s ELSE state.status END, state.attempts, "
+                f"CASE WHEN state.status = %s THEN %s ELSE state.next_attempt_at END, %s "
+                f"FROM {table} AS state "
+                f"INNER JOIN {document_table} AS source ON source.id = state.document_id "
+                f"INNER JOIN {document_table} AS copy "
+                f"ON copy.reference = source.reference AND copy.collection_id = %s "
+                f"WHERE source.collection_id = %s "
+                f"ON CONFLICT (document_id, phase) DO NOTHING",
+                [
+                    PipelineState.Status.PROCESSING, PipelineState.Status.PENDING,
+                    PipelineState.Status.PROCESSING, current_time, current_time,
+                    collection_id, source_collection_id
+                ]
+            )
+            return cursor.rowcount
+
+
+class PipelineState(models.Model):
+    """
+    Keeps track of the processing state of a Document for every pipeline phase.
+    Pipeline processors create pending states for Documents that completed the phase they depend on.
+    Processors use these states to select Documents that need processing
+    and to retry failed Documents with an increasing delay.
+    """
+
+    MAX_ATTEMPTS = 5
+    LEASE_DURATION = timedelta(hours=2)
+    RETRY_BACKOFF = timedelta(minutes=30)
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        SUCCESS = "success", "Success"
+        FAILED = "failed", "Failed"
+
+    objects = PipelineStateManager()
+
+    document = models.ForeignKey("Document", on_delete=models.CASCADE)
+    phase = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["document", "phase"], name="unique_pipeline_state_phase")
+        ]
+        indexes = [
+            models.Index(fields=["phase", "status", "next_attempt_at"])
+        ]
@@ -1,4 +1,6 @@
+from copy import deepcopy
 from dateutil.parser import parse as parse_date_string
+from urlobject import URLObject
 
 from django.utils.timezone import make_aware, is_aware
 from django.db import models
@@ -59,5 +61,35 @@ class HarvestHttpResource(HttpResource):
         ])
         return super().validate_request(request, validate_input=validate_input)
 
+    def remaining_parameters(self):
+        """
+        Returns a list with the query parameters of every continuation request that remains after this resource.
+        By default this is None, which indicates that remaining requests can't be known upfront,
+        because every continuation request depends on the content of the previous response.
+        Override this method for resources that know the total size of a set from their first response,
+        to allow fetching the remaining pages concurrently.
+        """
+        return None
+
+    def create_remaining_requests(self):
+        """
+        Creates the requests for all remaining continuation requests like create_next_request does for the next one.
+        Returns None when remaining requests can't be known upfront.
+        """
+        if not self.success:
+            return []
+        remaining_parameters = self.remaining_parameters()
+        if remaining_parameters is None:
+            return None
+        url = URLObject(self.request.get("url"))
+        remaining_requests = []
+        for parameters in remaining_parameters:
+            params = url.query.dict
+            params.update(parameters)
+            request = deepcopy(self.request)
+            request["url"] = str(url.set_query_params(params))
+            remaining_requests.append(request)
+        return remaining_requests
+
     class Meta:
         abstract = True
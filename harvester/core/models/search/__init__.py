@@ -1,2 +1,3 @@
 from .index import ElasticIndex, ElasticIndexSerializer, EducationalLevels
 from .query import Query, QueryRanking, QuerySerializer
+from .changes import DocumentChange
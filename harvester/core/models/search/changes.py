@@ -0,0 +1,66 @@
+from django.db import models
+from django.db.models import Min
+
+
+class DocumentChangeManager(models.Manager):
+
+    def record(self, references, operation=None, language=None):
+        """
+        Records changes for all given references in a single query.
+        """
+        operation = operation or DocumentChange.Operations.UPSERT
+        changes = [
+            DocumentChange(reference=reference, operation=operation, language=language)
+            for reference in references
+        ]
+        return self.bulk_create(changes)
+
+    def build_from_seeds(self, seeds):
+        """
+        Creates (unsaved) changes for seeds.
+        Seeds may get altered by updates, so call this method before using seeds to update Documents.
+        """
+        changes = []
+        for seed in seeds:
+            language = seed.get("language", None)
+            if isinstance(language, dict):
+                language = language.get("metadata", None)
+            operation = DocumentChange.Operations.UPSERT if seed.get("state", "active") == "active" \
+                else DocumentChange.Operations.DELETE
+            changes.append(
+                DocumentChange(reference=seed["external_id"], operation=operation, language=language)
+            )
+        return changes
+
+    def truncate(self, dataset_version):
+        """
+        Deletes changes that were made before every pushed index of the DatasetVersion got pushed.
+        Indices contain all Documents as they were at the start of a push, so these changes don't need syncing.
+        """
+        pushed_at = dataset_version.indices.aggregate(pushed_at=Min("pushed_at"))["pushed_at"]
+        if pushed_at is None:
+            return 0
+        count, deletes = self.filter(created_at__lt=pushed_at).delete()
+        return count
+
+
+class DocumentChange(models.Model):
+    """
+    Keeps track of Documents and Extensions that changed after they were pushed to the search engine.
+    The sync_indices task reads these changes in order and removes them once they are pushed.
+    Changes that indices of a DatasetVersion already contain get truncated when that version becomes current.
+    """
+
+    class Operations(models.TextChoices):
+        UPSERT = "upsert", "Upsert"
+        DELETE = "delete", "Delete"
+
+    objects = DocumentChangeManager()
+
+    reference = models.CharField(max_length=255)
+    operation = models.CharField(max_length=10, choices=Operations.choices, default=Operations.UPSERT)
+    language = models.CharField(max_length=5, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.operation}: {self.reference}"
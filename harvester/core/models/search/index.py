@@ -1,4 +1,7 @@
 from datetime import datetime
+from copy import deepcopy
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
 from django.db import models
@@ -13,6 +16,8 @@ from search_client.opensearch.configuration import create_open_search_index_conf
 from core.models import DatasetVersion
 from core.models.choices import EducationalLevels
 from search.clients import get_opensearch_client
+from search.cache import invalidate_search_cache
+from core.utils.indexing import SynchronizedIterator
 from core.constants import SITE_SHORTHAND_BY_DOMAIN
 
 
@@ -53,11 +58,41 @@ class ElasticIndex(models.Model):
             raise ValueError("Can't check for existence with an unsaved object")
         return self.client.indices.exists(self.remote_name)
 
-    def push(self, elastic_documents, recreate=True, request_timeout=300):  # why is the elastic cluster usually slow?
+    def get_live_settings(self):
+        """
+        Returns the index settings that are changed during a bulk build with their configured values.
+        Settings that are not configured get reset to the cluster defaults by passing None.
+        """
+        configuration = self.configuration or self.get_index_config(self.language)
+        index_settings = configuration.get("settings", {}).get("index", {})
+        return {
+            "index": {
+                "refresh_interval": index_settings.get("refresh_interval", None),
+                "number_of_replicas": index_settings.get("number_of_replicas", None)
+            }
+        }
+
+    def get_bulk_build_configuration(self):
+        """
+        Returns the index configuration without refreshes and replicas,
+        which speeds up loading many documents into a new index.
+        """
+        configuration = deepcopy(self.configuration)
+        index_settings = configuration.setdefault("settings", {}).setdefault("index", {})
+        index_settings["refresh_interval"] = "-1"
+        index_settings["number_of_replicas"] = 0
+        return configuration
+
+    def prepare_push(self, recreate=True, bulk_build=False):
+        """
+        Makes sure the remote index exists before documents get pushed to it.
+        When recreating any existing remote index gets dropped first.
+        A recreated index can be created in bulk build mode,
+        after which the push should get completed by calling finish_bulk_build.
+        """
         if not self.id:
             raise ValueError("Can't push index with unsaved object")
 
-        current_time = make_aware(datetime.now())
         remote_name = self.remote_name
         remote_exists = self.remote_exists
 
@@ -69,23 +104,83 @@ class ElasticIndex(models.Model):
                 self.configuration = self.get_index_config(self.language)
             self.client.indices.create(
                 index=remote_name,
-                body=self.configuration
+                body=self.get_bulk_build_configuration() if bulk_build and recreate else self.configuration
             )
         if recreate:
             self.error_count = 0
+
+    def finish_bulk_build(self, request_timeout=300):
+        """
+        Restores the configured refresh interval and replicas after all documents got loaded into a new index.
+        It also merges the segments that were created during the load and makes documents available to search.
+        """
+        remote_name = self.remote_name
+        self.client.indices.put_settings(index=remote_name, body=self.get_live_settings())
+        self.client.indices.forcemerge(index=remote_name, max_num_segments=1, request_timeout=request_timeout)
+        self.client.indices.refresh(index=remote_name)
+
+    def _bulk(self, elastic_documents, request_timeout, chunk_size, max_chunk_bytes):
+        errors = []
+        for is_ok, result in streaming_bulk(self.client, elastic_documents, index=self.remote_name,
+                                            chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes,
+                                            max_retries=settings.OPENSEARCH_BULK_MAX_RETRIES,
+                                            initial_backoff=settings.OPENSEARCH_BULK_INITIAL_BACKOFF,
+                                            max_backoff=settings.OPENSEARCH_BULK_MAX_BACKOFF,
+                                            yield_ok=False, raise_on_error=False,
+                                            request_timeout=request_timeout):
+            if not is_ok:
+                errors.append(result)
+        return errors
+
+    def stream_push(self, elastic_documents, request_timeout=300, chunk_size=None, max_chunk_bytes=None,
+                    thread_count=None):
+        """
+        Sends documents to the remote index without touching the database.
+        This makes it safe to call this method from other threads once prepare_push has been called,
+        because that method will have loaded the site that is needed to determine the remote name.
+
+        When thread_count is larger than one the documents get sent by multiple threads at once.
+        In that case the documents iterable shouldn't touch the database either.
+        """
+        chunk_size = chunk_size or settings.OPENSEARCH_BULK_CHUNK_SIZE
+        max_chunk_bytes = max_chunk_bytes or settings.OPENSEARCH_BULK_MAX_CHUNK_BYTES
+        thread_count = thread_count or settings.OPENSEARCH_BULK_THREAD_COUNT
+        if thread_count <= 1:
+            errors = self._bulk(elastic_documents, request_timeout, chunk_size, max_chunk_bytes)
+        else:
+            elastic_documents = SynchronizedIterator(elastic_documents)
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                futures = [
+                    executor.submit(self._bulk, elastic_documents, request_timeout, chunk_size, max_chunk_bytes)
+                    for _ in range(thread_count)
+                ]
+                errors = list(chain(*[future.result() for future in futures]))
+        self.error_count += len(errors)
+        return errors
+
+    def push(self, elastic_documents, recreate=True, request_timeout=300,  # why is the elastic cluster usually slow?
+             chunk_size=None, max_chunk_bytes=None, thread_count=None, bulk_build=False):
+        if not self.id:
+            raise ValueError("Can't push index with unsaved object")
+
+        current_time = make_aware(datetime.now())
+        thread_count = thread_count or settings.OPENSEARCH_BULK_THREAD_COUNT
+        bulk_build = bulk_build and recreate
+        self.prepare_push(recreate=recreate, bulk_build=bulk_build)
+        if recreate:
             elastic_documents = [
                 elastic_document for elastic_document in elastic_documents
                 if elastic_document.get("_op_type", None) != "delete"
             ]
+        elif thread_count > 1:
+            # Generating search documents may hit the database, which we don't want to do from other threads
+            elastic_documents = list(elastic_documents)
 
         # Actual push of docs to ES
-        errors = []
-        for is_ok, result in streaming_bulk(self.client, elastic_documents, index=remote_name,
-                                            chunk_size=100, yield_ok=False, raise_on_error=False,
-                                            request_timeout=request_timeout):
-            if not is_ok:
-                self.error_count += 1
-                errors.append(result)
+        errors = self.stream_push(elastic_documents, request_timeout=request_timeout, chunk_size=chunk_size,
+                                  max_chunk_bytes=max_chunk_bytes, thread_count=thread_count)
+        if bulk_build:
+            self.finish_bulk_build(request_timeout=request_timeout)
 
         self.pushed_at = current_time
         self.save()
@@ -102,6 +197,7 @@ class ElasticIndex(models.Model):
         except NotFoundError:
             pass
         self.client.indices.put_alias(index=self.remote_name, name=alias)
+        invalidate_search_cache(alias_prefix)
 
     def clean(self):
         if not self.name:
@@ -66,6 +66,10 @@ class PipelineProcessor(Processor):
     def filter_documents(self, queryset):
         return queryset
 
+    def select_documents(self, queryset, collections=None):
+        # Only target Documents that have no ProcessResult associated
+        return queryset.exclude(processresult__result_type=self.result_type)
+
     def process_batch(self, batch):
         pass
 
@@ -91,14 +95,13 @@ class PipelineProcessor(Processor):
         resource_app_label, resource_model = self.config.retrieve_data["resource"].split(".")
         self.result_type = ContentType.objects.get_by_natural_key(resource_app_label, resource_model)
 
-    def __call__(self, queryset):
+    def __call__(self, queryset, collections=None):
         # Prepare some values for serialization
         processor = self.__class__.__name__
         config = self.config.to_dict(private=True, protected=True)
         # Allow derived classes to filter the target Documents
         queryset = self.filter_documents(queryset)
-        # Only target Documents that have no ProcessResult associated
-        queryset = queryset.exclude(processresult__result_type=self.result_type)
+        queryset = self.select_documents(queryset, collections)
         # Create batches of documents with no processing results
         batches = []
         for document_batch in ibatch(queryset, batch_size=self.config.batch_size):
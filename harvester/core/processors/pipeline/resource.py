@@ -1,7 +1,7 @@
 from time import sleep
 from sentry_sdk import capture_message
 
-from django.db.models import Q
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 
@@ -23,11 +23,22 @@ class ResourcePipelineProcessor(PipelineProcessor):
     def dispatch_resource(self, config, *args, **kwargs):
         return [], []
 
-    def filter_documents(self, queryset):
-        depends_on = self.config.pipeline_depends_on
+    def __init__(self, config):
+        super().__init__(config)
+        self.PipelineState = apps.get_model(f"{self.config.pipeline_app_label}.PipelineState")
+
+    def select_documents(self, queryset, collections=None):
+        # Documents that completed the phase this phase depends on get scheduled once.
+        # Ready states get picked by collection, after which the queryset only filters the ready Documents.
+        # Picking leases states for processing, which also prevents Documents from being processed twice.
         pipeline_phase = self.config.pipeline_phase
-        filters = Q(**{f"pipeline__{depends_on}__success": True}) | Q(**{f"pipeline__{pipeline_phase}__success": False})
-        return queryset.filter(filters)
+        if collections is None:
+            collections = list(queryset.order_by().values_list("collection_id", flat=True).distinct())
+        self.PipelineState.objects.schedule(pipeline_phase, self.config.pipeline_depends_on, collections)
+        ready_states = self.PipelineState.objects.ready(pipeline_phase, collections)
+        document_ids = list(queryset.filter(id__in=ready_states.values("document_id")).values_list("id", flat=True))
+        document_ids = self.PipelineState.objects.pick(pipeline_phase, collections, document_ids)
+        return self.Document.objects.filter(id__in=document_ids).order_by("id")
 
     def process_batch(self, batch):
 
@@ -67,8 +78,11 @@ class ResourcePipelineProcessor(PipelineProcessor):
         while attempts < 3:
 
             documents = []
+            successes = set()
             for process_result in batch.processresult_set.filter(result_id__isnull=False):
                 result = process_result.result
+                if result.success:
+                    successes.add(process_result.document_id)
                 # Write results to the pipeline
                 process_result.document.pipeline[pipeline_phase] = {
                     "success": result.success,
@@ -107,6 +121,10 @@ class ResourcePipelineProcessor(PipelineProcessor):
                     sleep(5)
                     continue
                 self.Document.objects.bulk_update(documents, ["pipeline", "properties"])
+                # Documents without successful results get retried later
+                batch_document_ids = set(batch.processresult_set.values_list("document_id", flat=True))
+                self.PipelineState.objects.complete(successes, pipeline_phase)
+                self.PipelineState.objects.fail(batch_document_ids - successes, pipeline_phase)
                 break
 
 
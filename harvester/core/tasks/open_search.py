@@ -1,61 +1,135 @@
 from datetime import datetime
-from itertools import chain
+from collections import defaultdict
 
 from django.conf import settings
+from django.db.models import Max
 from django.db.transaction import atomic, DatabaseError
 from django.utils.timezone import make_aware
-from django.contrib.sites.models import Site
 from celery import current_app as app
 
-from datagrowth.utils.iterators import ibatch
-
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.logging import HarvestLogger
-from core.models import ElasticIndex, DatasetVersion, Extension, Harvest
-from core.constants import EXCLUDED_COLLECTIONS_BY_DOMAIN
+from core.models import ElasticIndex, DatasetVersion, Extension, Harvest, DocumentChange
+from core.constants import EXCLUDED_COLLECTIONS_BY_DOMAIN, SITE_SHORTHAND_BY_DOMAIN
+from metadata.utils.normalization import clear_root_values
+from search.cache import invalidate_search_cache
+
+
+def _get_search_documents_by_index(dataset_version, changes, indices_by_site, collection_names_by_site):
+    """
+    Serializes every changed Document and Extension once and
+    returns the search documents grouped by all site indices that they belong to.
+    Deletes for references that no longer have a Document or Extension get pushed to the index of the language
+    recorded with the change, or to all indices when the language is unknown.
+    """
+    search_documents_by_index = defaultdict(list)
+    references = {change.reference for change in changes}
+    found_references = set()
+    documents = dataset_version.document_set \
+        .filter(reference__in=references) \
+        .select_related("extension", "collection")
+    for document in documents:
+        found_references.add(document.reference)
+        language = document.get_language()
+        if language is None:
+            continue
+        if language not in settings.OPENSEARCH_ANALYSERS:
+            language = "unk"
+        search_documents = list(document.to_search())
+        for site_id, site_indices in indices_by_site.items():
+            index = site_indices.get(language, None)
+            if index is None or document.collection.name not in collection_names_by_site[site_id]:
+                continue
+            search_documents_by_index[index] += search_documents
+    for extension in Extension.objects.filter(id__in=references, is_addition=True):
+        found_references.add(extension.id)
+        language = extension.get_language()
+        search_documents = list(extension.to_search())
+        for site_indices in indices_by_site.values():
+            index = site_indices.get(language, None)
+            if index is None:
+                continue
+            search_documents_by_index[index] += search_documents
+    deleted_languages = defaultdict(set)
+    for change in changes:
+        if change.operation == DocumentChange.Operations.DELETE and change.reference not in found_references:
+            deleted_languages[change.reference].add(change.language)
+    for reference, languages in deleted_languages.items():
+        if None in languages:
+            languages = None
+        else:
+            languages = {
+                language if language in settings.OPENSEARCH_ANALYSERS else "unk"
+                for language in languages
+            }
+        for site_indices in indices_by_site.values():
+            for language, index in site_indices.items():
+                if languages is None or language in languages:
+                    search_documents_by_index[index].append({"_id": reference, "_op_type": "delete"})
+    return search_documents_by_index
 
 
 @app.task(name="sync_indices", base=DatabaseConnectionResetTask)
-def sync_indices(**kwargs):
+def sync_indices(batch_size=500, **kwargs):
     dataset_version = DatasetVersion.objects.get_current_version()
     if dataset_version is None:
         return
     logger = HarvestLogger(dataset_version.dataset.name, "sync_indices", {})
+    clear_root_values()  # loads metadata lookups again during this run
 
-    for site in Site.objects.all():
-        indices_queryset = ElasticIndex.objects.filter(dataset_version=dataset_version, pushed_at__isnull=False,
-                                                       site=site)
-        excluded_collections = EXCLUDED_COLLECTIONS_BY_DOMAIN[site.domain]
-        collection_names = [
-            harvest.source.spec for harvest in Harvest.objects.exclude(source__spec__in=excluded_collections)
-        ]
-        try:
-            with atomic():
-                current_time = make_aware(datetime.now())
-                for index in indices_queryset.select_for_update(nowait=True):
-                    documents_queryset = dataset_version.document_set.filter(
-                        modified_at__gte=index.pushed_at,
-                        collection__name__in=collection_names
-                    )
-                    for doc_batch in ibatch(documents_queryset, batch_size=32):
-                        docs = []
-                        for doc in doc_batch:
-                            language = doc.get_language()
-                            if language == index.language:
-                                docs.append(doc.to_search())
-                            elif language and language not in settings.OPENSEARCH_ANALYSERS and index.language == "unk":
-                                docs.append(doc.to_search())
-                        errors = index.push(chain(*docs), recreate=False)
-                        logger.open_search_errors(errors)
-                    extensions_queryset = Extension.objects.filter(
-                        modified_at__gte=index.pushed_at,
-                        is_addition=True
-                    )
-                    for ext_batch in ibatch(extensions_queryset, batch_size=32):
-                        exts = [ext.to_search() for ext in ext_batch if ext.get_language() == index.language]
-                        errors = index.push(chain(*exts), recreate=False)
-                        logger.open_search_errors(errors)
+    try:
+        with atomic():
+            current_time = make_aware(datetime.now())
+            indices = ElasticIndex.objects \
+                .filter(dataset_version=dataset_version, pushed_at__isnull=False) \
+                .select_for_update(nowait=True)
+            indices_by_site = defaultdict(dict)
+            collection_names_by_site = {}
+            for index in indices:
+                index.prepare_push(recreate=False)
+                indices_by_site[index.site_id][index.language] = index
+                if index.site_id in collection_names_by_site:
+                    continue
+                excluded_collections = EXCLUDED_COLLECTIONS_BY_DOMAIN[index.site.domain]
+                collection_names_by_site[index.site_id] = {
+                    harvest.source.spec
+                    for harvest in Harvest.objects.exclude(source__spec__in=excluded_collections)
+                }
+            if not indices_by_site:
+                # Indices that still need a push will contain the changes once they get pushed.
+                # Without such indices there is nothing to sync to and the change log gets drained instead.
+                if not ElasticIndex.objects.filter(pushed_at__isnull=True).exists():
+                    DocumentChange.objects.filter(created_at__lt=current_time).delete()
+                return
+            # We only handle changes that exist at the start to prevent endless syncing when changes keep coming in
+            last_change_id = DocumentChange.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+            changes_queryset = DocumentChange.objects.filter(id__lte=last_change_id).order_by("id")
+            while True:
+                changes = list(changes_queryset[:batch_size])
+                if not changes:
+                    break
+                search_documents_by_index = _get_search_documents_by_index(
+                    dataset_version,
+                    changes,
+                    indices_by_site,
+                    collection_names_by_site
+                )
+                for index, search_documents in search_documents_by_index.items():
+                    errors = index.stream_push(search_documents)
+                    logger.open_search_errors(errors)
+                DocumentChange.objects.filter(id__in=[change.id for change in changes]).delete()
+            for site_indices in indices_by_site.values():
+                for index in site_indices.values():
                     index.pushed_at = current_time
                     index.save()
-        except DatabaseError:
-            logger.warning("Unable to acquire a database lock for sync_indices")
+            if last_change_id:
+                # Changes should be searchable before cached search responses get invalidated
+                alias_prefixes = set()
+                for site_indices in indices_by_site.values():
+                    for index in site_indices.values():
+                        index.client.indices.refresh(index=index.remote_name)
+                        alias_prefixes.add(SITE_SHORTHAND_BY_DOMAIN[index.site.domain])
+                for alias_prefix in alias_prefixes:
+                    invalidate_search_cache(alias_prefix)
+    except DatabaseError:
+        logger.warning("Unable to acquire a database lock for sync_indices")
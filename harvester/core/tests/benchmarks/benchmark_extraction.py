@@ -0,0 +1,66 @@
+"""
+Benchmarks don't match the test file pattern, so they only run when they get named explicitly:
+
+    python manage.py test core.tests.benchmarks.benchmark_extraction
+"""
+from time import perf_counter
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils.timezone import make_aware
+
+from core.constants import Repositories
+from harvester.utils.extraction import get_harvest_seeds, record_cache_disabled
+from edurep.tests.factories import EdurepOAIPMHFactory
+from sharekit.tests.factories import SharekitMetadataHarvestFactory
+from anatomy_tool.tests.factories import AnatomyToolOAIPMHFactory
+from sources.factories.buas import extraction as buas
+from sources.factories.greeni import extraction as greeni
+from sources.factories.han import extraction as han
+from sources.factories.hanze import extraction as hanze
+from sources.factories.hku import extraction as hku
+from sources.factories.hva import extraction as hva
+
+
+FIXTURES = {
+    Repositories.EDUREP: (EdurepOAIPMHFactory.create_common_edurep_responses, "surfsharekit",),
+    Repositories.SHAREKIT: (SharekitMetadataHarvestFactory.create_common_sharekit_responses, "edusources",),
+    Repositories.ANATOMY_TOOL: (AnatomyToolOAIPMHFactory.create_common_anatomy_tool_responses, "anatomy_tool",),
+    Repositories.BUAS: (buas.BuasPureResourceFactory.create_common_responses, buas.SET_SPECIFICATION,),
+    Repositories.GREENI: (greeni.GreeniOAIPMHResourceFactory.create_common_responses, greeni.SET_SPECIFICATION,),
+    Repositories.HAN: (han.HanOAIPMHFactory.create_common_responses, han.SET_SPECIFICATION,),
+    Repositories.HANZE: (hanze.HanzeResearchObjectResourceFactory.create_common_responses, hanze.SET_SPECIFICATION,),
+    Repositories.HKU: (hku.HkuMetadataResourceFactory.create_common_responses, hku.SET_SPECIFICATION,),
+    Repositories.HVA: (hva.HvaPureResourceFactory.create_common_responses, hva.SET_SPECIFICATION,),
+}
+
+
+class BenchmarkExtraction(TestCase):
+    """
+    Measures how many seeds per second get extracted from the test fixtures of every repository,
+    with and without the per record cache of extraction methods.
+    """
+
+    rounds = 20
+
+    def measure(self, repository, set_specification):
+        begin_of_time = make_aware(datetime(year=1970, month=1, day=1))
+        seeds = []
+        start = perf_counter()
+        for _ in range(self.rounds):
+            seeds = get_harvest_seeds(repository, set_specification, begin_of_time, include_no_url=True)
+        duration = perf_counter() - start
+        return seeds, len(seeds) * self.rounds / duration if duration else 0.0
+
+    def test_extraction(self):
+        for repository, (create_responses, set_specification) in FIXTURES.items():
+            create_responses()
+            with record_cache_disabled():
+                uncached_seeds, uncached = self.measure(repository, set_specification)
+            cached_seeds, cached = self.measure(repository, set_specification)
+            self.assertEqual(cached_seeds, uncached_seeds,
+                             f"Expected the record cache to not change {repository} seeds")
+            print(
+                f"{repository}: {uncached:.1f} seeds/s without record cache, "
+                f"{cached:.1f} seeds/s with record cache ({cached / max(uncached, 0.001):.2f}x)"
+            )
@@ -0,0 +1,55 @@
+"""
+Benchmarks don't match the test file pattern, so they only run when they get named explicitly:
+
+    python manage.py test core.tests.benchmarks.benchmark_upsert
+"""
+from time import perf_counter
+
+from django.test import TestCase
+
+from datagrowth.datatypes import CollectionBase
+from core.models import Collection
+
+
+class BenchmarkUpsert(TestCase):
+    """
+    Measures how many seeds per second get inserted and updated,
+    with the bulk upsert by reference and with the update from Datagrowth that looks up Documents first.
+    """
+
+    sizes = [10000, 100000]
+
+    @staticmethod
+    def create_seeds(size, title):
+        return [
+            {
+                "external_id": f"benchmark:{ix}",
+                "state": "active",
+                "title": title,
+                "url": f"https://example.com/{ix}",
+                "language": {"metadata": "nl"},
+                "keywords": ["benchmark", "upsert"],
+            }
+            for ix in range(size)
+        ]
+
+    @staticmethod
+    def measure(update, collection, seeds):
+        start = perf_counter()
+        update(collection, seeds)
+        duration = perf_counter() - start
+        return len(seeds) / duration if duration else 0.0
+
+    def test_upsert(self):
+        updates = {
+            "bulk upsert": lambda collection, seeds: collection.upsert(seeds),
+            "lookup update": lambda collection, seeds: CollectionBase.update(collection, seeds, "external_id",
+                                                                             batch_size=500)
+        }
+        for size in self.sizes:
+            for name, update in updates.items():
+                collection = Collection.objects.create(name=f"benchmark-{name}-{size}", referee="external_id")
+                inserts = self.measure(update, collection, self.create_seeds(size, "inserted"))
+                updates_per_second = self.measure(update, collection, self.create_seeds(size, "updated"))
+                self.assertEqual(collection.documents.count(), size)
+                print(f"{name} of {size} seeds: {inserts:.1f} inserts/s, {updates_per_second:.1f} updates/s")
@@ -5,15 +5,16 @@ from django.test import TestCase, override_settings
 from django.core.management import call_command, CommandError
 from django.utils.timezone import make_aware
 
-from datagrowth.resources.http.tasks import send
 from core.management.commands.harvest_metadata import Command as DatasetCommand
 from core.models import DatasetVersion, Collection, Harvest
 from core.constants import HarvestStages
 from core.logging import HarvestLogger
+from core.utils.harvest import send_concurrently
 from harvester.utils.extraction import get_harvest_seeds
 
 
-GET_HARVEST_SEEDS_TARGET = "core.management.commands.harvest_metadata.get_harvest_seeds"
+SEND_CONCURRENTLY_TARGET = "core.management.commands.harvest_metadata.send_concurrently"
+ITERATE_HARVEST_SEEDS_TARGET = "core.management.commands.harvest_metadata.iterate_harvest_seeds"
 HANDLE_UPSERT_SEEDS_TARGET = "core.management.commands.harvest_metadata.Command.handle_upsert_seeds"
 HANDLE_DELETION_SEEDS_TARGET = "core.management.commands.harvest_metadata.Command.handle_deletion_seeds"
 DUMMY_SEEDS = [
@@ -48,7 +49,7 @@ class TestMetadataHarvest(TestCase):
         command.batch_size = 32
         return command
 
-    @patch(GET_HARVEST_SEEDS_TARGET, return_value=DUMMY_SEEDS)
+    @patch(ITERATE_HARVEST_SEEDS_TARGET, return_value=DUMMY_SEEDS)
     @patch(HANDLE_UPSERT_SEEDS_TARGET, return_value=[0, 7, 14])
     @patch(HANDLE_DELETION_SEEDS_TARGET, return_value=[1, 3])
     def test_harvest_metadata(self, deletion_target, upsert_target, seeds_target):
@@ -56,7 +57,7 @@ class TestMetadataHarvest(TestCase):
         # We'd expect two OAI-PMH calls to be made which should be both a success.
         # Apart from the main results we want to check if Datagrowth was used for execution.
         # This makes sure that a lot of edge cases will be covered like HTTP errors.
-        with patch("core.management.commands.harvest_metadata.send", wraps=send) as send_mock:
+        with patch(SEND_CONCURRENTLY_TARGET, wraps=send_concurrently) as send_mock:
             call_command("harvest_metadata", "--dataset=test", f"--repository={self.repository}")
         # Asserting Datagrowth usage
         self.assertEqual(send_mock.call_count, 1, "More than 1 call to send, was edurep_delen set not ignored?")
@@ -68,7 +69,7 @@ class TestMetadataHarvest(TestCase):
         )
         self.assertEqual(args, (self.spec_set, "1970-01-01T00:00:00Z"), "Wrong arguments given to resource")
         self.assertEqual(kwargs["method"], "get", "Resource is not using HTTP GET method")
-        # Asserting usage of get_harvest_seeds
+        # Asserting usage of iterate_harvest_seeds
         seeds_target.assert_called_once_with(self.repository, self.spec_set,
                                              make_aware(datetime(year=1970, month=1, day=1)), include_no_url=True)
         # Asserting usage of handle_upsert_seeds
@@ -167,6 +168,27 @@ class TestMetadataHarvest(TestCase):
         command.handle_deletion_seeds(collection, deletes)
         self.assertEqual(collection.document_set.count(), 0)
 
+    @patch(HANDLE_UPSERT_SEEDS_TARGET)
+    @patch(HANDLE_DELETION_SEEDS_TARGET)
+    def test_handle_seeds(self, deletion_target, upsert_target):
+        dataset_version = DatasetVersion.objects.last()
+        collection = Collection.objects.create(name=self.spec_set, dataset_version=dataset_version)
+        command = self.get_command_instance()
+        command.batch_size = 2
+        seeds = [
+            {"external_id": "1", "state": "active"},
+            {"external_id": "2", "state": "active"},
+            {"external_id": "3", "state": "active"},
+            {"external_id": "3", "state": "deleted"},
+            {"external_id": "4", "state": "active"},
+        ]
+        upserts_count, deletes_count = command.handle_seeds(collection, iter(seeds))
+        self.assertEqual(upserts_count, 3)
+        self.assertEqual(deletes_count, 1)
+        # Seeds should get handled in batches and a later seed for the same material replaces the earlier seed
+        self.assertEqual([call.args[1] for call in upsert_target.call_args_list], [seeds[:2], seeds[4:]])
+        self.assertEqual([call.args[1] for call in deletion_target.call_args_list], [seeds[3:4]])
+
 
 @override_settings(VERSION="0.0.1")
 class TestMetadataHarvestWithHistory(TestCase):
@@ -184,7 +206,7 @@ class TestMetadataHarvestWithHistory(TestCase):
         command.batch_size = 32
         return command
 
-    @patch(GET_HARVEST_SEEDS_TARGET, return_value=DUMMY_SEEDS)
+    @patch(ITERATE_HARVEST_SEEDS_TARGET, return_value=DUMMY_SEEDS)
     @patch(HANDLE_UPSERT_SEEDS_TARGET, return_value=[0, 7, 14])
     @patch(HANDLE_DELETION_SEEDS_TARGET, return_value=[1, 3])
     def test_harvest_metadata(self, deletion_target, upsert_target, seeds_target):
@@ -194,7 +216,7 @@ class TestMetadataHarvestWithHistory(TestCase):
         # This makes sure that a lot of edge cases will be covered like HTTP errors.
         test_harvest = Harvest.objects.get(source__spec=self.spec_set)
         test_harvest.prepare()
-        with patch("core.management.commands.harvest_metadata.send", wraps=send) as send_mock:
+        with patch(SEND_CONCURRENTLY_TARGET, wraps=send_concurrently) as send_mock:
             call_command("harvest_metadata", "--dataset=test", f"--repository={self.repository}")
         # Asserting Datagrowth usage
         self.assertEqual(send_mock.call_count, 1, "More than 1 call to send, was edurep_delen set not ignored?")
@@ -206,7 +228,7 @@ class TestMetadataHarvestWithHistory(TestCase):
         )
         self.assertEqual(args, (self.spec_set, "2020-02-10T13:08:39Z"), "Wrong arguments given to resource")
         self.assertEqual(kwargs["method"], "get", "Resource is not using HTTP GET method")
-        # Asserting usage of get_harvest_seeds
+        # Asserting usage of iterate_harvest_seeds
         expected_since = make_aware(
             datetime(year=2020, month=2, day=10, hour=13, minute=8, second=39, microsecond=315000)
         )
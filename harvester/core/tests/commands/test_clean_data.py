@@ -68,6 +68,15 @@ class TestCleanData(TestCase):
         self.assertEqual(self.search_client.indices.delete.call_count, 40)
         self.assertEqual(Extension.objects.all().count(), 1)
         self.assertEqual(Extension.objects.all().last().id, "new")
+        # Retained versions get compacted, unless they are current or the latest version of their dataset
+        for dataset in Dataset.objects.all():
+            latest_version = dataset.versions.order_by("created_at").last()
+            for dataset_version in dataset.versions.all():
+                is_in_use = dataset_version.is_current or dataset_version.id == latest_version.id
+                self.assertEqual(
+                    dataset_version.document_set.filter(revision__isnull=True).exists(), is_in_use,
+                    f"Expected {dataset_version} to be {'expanded' if is_in_use else 'compacted'}"
+                )
 
     def test_clean_data_duplicated_resources(self):
         # We'll add old Resources to new Documents and make sure these resources do not get deleted
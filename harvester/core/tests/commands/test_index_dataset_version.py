@@ -8,6 +8,7 @@ to update the indices.
 
 from unittest.mock import patch
 from datetime import datetime
+from collections import defaultdict
 
 from django.test import TestCase, override_settings
 from django.core.management import call_command
@@ -123,6 +124,140 @@ class TestIndexDatasetVersion(OpenSearchClientTestCase):
         dataset_version = DatasetVersion.objects.filter(is_current=True).last()
         self.assertEqual(dataset_version.id, 1)
 
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    @patch("core.logging.HarvestLogger.info")
+    def test_index_streaming(self, info_logger, streaming_bulk, get_search_client):
+
+        # Setting up the database that indicates no index exists yet
+        DatasetVersion.objects.all().update(is_current=False)
+
+        # The streaming_bulk mock needs to consume the documents that get fed to it from other threads
+        pushed_documents = {}
+
+        def consume_documents(client, docs, **kwargs):
+            pushed_documents[kwargs["index"]] = list(docs)
+            return iter([])
+        streaming_bulk.side_effect = consume_documents
+
+        # Setting basic expectations used in the test
+        expected_doc_count = {
+            "en": 8,
+            "nl": 2,
+            "unk": 3
+        }
+
+        # Calling command and catching output for some checks
+        call_command("index_dataset_version", "--dataset=test", "--streaming")
+
+        # Expect command to print how many documents it encountered for each language
+        for language, count in expected_doc_count.items():
+            info_logger.assert_any_call(f"{language}:{count}")
+
+        # Asserting calls to OpenSearch library
+        self.assertEqual(get_search_client.call_count, 3, "Expected a client to get created for each language")
+        self.assertEqual(streaming_bulk.call_count, 3)
+        self.assertEqual(len(pushed_documents), 3)
+        for remote_name, docs in pushed_documents.items():
+            index_name, version, language, version_id, site = self.unpack_index_name(remote_name)
+            self.assertEqual(len(docs), expected_doc_count[language])
+            for doc in docs:
+                self.assert_document_structure(doc)
+            self.assertEqual(index_name, "test")
+            self.assertEqual(version, "001")
+        self.assertEqual(self.search_client.indices.create.call_count, 3)
+        self.assertEqual(self.search_client.indices.put_alias.call_count, 3)
+        for index in ElasticIndex.objects.all():
+            self.assertIsNotNone(index.pushed_at)
+
+        self.assertEqual(DatasetVersion.objects.filter(is_current=True).count(), 1)
+        dataset_version = DatasetVersion.objects.filter(is_current=True).last()
+        self.assertEqual(dataset_version.id, 1)
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    @patch("core.logging.HarvestLogger.info")
+    def test_index_parallel(self, info_logger, streaming_bulk, get_search_client):
+
+        # Setting up the database that indicates no index exists yet
+        DatasetVersion.objects.all().update(is_current=False)
+
+        # The streaming_bulk mock needs to consume the documents, because threads share the documents
+        pushed_documents = defaultdict(list)
+
+        def consume_documents(client, docs, **kwargs):
+            pushed_documents[kwargs["index"]] += list(docs)
+            return iter([])
+        streaming_bulk.side_effect = consume_documents
+
+        # Setting basic expectations used in the test
+        expected_doc_count = {
+            "en": 8,
+            "nl": 2,
+            "unk": 3
+        }
+
+        # Calling command and catching output for some checks
+        call_command(
+            "index_dataset_version", "--dataset=test", "--parallel-languages", "--bulk-threads=2",
+            "--chunk-size=10", "--max-chunk-bytes=1000000"
+        )
+
+        # Expect command to print how many documents it encountered for each language
+        for language, count in expected_doc_count.items():
+            info_logger.assert_any_call(f"{language}:{count}")
+
+        # Asserting calls to OpenSearch library
+        self.assertEqual(streaming_bulk.call_count, 6, "Expected two bulk streams for each language")
+        for args, kwargs in streaming_bulk.call_args_list:
+            self.assertEqual(kwargs["chunk_size"], 10)
+            self.assertEqual(kwargs["max_chunk_bytes"], 1000000)
+            self.assertGreater(kwargs["max_retries"], 0, "Expected rejected chunks to get retried")
+        self.assertEqual(len(pushed_documents), 3)
+        for remote_name, docs in pushed_documents.items():
+            index_name, version, language, version_id, site = self.unpack_index_name(remote_name)
+            self.assertEqual(len(docs), expected_doc_count[language])
+            for doc in docs:
+                self.assert_document_structure(doc)
+        self.assertEqual(self.search_client.indices.create.call_count, 3)
+        self.assertEqual(self.search_client.indices.put_alias.call_count, 3)
+
+        self.assertEqual(DatasetVersion.objects.filter(is_current=True).count(), 1)
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    def test_index_bulk_build(self, streaming_bulk, get_search_client):
+
+        # Setting up the database that indicates no index exists yet
+        DatasetVersion.objects.all().update(is_current=False)
+        self.search_client.indices.put_settings.reset_mock()
+        self.search_client.indices.forcemerge.reset_mock()
+
+        # Calling command in bulk build mode
+        call_command("index_dataset_version", "--dataset=test", "--bulk-build")
+
+        # Indices should get created without refreshes and replicas
+        self.assertEqual(self.search_client.indices.create.call_count, 3)
+        for args, kwargs in self.search_client.indices.create.call_args_list:
+            index_name, version, language, version_id, site = self.unpack_index_name(kwargs["index"])
+            index_settings = kwargs["body"]["settings"]["index"]
+            self.assertEqual(index_settings["refresh_interval"], "-1")
+            self.assertEqual(index_settings["number_of_replicas"], 0)
+            self.assertEqual(kwargs["body"]["mappings"], ElasticIndex.get_index_config(language)["mappings"])
+        # After loading the configured settings get restored and segments get merged
+        self.assertEqual(self.search_client.indices.put_settings.call_count, 3)
+        for args, kwargs in self.search_client.indices.put_settings.call_args_list:
+            index_name, version, language, version_id, site = self.unpack_index_name(kwargs["index"])
+            configured_settings = ElasticIndex.get_index_config(language)["settings"]["index"]
+            live_settings = kwargs["body"]["index"]
+            self.assertEqual(live_settings["number_of_replicas"], configured_settings.get("number_of_replicas"))
+            self.assertEqual(live_settings["refresh_interval"], configured_settings.get("refresh_interval"))
+        self.assertEqual(self.search_client.indices.forcemerge.call_count, 3)
+        self.assertEqual(self.search_client.indices.put_alias.call_count, 3)
+        for index in ElasticIndex.objects.all():
+            self.assertEqual(index.configuration, ElasticIndex.get_index_config(index.language),
+                             "Expected bulk build settings to stay out of the stored configuration")
+
     def test_invalid_dataset(self):
         # Testing the case where a Dataset does not exist at all
         try:
@@ -59,6 +59,14 @@ class TestPromoteDatasetVersion(TestCase):
         self.assert_index_promoted()
         self.assert_is_current(True)
 
+    @patch("core.models.search.index.invalidate_search_cache")
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    def test_promote_invalidates_search_cache(self, get_search_client, invalidate_search_cache):
+        call_command("promote_dataset_version", "--dataset-version=1")
+        self.assertEqual(invalidate_search_cache.call_count, 2)
+        for args, kwargs in invalidate_search_cache.call_args_list:
+            self.assertIn(args[0], ["edusources", "publinova"])
+
     def test_promote_invalid(self):
         try:
             call_command("promote_dataset_version")
@@ -1,8 +1,11 @@
+import json
 from unittest.mock import Mock
 
 from django.test import TestCase
+from django.contrib import admin
 
-from core.models import DatasetVersion
+from core.models import DatasetVersion, Collection, DocumentRevision, PipelineState
+from core.admin.datatypes import DatasetVersionAdmin, CollectionAdmin
 
 
 class TestDatasetVersionManager(TestCase):
@@ -23,3 +26,95 @@ class TestDatasetVersionManager(TestCase):
                 f"Expected string '{string_version}' to become integer '{expected_integer_version}', "
                 f"but got '{integer_version}'"
             )
+
+
+class TestDatasetVersion(TestCase):
+
+    fixtures = ["datasets-history"]
+
+    def test_copy_collection(self):
+        current_version = DatasetVersion.objects.get(is_current=True)
+        source = current_version.collection_set.last()
+        source_id = source.id
+        source_documents = list(source.documents.order_by("id").values_list("reference", "properties"))
+        processing_document = source.documents.order_by("id").first()
+        PipelineState.objects.bulk_create([
+            PipelineState(document=processing_document, phase="metadata", status=PipelineState.Status.SUCCESS),
+            PipelineState(document=processing_document, phase="tika", status=PipelineState.Status.PROCESSING,
+                          attempts=1)
+        ])
+        new_version = DatasetVersion.objects.create(dataset=current_version.dataset, version="0.0.2")
+        with self.assertNumQueries(3):
+            collection = new_version.copy_collection(source)
+        self.assertNotEqual(collection.id, source_id)
+        self.assertEqual(collection.dataset_version, new_version)
+        self.assertEqual(
+            list(collection.documents.order_by("id").values_list("reference", "properties")),
+            source_documents
+        )
+        self.assertEqual(new_version.document_set.count(), len(source_documents))
+        self.assertEqual(Collection.objects.get(id=source_id).documents.count(), len(source_documents))
+        # Pipeline states are copied, but leases for processing are not
+        self.assertEqual(
+            PipelineState.objects.filter(document__collection=collection).count(),
+            PipelineState.objects.filter(document__collection_id=source_id).count()
+        )
+        copied_state = PipelineState.objects.get(document__collection=collection,
+                                                 document__reference=processing_document.reference, phase="tika")
+        self.assertEqual(copied_state.status, PipelineState.Status.PENDING)
+        self.assertEqual(copied_state.attempts, 1)
+
+    @staticmethod
+    def get_admin_counts(dataset_version_admin, collection_admin, dataset_version, collections):
+        counts = [dataset_version_admin.harvest_count(dataset_version)]
+        for collection in collections:
+            counts += [
+                collection_admin.active_document_count(collection),
+                collection_admin.deleted_document_count(collection),
+                collection_admin.inactive_document_count(collection),
+            ]
+        return counts
+
+    def test_compact_and_expand_documents(self):
+        current_version = DatasetVersion.objects.get(is_current=True)
+        properties = dict(current_version.document_set.values_list("id", "properties"))
+        dataset_version_admin = DatasetVersionAdmin(DatasetVersion, admin.site)
+        collection_admin = CollectionAdmin(Collection, admin.site)
+        collections = list(current_version.collection_set.all())
+        admin_counts = self.get_admin_counts(dataset_version_admin, collection_admin, current_version, collections)
+        self.assertGreater(admin_counts[0], 0)
+        new_version = DatasetVersion.objects.create(dataset=current_version.dataset, version="0.0.2")
+        for collection in current_version.collection_set.all():
+            new_version.copy_collection(collection)
+        new_version.set_current()
+        current_version.refresh_from_db()
+        self.assertFalse(current_version.is_current)
+        self.assertEqual(current_version.document_set.filter(revision__isnull=False).count(), 0,
+                         "Expected compaction to be left to clean_data")
+        # The previous version should share its Documents with the new version after compaction
+        current_version.compact_documents()
+        search_documents = list(current_version.iterate_search_documents(state="active"))
+        self.assertGreater(len(search_documents), 0, "Expected compacted Documents to get indexed from revisions")
+        for document in current_version.document_set.all():
+            self.assertEqual(document.properties, {})
+            self.assertEqual(document.revision.properties, properties[document.id])
+        self.assertEqual(
+            DocumentRevision.objects.count(),
+            len({json.dumps(value, sort_keys=True) for value in properties.values()})
+        )
+        self.assertEqual(new_version.document_set.filter(revision__isnull=False).count(), 0)
+        # Admin counts should read the properties of revisions
+        self.assertEqual(
+            self.get_admin_counts(dataset_version_admin, collection_admin, current_version, collections),
+            admin_counts
+        )
+        # Copying from a compacted version copies the properties of revisions
+        compacted_collection = current_version.collection_set.last()
+        copy = new_version.copy_collection(Collection.objects.get(id=compacted_collection.id))
+        for document in copy.documents.all():
+            self.assertIsNone(document.revision)
+            self.assertNotEqual(document.properties, {})
+        # Becoming current again restores the properties
+        current_version.set_current()
+        self.assertEqual(dict(current_version.document_set.values_list("id", "properties")), properties)
+        self.assertEqual(current_version.document_set.filter(revision__isnull=False).count(), 0)
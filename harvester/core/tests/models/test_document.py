@@ -2,7 +2,8 @@ from collections.abc import Generator
 
 from django.test import TestCase
 
-from core.models import Collection, Document, Extension
+from core.models import Collection, Document, Extension, PipelineState
+from metadata.utils.normalization import clear_root_values
 
 
 class TestDocument(TestCase):
@@ -81,3 +82,67 @@ class TestDocument(TestCase):
         search_document = list(search_document_generator)[0]
         self.assertEqual(search_document["_id"], "custom-extension")
         self.assertEqual(search_document["_op_type"], "delete")
+
+    def test_to_search_queries(self):
+        clear_root_values()
+        documents = list(
+            Document.objects.select_related("extension", "collection").filter(id__in=[222317, 222318])
+        )
+        list(documents[0].to_search())  # loads metadata lookups
+        with self.assertNumQueries(0):
+            for document in documents:
+                list(document.to_search())
+
+    def test_bulk_upsert(self):
+        collection = self.document.collection
+        document_count = collection.documents.count()
+        update = Document(collection=collection, reference=self.document.reference, properties={
+            "external_id": self.document.reference,
+            "title": "updated",
+            "language": {"metadata": "nl"}
+        })
+        insert = Document(collection=collection, reference="new", properties={"external_id": "new", "title": "new"})
+        changed, unchanged = Document.objects.bulk_upsert([update, insert], ["properties", "modified_at"],
+                                                          merge_properties=True)
+        self.assertCountEqual(changed, [self.document.reference, "new"])
+        self.assertEqual(unchanged, 0)
+        self.assertEqual(collection.documents.count(), document_count + 1)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.properties["title"], "updated")
+        self.assertEqual(self.document.properties["state"], "active", "Expected properties to get merged")
+        self.assertEqual(self.document.properties["language"]["metadata"], "en", "Expected language to be kept")
+        inserted = collection.documents.get(reference="new")
+        self.assertEqual(inserted.properties, {"external_id": "new", "title": "new"})
+        # Without merging properties they get replaced
+        replace = Document(collection=collection, reference="new", properties={"external_id": "new"})
+        Document.objects.bulk_upsert([replace], ["properties"])
+        inserted.refresh_from_db()
+        self.assertEqual(inserted.properties, {"external_id": "new"})
+
+    def test_bulk_upsert_unchanged(self):
+        collection = self.document.collection
+        seed = {"external_id": "new", "title": "new", "seed_resource": {"id": 1, "success": True}}
+        document = Document.objects.build_from_seed(seed, collection=collection, metadata_pipeline_key="seed_resource")
+        changed, unchanged = Document.objects.bulk_upsert([document], ["properties", "pipeline", "modified_at"])
+        self.assertEqual((changed, unchanged), (["new"], 0))
+        inserted = collection.documents.get(reference="new")
+        self.assertEqual(
+            list(PipelineState.objects.filter(document=inserted).values_list("phase", "status")),
+            [("metadata", PipelineState.Status.SUCCESS)],
+            "Expected Documents with complete metadata to get a metadata state for depending phases"
+        )
+        # Seeds with the same content get skipped, even when they come from another resource
+        seed = {"external_id": "new", "title": "new", "seed_resource": {"id": 2}}
+        document = Document.objects.build_from_seed(seed, collection=collection, metadata_pipeline_key="seed_resource")
+        changed, unchanged = Document.objects.bulk_upsert([document], ["properties", "pipeline", "modified_at"])
+        self.assertEqual((changed, unchanged), ([], 1))
+        self.assertEqual(collection.documents.get(reference="new").modified_at, inserted.modified_at)
+        self.assertEqual(collection.documents.get(reference="new").pipeline["metadata"]["id"], 1)
+        # Changed seeds update the Document
+        seed = {"external_id": "new", "title": "changed", "seed_resource": {"id": 3}}
+        document = Document.objects.build_from_seed(seed, collection=collection, metadata_pipeline_key="seed_resource")
+        changed, unchanged = Document.objects.bulk_upsert([document], ["properties", "pipeline", "modified_at"])
+        self.assertEqual((changed, unchanged), (["new"], 0))
+        self.assertEqual(collection.documents.get(reference="new").properties["title"], "changed")
+        self.assertFalse(PipelineState.objects.filter(document=inserted).exists(),
+                         "Expected Documents without complete metadata to lose their pipeline states")
@@ -1,7 +1,7 @@
 from unittest.mock import MagicMock, patch
 
 from celery.canvas import Signature
-from core.models import Batch, Collection, ProcessResult
+from core.models import Batch, Collection, ProcessResult, PipelineState
 from core.processors import HttpPipelineProcessor
 from core.tests.factories import DocumentFactory
 from django.test import TestCase
@@ -17,6 +17,12 @@ class TestHttpPipelineProcessor(TestCase):
         super().setUp()
         self.collection = Collection.objects.get(id=171)
         self.ignored_document = DocumentFactory.create(collection=self.collection, pipeline={})
+        # Documents from fixtures don't get upserted, so they get a metadata state like an upsert would give them
+        completed_ids = self.collection.documents.filter(pipeline__metadata__success=True).values_list("id", flat=True)
+        PipelineState.objects.bulk_create([
+            PipelineState(document_id=document_id, phase="metadata", status=PipelineState.Status.SUCCESS)
+            for document_id in completed_ids
+        ])
 
     @patch("core.models.resources.basic.HttpTikaResource._send")
     def test_synchronous_tika_pipeline(self, send_mock):
@@ -65,6 +71,56 @@ class TestHttpPipelineProcessor(TestCase):
 
         self.assertEqual(send_mock.call_count, 2, "Expected one erroneous resource to retry and one new resource")
 
+    @patch("core.models.resources.basic.HttpTikaResource._send")
+    def test_pipeline_states(self, send_mock):
+        processor = HttpPipelineProcessor({
+            "pipeline_app_label": "core",
+            "pipeline_phase": "tika",
+            "pipeline_depends_on": "metadata",
+            "batch_size": 5,
+            "asynchronous": False,
+            "retrieve_data": {
+                "resource": "core.httptikaresource",
+                "method": "put",
+                "args": ["$.url"],
+                "kwargs": {},
+            },
+            "contribute_data": {
+                "objective": {
+                    "@": "$.0",
+                    "text": "$.X-TIKA:content"
+                }
+            }
+        })
+        queryset = self.collection.documents.exclude(properties__url=None)
+        processor(queryset)
+        self.assertFalse(PipelineState.objects.filter(document=self.ignored_document).exists(),
+                         "Expected documents without complete metadata phase to not get scheduled")
+        self.assertFalse(
+            PipelineState.objects.filter(phase="tika", attempts__gt=0).exclude(document__in=queryset).exists(),
+            "Expected documents outside of the queryset to not get picked"
+        )
+        states = PipelineState.objects.filter(phase="tika", document__in=queryset)
+        self.assertFalse(states.filter(status__in=[PipelineState.Status.PENDING, PipelineState.Status.PROCESSING]))
+        for state in states:
+            self.assertEqual(state.attempts, 1)
+            if state.status == PipelineState.Status.FAILED:
+                self.assertGreater(state.next_attempt_at, state.modified_at, "Expected failures to retry later")
+        # Phases that depend on this phase only get scheduled for Documents that succeeded
+        PipelineState.objects.schedule("dependent", "tika", [self.collection])
+        self.assertEqual(
+            set(PipelineState.objects.filter(phase="dependent").values_list("document_id", flat=True)),
+            set(states.filter(status=PipelineState.Status.SUCCESS).values_list("document_id", flat=True))
+        )
+        # Processing again should skip all Documents that succeeded or that should retry later
+        batch_count = Batch.objects.count()
+        processor(queryset)
+        self.assertEqual(Batch.objects.count(), batch_count)
+        # Documents that lose their state, because they changed, get scheduled and processed again
+        PipelineState.objects.filter(phase="tika").delete()
+        processor(queryset, collections=[self.collection])
+        self.assertEqual(Batch.objects.count(), batch_count * 2)
+
     @patch("core.processors.pipeline.base.chord", return_value=chord_mock_result)
     def test_asynchronous_pipeline(self, chord_mock):
         """
@@ -1,13 +1,14 @@
 from unittest.mock import patch
-from datetime import timedelta
+from datetime import datetime, timedelta
 from time import sleep
 
 from django.test import TestCase
+from django.utils.timezone import make_aware
 
 from core.tests.factories import (DatasetFactory, DatasetVersionFactory, CollectionFactory, DocumentFactory,
-                                  ElasticIndexFactory)
+                                  ElasticIndexFactory, HarvestFactory, HarvestSourceFactory)
 from core.tests.mocks import get_search_client_mock
-from core.models import ElasticIndex
+from core.models import ElasticIndex, DocumentChange
 from core.tasks import sync_indices
 
 
@@ -70,22 +71,36 @@ class TestSyncIndices(TestCase):
             "secondary": DatasetFactory.create(name="secondary"),
             "primary": DatasetFactory.create(name="primary"),
         }
+        for spec in ["edusources", "wikiwijs"]:
+            HarvestFactory.create(dataset=datasets["primary"], source=HarvestSourceFactory.create(spec=spec))
         self.pushed_ats = {}
+        self.current_version = None
         for dataset_type, dataset in datasets.items():
             dataset_versions = create_dataset_data(dataset)
             for dataset_version in dataset_versions:
                 pushed_at = create_dataset_version_indices(dataset_version)
                 self.pushed_ats[dataset_version.id] = pushed_at
+            if dataset_type == "primary":
+                self.current_version = dataset_versions[0]
         sleep(3)
 
+    def record_changes(self):
+        references = {"5be6dfeb-b9ad-41a8-b4f5-94b9438e4257"}
+        for document in self.current_version.document_set.all():
+            if document.get_language() != "nl":
+                references.add(document.reference)
+        DocumentChange.objects.record(references)
+
     @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
     @patch("core.models.search.index.streaming_bulk")
     def test_sync_indices(self, streaming_bulk_mock, get_search_client_mock):
+        self.record_changes()
         sync_indices()
         # Check if data was send to search engine
+        self.assertEqual(streaming_bulk_mock.call_count, 3, "Expected a single push for each language")
         for args, kwargs in streaming_bulk_mock.call_args_list:
             client, docs = args
-            index_name, version, version_id, language = kwargs["index"].split("-")
+            index_name, version, version_id, site, language = kwargs["index"].split("-")
             if language == "nl":
                 self.assertEqual(
                     len(list(docs)), 2,
@@ -109,12 +124,92 @@ class TestSyncIndices(TestCase):
         for index in ElasticIndex.objects.exclude(name__contains="primary-0.0.2"):
             self.assertEqual(index.pushed_at, self.pushed_ats[index.dataset_version_id],
                              "Only the latest DatasetVersions of the newest Dataset should get pushed")
+        # Check that the change log got drained
+        self.assertEqual(DocumentChange.objects.count(), 0)
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    def test_sync_indices_batches(self, streaming_bulk_mock, get_search_client_mock):
+        self.record_changes()
+        self.record_changes()  # duplicate changes should get combined within a batch
+        with patch("core.models.datatypes.document.Document.to_search", autospec=True,
+                   side_effect=lambda document: iter([{"_id": document.reference}])) as to_search_mock:
+            sync_indices(batch_size=1000)
+        self.assertEqual(to_search_mock.call_count, 6, "Expected every Document to get serialized once")
+        self.assertEqual(streaming_bulk_mock.call_count, 3)
+        self.assertEqual(DocumentChange.objects.count(), 0)
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    def test_sync_indices_collection_update(self, streaming_bulk_mock, get_search_client_mock):
+        collection = self.current_version.collection_set.get(name="edusources")
+        document = collection.document_set.get(reference="5be6dfeb-b9ad-41a8-b4f5-94b9438e4257")
+        seed = dict(document.properties)
+        seed["title"] = "Updated title"
+        collection.update([seed], "external_id")
+        self.assertEqual(DocumentChange.objects.count(), 1)
+        change = DocumentChange.objects.last()
+        self.assertEqual(change.reference, "5be6dfeb-b9ad-41a8-b4f5-94b9438e4257")
+        self.assertEqual(change.operation, DocumentChange.Operations.UPSERT)
+        self.assertEqual(change.language, "nl")
+        sync_indices()
+        self.assertEqual(streaming_bulk_mock.call_count, 1, "Expected only the nl index to receive documents")
+        args, kwargs = streaming_bulk_mock.call_args
+        client, docs = args
+        titles = sorted([doc["title"] for doc in docs])
+        self.assertEqual(titles, ["Updated title", "Zorgwekkend gedrag"])
+        self.assertEqual(DocumentChange.objects.count(), 0)
 
     @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
     @patch("core.models.search.index.streaming_bulk")
     def test_sync_indices_new(self, streaming_bulk_mock, get_search_client_mock):
+        self.record_changes()
         ElasticIndex.objects.update(pushed_at=None)  # this makes all indices look like they're just created
         sync_indices()
         self.assertEqual(streaming_bulk_mock.call_count, 0)
         for index in ElasticIndex.objects.all():
             self.assertIsNone(index.pushed_at)
+        self.assertEqual(DocumentChange.objects.count(), 5, "Expected changes to wait for indices to get pushed")
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    def test_sync_indices_without_indices(self, streaming_bulk_mock, get_search_client_mock):
+        self.record_changes()
+        ElasticIndex.objects.all().delete()
+        sync_indices()
+        self.assertEqual(streaming_bulk_mock.call_count, 0)
+        self.assertEqual(DocumentChange.objects.count(), 0, "Expected changes to get drained without any indices")
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    def test_sync_indices_after_full_push(self, streaming_bulk_mock, get_search_client_mock):
+        self.record_changes()
+        sleep(1)
+        pushed_at = make_aware(datetime.now())
+        ElasticIndex.objects.filter(dataset_version=self.current_version).update(pushed_at=pushed_at)
+        self.current_version.set_current()
+        self.assertEqual(DocumentChange.objects.count(), 0,
+                         "Expected changes from before the full push to get truncated when the version became current")
+        DocumentChange.objects.record(["5be6dfeb-b9ad-41a8-b4f5-94b9438e4257"])
+        sync_indices()
+        self.assertEqual(streaming_bulk_mock.call_count, 1, "Expected only changes after the full push to get pushed")
+        self.assertEqual(DocumentChange.objects.count(), 0)
+
+    @patch("core.models.search.index.get_opensearch_client", return_value=search_client)
+    @patch("core.models.search.index.streaming_bulk")
+    def test_sync_indices_deleted(self, streaming_bulk_mock, get_search_client_mock):
+        DocumentChange.objects.record(["deleted:en"], operation=DocumentChange.Operations.DELETE, language="en")
+        DocumentChange.objects.record(["deleted:unknown"], operation=DocumentChange.Operations.DELETE)
+        DocumentChange.objects.record(["missing:upsert"], language="en")
+        sync_indices()
+        self.assertEqual(streaming_bulk_mock.call_count, 3)
+        for args, kwargs in streaming_bulk_mock.call_args_list:
+            client, docs = args
+            language = kwargs["index"].split("-")[-1]
+            expected_ids = ["deleted:en", "deleted:unknown"] if language == "en" else ["deleted:unknown"]
+            self.assertEqual(
+                list(docs),
+                [{"_id": _id, "_op_type": "delete"} for _id in expected_ids],
+                "Expected deletes to go to the recorded language or all languages, but no upserts without Document"
+            )
+        self.assertEqual(DocumentChange.objects.count(), 0)
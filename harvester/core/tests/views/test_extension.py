@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils.timezone import now
 
-from core.models import Document, Extension
+from core.models import Document, Extension, DocumentChange
 
 
 class TestExtensionAPI(TestCase):
@@ -210,6 +210,8 @@ class TestExtensionAPI(TestCase):
         document = Document.objects.get(reference=external_id)
         self.assertGreater(document.modified_at, datetime_begin_test,
                            "Expected modified_at of document to get updated")
+        self.assertTrue(DocumentChange.objects.filter(reference=external_id).exists(),
+                        "Expected a change to get recorded for syncing the search engine")
 
     def test_state_addition(self):
         external_id = "custom-extension"
@@ -294,6 +296,12 @@ class TestExtensionAPI(TestCase):
         document = Document.objects.get(reference=external_id)
         self.assertGreater(document.modified_at, datetime_begin_test,
                            "Expected modified_at of document to get updated")
+        self.assertEqual(
+            set(DocumentChange.objects.filter(operation=DocumentChange.Operations.DELETE)
+                .values_list("reference", flat=True)),
+            {addition_external_id, external_id},
+            "Expected deletes to get recorded for syncing the search engine"
+        )
         external_id = "does-not-exist"
         response = self.client.delete(f"/api/v1/extension/{external_id}/", content_type="application/json")
         self.assertEqual(response.status_code, 404)
@@ -1,7 +1,13 @@
 import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
+from django.db import connections
 from django.db.models import Count
 from django.db.transaction import atomic
+from datagrowth.exceptions import DGResourceException
+from datagrowth.resources.http.tasks import get_resource_link
 
 from core.models import Harvest, Batch, ProcessResult
 
@@ -36,3 +42,84 @@ def prepare_harvest(dataset, reset=False):
             logged_result_types.add(process_result.result_type)
     # Delete all batches that have been processed fully
     Batch.objects.annotate(doc_count=Count("documents")).filter(doc_count=0).delete()
+
+
+def get_harvest_politeness(repository):
+    """
+    Returns the politeness settings for a repository resource, falling back to the default settings.
+    """
+    politeness = dict(settings.HARVEST_POLITENESS["default"])
+    politeness.update(settings.HARVEST_POLITENESS.get(repository, {}))
+    return politeness
+
+
+def _call_in_thread(function, item):
+    try:
+        return function(item)
+    finally:
+        # Every thread gets its own database connection, which needs to be closed when the thread is done
+        connections.close_all()
+
+
+def harvest_in_parallel(function, items, max_workers):
+    """
+    Calls function for every item using a pool of threads and returns the results in the order of items.
+    When only one worker is needed the function gets called for every item in the current thread instead.
+    Any exception raised by the function gets raised after all other calls have finished.
+    """
+    items = list(items)
+    max_workers = min(max_workers, len(items))
+    if max_workers <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_call_in_thread, function, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def _send_request(config, session, method, request, args, kwargs):
+    link = get_resource_link(config, session)
+    link.request = request
+    link.interval_duration = config.interval_duration
+    try:
+        link = link.send(method, *args, **kwargs)
+        link.close()
+        return link, True
+    except DGResourceException as exc:
+        logger.debug(exc)
+        link = exc.resource
+        link.close()
+        return link, False
+
+
+def send_concurrently(*args, config, method, max_workers=1, **kwargs):
+    """
+    Works like the send task from Datagrowth, but fetches continuation requests of a resource concurrently,
+    when the first response of the resource indicates which continuation requests remain.
+    Concurrent requests share a single HTTP session and at most max_workers requests are made at the same time.
+    Afterwards any further continuation requests get made one at a time, like the send task does.
+    """
+    session = requests.Session()
+    limit = config.continuation_limit or 1
+    link, is_success = _send_request(config, session, method, {}, args, kwargs)
+    results = [(link, is_success)]
+
+    remaining_requests = link.create_remaining_requests() if hasattr(link, "create_remaining_requests") else None
+    if remaining_requests:
+        remaining_requests = remaining_requests[:limit - len(results)]
+        results += harvest_in_parallel(
+            lambda request: _send_request(config, session, method, request, args, kwargs),
+            remaining_requests,
+            max_workers
+        )
+        link, is_success = results[-1]
+
+    while len(results) < limit:
+        next_request = link.create_next_request()
+        if not next_request:
+            break
+        link, is_success = _send_request(config, session, method, next_request, args, kwargs)
+        results.append((link, is_success))
+
+    success = [link.id for link, is_success in results if is_success]
+    errors = [link.id for link, is_success in results if not is_success]
+    return [success, errors]
@@ -0,0 +1,124 @@
+from queue import Queue
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+
+_END_OF_FEED = object()
+
+
+class SynchronizedIterator(object):
+    """
+    Wraps an iterable to allow multiple threads to pull items from it at the same time.
+    """
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.lock = Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.lock:
+            return next(self.iterator)
+
+
+class IndexFeed(object):
+    """
+    A bounded queue of search documents for a single ElasticIndex that can be iterated by streaming_bulk.
+    Iteration blocks until documents arrive and stops when the producer signals the end of the feed.
+    """
+
+    def __init__(self, index, queue_size):
+        self.index = index
+        self.queue = Queue(maxsize=queue_size)
+        self.count = 0
+        self.is_finished = False
+
+    def put(self, search_document):
+        self.count += 1
+        self.queue.put(search_document)
+
+    def close(self):
+        self.queue.put(_END_OF_FEED)
+
+    def __iter__(self):
+        while True:
+            search_document = self.queue.get()
+            if search_document is _END_OF_FEED:
+                self.is_finished = True
+                return
+            yield search_document
+
+    def drain(self):
+        # Keeps consuming documents so that the producer never blocks on a queue nobody reads from
+        if not self.is_finished:
+            for _ in self:
+                pass
+
+
+def _push_feed(feed, bulk_options):
+    try:
+        return feed.index.stream_push(feed, **bulk_options)
+    finally:
+        feed.drain()
+
+
+def push_simultaneously(indices_by_language, documents_by_language, **bulk_options):
+    """
+    Pushes documents to multiple ElasticIndex instances at the same time, using a thread for each index.
+    The indices should have been prepared for the push using ElasticIndex.prepare_push.
+    Any keyword arguments are passed on to ElasticIndex.stream_push.
+
+    Returns errors per language.
+    """
+    with ThreadPoolExecutor(max_workers=len(indices_by_language)) as executor:
+        futures = {
+            language: executor.submit(index.stream_push, documents_by_language.get(language, []), **bulk_options)
+            for language, index in indices_by_language.items()
+        }
+        return {
+            language: future.result()
+            for language, future in futures.items()
+        }
+
+
+def push_streaming(indices_by_language, search_documents, recreate=True, queue_size=500, **bulk_options):
+    """
+    Pushes (language, search_document) tuples to the ElasticIndex for the language of each document.
+    Every index gets pushed to from its own thread, while documents get routed on the fly by the calling thread.
+    Only a few chunks per index are kept in memory at any time.
+    The indices should have been prepared for the push using ElasticIndex.prepare_push.
+    Any other keyword arguments are passed on to ElasticIndex.stream_push.
+
+    Returns errors and document counts per language.
+    """
+    feeds = {
+        language: IndexFeed(index, queue_size)
+        for language, index in indices_by_language.items()
+    }
+    with ThreadPoolExecutor(max_workers=len(feeds)) as executor:
+        futures = {
+            language: executor.submit(_push_feed, feed, bulk_options)
+            for language, feed in feeds.items()
+        }
+        try:
+            for language, search_document in search_documents:
+                if recreate and search_document.get("_op_type", None) == "delete":
+                    continue
+                feed = feeds.get(language, None)
+                if feed is None:
+                    continue
+                feed.put(search_document)
+        finally:
+            for feed in feeds.values():
+                feed.close()
+        errors = {
+            language: future.result()
+            for language, future in futures.items()
+        }
+    counts = {
+        language: feed.count
+        for language, feed in feeds.items()
+    }
+    return errors, counts
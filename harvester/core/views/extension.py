@@ -6,7 +6,7 @@ from rest_framework.exceptions import ValidationError
 
 from datagrowth.datatypes.views import DocumentBaseSerializer
 from harvester.schema import HarvesterSchema
-from core.models import Extension, Document
+from core.models import Extension, Document, DocumentChange
 
 from search_client.serializers import PersonSerializer, OrganisationSerializer, ProjectSerializer, LabelSerializer
 
@@ -120,6 +120,7 @@ class ExtensionSerializer(DocumentBaseSerializer, ExtensionPropertiesSerializer)
         })
         if not is_addition:
             Document.objects.filter(reference=external_id).update(modified_at=now(), extension=extension)
+        DocumentChange.objects.record([external_id], language=validated_data.get("language", None))
         return extension
 
     def update(self, instance, validated_data):
@@ -128,7 +129,12 @@ class ExtensionSerializer(DocumentBaseSerializer, ExtensionPropertiesSerializer)
             Document.objects.filter(reference=validated_data["external_id"]).update(modified_at=now())
         instance.properties.update(validated_data)
         instance.save()
-        return super().update(instance, validated_data)
+        extension = super().update(instance, validated_data)
+        DocumentChange.objects.record(
+            [instance.properties["external_id"]],
+            language=instance.properties.get("language", None)
+        )
+        return extension
 
     class Meta:
         model = Extension
@@ -252,4 +258,6 @@ class ExtensionDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         Document.objects.filter(reference=kwargs["external_id"]).update(modified_at=now())
-        return super().destroy(request, *args, **kwargs)
+        response = super().destroy(request, *args, **kwargs)
+        DocumentChange.objects.record([kwargs["external_id"]], operation=DocumentChange.Operations.DELETE)
+        return response
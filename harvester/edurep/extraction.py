@@ -3,16 +3,30 @@ import re
 from hashlib import sha1
 from mimetypes import guess_type
 
+from lxml import etree
 from vobject.base import ParseError, readOne
 from core.constants import HIGHER_EDUCATION_LEVELS
 from dateutil.parser import parse as date_parser
 from django.conf import settings
 from django.utils.text import slugify
 
+from harvester.utils.extraction import cache_per_record
+from harvester.utils.oaipmh import OAIPMH_NAMESPACE, OAIPMH_EXTERNAL_ID, OAIPMH_RECORD_STATE
+
 
 logger = logging.getLogger("harvester")
 
 
+EDUREP_NAMESPACES = {
+    "oai": OAIPMH_NAMESPACE,
+    "czp": "http://www.imsglobal.org/xsd/imsmd_v1p2"
+}
+
+
+def xpath(path):
+    return etree.XPath(path, namespaces=EDUREP_NAMESPACES)
+
+
 class EdurepDataExtraction(object):
 
     youtube_regex = re.compile(r".*(youtube\.com|youtu\.be).*", re.IGNORECASE)
@@ -20,6 +34,46 @@ class EdurepDataExtraction(object):
                               re.IGNORECASE)
     cc_code_regex = re.compile(r"^cc([ \-][a-z]{2})+$", re.IGNORECASE)
 
+    #############################
+    # SELECTORS
+    #############################
+
+    first_langstring = xpath("(.//czp:langstring)[1]")
+    first_value_langstring = xpath("(.//czp:value)[1]/descendant::czp:langstring[1]")
+    title = xpath("(.//czp:title)[1]")
+    language = xpath("(.//czp:language)[1]")
+    keywords = xpath(".//czp:keyword")
+    description = xpath("(.//czp:description)[1]")
+    formats = xpath(".//czp:format")
+    locations = xpath(".//czp:location")
+    learning_resource_types = xpath(".//czp:learningresourcetype")
+    copyright_and_other_restrictions = xpath("(.//czp:copyrightandotherrestrictions)[1]")
+    aggregation_level = xpath("(.//czp:aggregationlevel)[1]")
+    educational_contexts = xpath("(.//czp:educational)[1]//czp:context")
+    rights = xpath("(.//czp:rights)[1]")
+    role_contribution = xpath("(.//text()[. = $role])[1]/ancestor::czp:contribute[1]")
+    classification_blocks = {
+        "czp:entry": xpath(".//text()[. = $classification_type]/ancestor::czp:classification[1]//czp:entry"),
+        "czp:id": xpath(".//text()[. = $classification_type]/ancestor::czp:classification[1]//czp:id"),
+    }
+
+    @staticmethod
+    def get_text(node):
+        return "".join(node.itertext())
+
+    @staticmethod
+    def find(selector, el, **variables):
+        nodes = selector(el, **variables)
+        return nodes[0] if nodes else None
+
+    @classmethod
+    def get_langstring(cls, node):
+        return cls.get_text(cls.find(cls.first_langstring, node))
+
+    @classmethod
+    def get_value_langstring(cls, node):
+        return cls.get_text(cls.find(cls.first_value_langstring, node))
+
     #############################
     # OAI-PMH
     #############################
@@ -43,7 +97,7 @@ class EdurepDataExtraction(object):
 
     @classmethod
     def parse_vcard_element(cls, el, record):
-        card = "\n".join(field.strip() for field in el.text.strip().split("\n"))
+        card = "\n".join(field.strip() for field in cls.get_text(el).strip().split("\n"))
         try:
             return readOne(card)
         except ParseError:
@@ -51,44 +105,33 @@ class EdurepDataExtraction(object):
             logger.warning(f"Can't parse vCard for material with id: {external_id}")
             return
 
-    @classmethod
-    def get_oaipmh_records(cls, soup):
-        return soup.find_all('record')
-
     @classmethod
     def get_oaipmh_external_id(cls, soup, el):
-        return el.find('identifier').text.strip()
+        return OAIPMH_EXTERNAL_ID(el)
 
     @classmethod
     def get_oaipmh_record_state(cls, soup, el):
-        header = el.find('header')
-        return header.get("status", "active")
+        return OAIPMH_RECORD_STATE(el)
 
     #############################
     # GENERIC
     #############################
 
-    @staticmethod
-    def find_all_classification_blocks(element, classification_type, output_type):
+    @classmethod
+    def find_all_classification_blocks(cls, element, classification_type, output_type):
         assert output_type in ["czp:entry", "czp:id"]
-        entries = element.find_all(string=classification_type)
-        blocks = []
-        for entry in entries:
-            classification_element = entry.find_parent('czp:classification')
-            if not classification_element:
-                continue
-            blocks += classification_element.find_all(output_type)
-        return blocks
+        return cls.classification_blocks[output_type](element, classification_type=classification_type)
 
     @classmethod
+    @cache_per_record
     def get_files(cls, soup, el):
         default_copyright = cls.get_copyright(soup, el)
         default_access_rights = "ClosedAccess"
         access_rights_blocks = cls.find_all_classification_blocks(el, "access rights", "czp:id")
         if len(access_rights_blocks):
-            default_access_rights = access_rights_blocks[0].text.strip()
-        mime_types = el.find_all('czp:format')
-        urls = el.find_all('czp:location')
+            default_access_rights = cls.get_text(access_rights_blocks[0]).strip()
+        mime_types = cls.formats(el)
+        urls = cls.locations(el)
         return [
             {
                 "mime_type": mime_type,
@@ -99,13 +142,14 @@ class EdurepDataExtraction(object):
                 "access_rights": default_access_rights
             }
             for mime_type, url, title in zip(
-                [mime_node.text.strip() for mime_node in mime_types],
-                [url_node.text.strip() for url_node in urls],
+                [cls.get_text(mime_node).strip() for mime_node in mime_types],
+                [cls.get_text(url_node).strip() for url_node in urls],
                 [f"URL {ix+1}" for ix, mime_node in enumerate(mime_types)],
             )
         ]
 
     @classmethod
+    @cache_per_record
     def get_url(cls, soup, el):
         files = cls.get_files(soup, el)
         if not len(files):  # happens when a record was deleted
@@ -126,38 +170,38 @@ class EdurepDataExtraction(object):
 
     @classmethod
     def get_title(cls, soup, el):
-        node = el.find('czp:title')
+        node = cls.find(cls.title, el)
         if node is None:
             return
-        translation = node.find('czp:langstring')
-        return translation.text.strip() if translation else None
+        translation = cls.find(cls.first_langstring, node)
+        return cls.get_text(translation).strip() if translation is not None else None
 
     @classmethod
     def get_language(cls, soup, el):
-        node = el.find('czp:language')
-        return node.text.strip() if node else None
+        node = cls.find(cls.language, el)
+        return cls.get_text(node).strip() if node is not None else None
 
     @classmethod
+    @cache_per_record
     def get_keywords(cls, soup, el):
-        nodes = el.find_all('czp:keyword')
         return [
-            node.find('czp:langstring').text.strip()
-            for node in nodes
+            cls.get_langstring(node).strip()
+            for node in cls.keywords(el)
         ]
 
     @classmethod
     def get_description(cls, soup, el):
-        node = el.find('czp:description')
+        node = cls.find(cls.description, el)
         if node is None:
             return
-        translation = node.find('czp:langstring')
-        return translation.text if translation else None
+        translation = cls.find(cls.first_langstring, node)
+        return cls.get_text(translation) if translation is not None else None
 
     @classmethod
     def get_mime_type(cls, soup, el):
-        node = el.find('czp:format')
-        if node:
-            return node.text.strip()
+        node = cls.find(cls.formats, el)
+        if node is not None:
+            return cls.get_text(node).strip()
         url = cls.get_url(soup, el)
         if not url:
             return
@@ -173,40 +217,35 @@ class EdurepDataExtraction(object):
 
     @classmethod
     def get_material_types(cls, soup, el):
-        material_types = el.find_all('czp:learningresourcetype')
-        if not material_types:
-            return []
         return [
-            material_type.find('czp:value').find('czp:langstring').text.strip()
-            for material_type in material_types
+            cls.get_value_langstring(material_type).strip()
+            for material_type in cls.learning_resource_types(el)
         ]
 
     @classmethod
+    @cache_per_record
     def get_copyright(cls, soup, el):
-        node = el.find('czp:copyrightandotherrestrictions')
+        node = cls.find(cls.copyright_and_other_restrictions, el)
         if node is None:
             return "yes"
-        copyright = node.find('czp:value').find('czp:langstring').text.strip()
+        copyright = cls.get_value_langstring(node).strip()
         if copyright == "yes":
             copyright = cls.parse_copyright_description(cls.get_copyright_description(soup, el))
         return copyright or "yes"
 
     @classmethod
     def get_aggregation_level(cls, soup, el):
-        node = el.find('czp:aggregationlevel', None)
+        node = cls.find(cls.aggregation_level, el)
         if node is None:
             return None
-        return node.find('czp:value').find('czp:langstring').text.strip() if node else None
+        return cls.get_value_langstring(node).strip()
 
     @classmethod
     def get_authors(cls, soup, el):
-        author = el.find(string='author')
-        if not author:
-            return []
-        contribution = author.find_parent('czp:contribute')
-        if not contribution:
+        contribution = cls.find(cls.role_contribution, el, role="author")
+        if contribution is None:
             return []
-        nodes = contribution.find_all('czp:vcard')
+        nodes = contribution.iterfind(".//czp:vcard", EDUREP_NAMESPACES)
 
         authors = []
         for node in nodes:
@@ -252,41 +291,35 @@ class EdurepDataExtraction(object):
             return "HBO Verpleegkunde"
 
     @classmethod
+    @cache_per_record
     def get_publishers(cls, soup, el):
         publishers = []
-        publisher_element = el.find(string='publisher')
-        if not publisher_element:
+        contribution_element = cls.find(cls.role_contribution, el, role="publisher")
+        if contribution_element is None:
             return publishers
-        contribution_element = publisher_element.find_parent('czp:contribute')
-        if not contribution_element:
-            return publishers
-        nodes = contribution_element.find_all('czp:vcard')
+        nodes = contribution_element.iterfind(".//czp:vcard", EDUREP_NAMESPACES)
         for node in nodes:
             publisher = cls.parse_vcard_element(node, el)
             if hasattr(publisher, "fn"):
                 publishers.append(publisher.fn.value)
         return publishers
 
-    @staticmethod
-    def find_role_datetime(role):
-        if not role:
-            return
-        contribution = role.find_parent('czp:contribute')
-        if not contribution:
+    @classmethod
+    def find_role_datetime(cls, el, role):
+        contribution = cls.find(cls.role_contribution, el, role=role)
+        if contribution is None:
             return
-        datetime = contribution.find('czp:datetime')
-        if not datetime:
+        datetime = contribution.find(".//czp:datetime", EDUREP_NAMESPACES)
+        if datetime is None:
             return
-        return datetime.text.strip()
+        return cls.get_text(datetime).strip()
 
     @classmethod
     def get_publisher_date(cls, soup, el):
-        publisher = el.find(string='publisher')
-        publisher_datetime = cls.find_role_datetime(publisher)
+        publisher_datetime = cls.find_role_datetime(el, "publisher")
         if publisher_datetime:
             return publisher_datetime
-        provider = el.find(string='content provider')
-        provider_datetime = cls.find_role_datetime(provider)
+        provider_datetime = cls.find_role_datetime(el, "content provider")
         return provider_datetime
 
     @classmethod
@@ -299,22 +332,17 @@ class EdurepDataExtraction(object):
 
     @classmethod
     def get_lom_educational_levels(cls, soup, el):
-        educational = el.find('czp:educational')
-        if not educational:
-            return []
-        contexts = educational.find_all('czp:context')
-        if not contexts:
-            return []
         educational_levels = [
-            edu.find('czp:value').find('czp:langstring').text.strip()
-            for edu in contexts
+            cls.get_value_langstring(edu).strip()
+            for edu in cls.educational_contexts(el)
         ]
         return list(set(educational_levels))
 
     @classmethod
+    @cache_per_record
     def get_educational_levels(cls, soup, el):
         blocks = cls.find_all_classification_blocks(el, "educational level", "czp:entry")
-        return list(set([block.find('czp:langstring').text.strip() for block in blocks]))
+        return list(set([cls.get_langstring(block).strip() for block in blocks]))
 
     @classmethod
     def get_lowest_educational_level(cls, soup, el):
@@ -340,7 +368,7 @@ class EdurepDataExtraction(object):
     @classmethod
     def get_studies(cls, soup, el):
         blocks = cls.find_all_classification_blocks(el, "discipline", "czp:id")
-        return list(set([block.text.strip() for block in blocks]))
+        return list(set([cls.get_text(block).strip() for block in blocks]))
 
     @classmethod
     def get_ideas(cls, soup, el):
@@ -348,7 +376,7 @@ class EdurepDataExtraction(object):
         if not external_id.startswith("surfsharekit"):
             return []
         blocks = cls.find_all_classification_blocks(el, "idea", "czp:entry")
-        compound_ideas = list(set([block.find('czp:langstring').text.strip() for block in blocks]))
+        compound_ideas = list(set([cls.get_langstring(block).strip() for block in blocks]))
         ideas = []
         for compound_idea in compound_ideas:
             ideas += compound_idea.split(" - ")
@@ -381,11 +409,11 @@ class EdurepDataExtraction(object):
 
     @classmethod
     def get_copyright_description(cls, soup, el):
-        node = el.find('czp:rights')
-        if not node:
+        node = cls.find(cls.rights, el)
+        if node is None:
             return
-        description = node.find('czp:description')
-        return description.find('czp:langstring').text.strip() if description else None
+        description = cls.find(cls.description, node)
+        return cls.get_langstring(description).strip() if description is not None else None
 
 
 EDUREP_EXTRACTION_OBJECTIVE = {
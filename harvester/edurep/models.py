@@ -5,10 +5,11 @@ from django.conf import settings
 from django.db import models
 
 from datagrowth.configuration import create_config
-from datagrowth.processors import ExtractProcessor
 
 from core.models import HarvestHttpResource
-from edurep.extraction import EdurepDataExtraction, EDUREP_EXTRACTION_OBJECTIVE
+from harvester.utils.oaipmh import (OAIPMHExtractProcessor, OAIPMH_RECORD_TAG, OAIPMH_EXTERNAL_ID, OAIPMH_RECORD_STATE,
+                                    get_oaipmh_resumption_token, get_oaipmh_error_code)
+from edurep.extraction import EDUREP_EXTRACTION_OBJECTIVE
 
 
 logger = logging.getLogger("harvester")
@@ -25,18 +26,17 @@ class EdurepOAIPMHManager(models.Manager):
         )
 
         oaipmh_objective = {
-            "@": EdurepDataExtraction.get_oaipmh_records,
-            "external_id": EdurepDataExtraction.get_oaipmh_external_id,
-            "state": EdurepDataExtraction.get_oaipmh_record_state
+            "@": OAIPMH_RECORD_TAG,
+            "external_id": OAIPMH_EXTERNAL_ID,
+            "state": OAIPMH_RECORD_STATE
         }
         oaipmh_objective.update(EDUREP_EXTRACTION_OBJECTIVE)
         extract_config = create_config("extract_processor", {
             "objective": oaipmh_objective
         })
-        prc = ExtractProcessor(config=extract_config)
+        prc = OAIPMHExtractProcessor(config=extract_config)
 
-        results = []
-        for harvest in queryset:
+        for harvest in queryset.iterator(chunk_size=1):  # resources are large, so we load them one by one
             seed_resource = {
                 "resource": f"{harvest._meta.app_label}.{harvest._meta.model_name}",
                 "id": harvest.id,
@@ -45,10 +45,9 @@ class EdurepOAIPMHManager(models.Manager):
             try:
                 for seed in prc.extract_from_resource(harvest):
                     seed["seed_resource"] = seed_resource
-                    results.append(seed)
+                    yield seed
             except ValueError as exc:
                 logger.warning("Invalid XML:", exc, harvest.uri)
-        return results
 
 
 class EdurepOAIPMH(HarvestHttpResource):
@@ -62,13 +61,12 @@ class EdurepOAIPMH(HarvestHttpResource):
     }
 
     def next_parameters(self):
-        content_type, soup = self.content
-        resumption_token = soup.find("resumptiontoken")
-        if not resumption_token or not resumption_token.text:
+        resumption_token = get_oaipmh_resumption_token(self.body)
+        if not resumption_token:
             return {}
         return {
             "verb": "ListRecords",
-            "resumptionToken": resumption_token.text
+            "resumptionToken": resumption_token
         }
 
     def create_next_request(self):
@@ -81,20 +79,19 @@ class EdurepOAIPMH(HarvestHttpResource):
         return next_request
 
     def handle_errors(self):
-        content_type, soup = self.content
         # If there is no response at all we indicate a service not available
         # Note that the IP might be blocked by Edurep
-        if soup is None:
+        content_type = self.head.get("content-type", "unknown/unknown").split(";")[0] if self.success else None
+        if content_type not in ["text/xml", "application/xml"]:
             self.status = 503
             super().handle_errors()
             return
         # Edurep always responds with a 200, but it may contain an error tag
         # If not we're fine and done handling errors
-        error = soup.find("error")
-        if error is None:
+        status = get_oaipmh_error_code(self.body)
+        if status is None:
             return
         # If an error was found we translate it into an appropriate code
-        status = error["code"]
         if status == "badArgument":
             self.status = 400
         elif status == "noRecordsMatch":
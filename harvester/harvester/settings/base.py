@@ -241,6 +241,23 @@ OPENSEARCH_ENABLE_DECOMPOUND_ANALYZERS = environment.opensearch.enable_decompoun
 OPENSEARCH_DECOMPOUND_WORD_LISTS = environment.opensearch.decompound_word_lists
 OPENSEARCH_PASSWORD = environment.secrets.opensearch.password
 OPENSEARCH_ALIAS_PREFIX = environment.opensearch.alias_prefix
+OPENSEARCH_POOL_SIZE = environment.opensearch.pool_size  # connections kept alive per process
+# Bulk pushes get chunked by document count as well as request size.
+# Every chunk that gets rejected with a 429 status is retried with an exponential back-off (in seconds).
+OPENSEARCH_BULK_CHUNK_SIZE = 100
+OPENSEARCH_BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+OPENSEARCH_BULK_THREAD_COUNT = 1  # per index
+OPENSEARCH_BULK_MAX_RETRIES = 5
+OPENSEARCH_BULK_INITIAL_BACKOFF = 2
+OPENSEARCH_BULK_MAX_BACKOFF = 120
+
+
+# Search response cache
+# The search service stores responses in a Redis database that is shared with the harvester.
+# This allows the harvester to invalidate responses whenever indices change.
+# Locally nothing gets cached to prevent stale results while (test) indices get recreated.
+
+SEARCH_CACHE_REDIS_URL = f"redis://{environment.redis.host}/1" if MODE != "localhost" else None
 
 
 # Logging
@@ -578,3 +595,37 @@ SOURCES = {
         "api_key": environment.secrets.hanze.api_key
     },
 }
+
+
+# Harvesting
+# Repositories get harvested at the same time using threads.
+# The politeness per repository determines how many of its sets get harvested at the same time,
+# how many pages of a set may get requested at the same time when the total size of a set is known upfront
+# and how many milliseconds to wait between requests.
+
+HARVEST_METADATA_CONCURRENCY = 9
+HARVEST_POLITENESS = {
+    "default": {
+        "concurrent_sets": 1,
+        "concurrent_requests": 1,
+        "interval_duration": 0
+    },
+    "edurep.EdurepOAIPMH": {
+        "concurrent_sets": 2,
+        "interval_duration": 100
+    },
+    "sharekit.SharekitMetadataHarvest": {
+        "concurrent_sets": 2,
+        "concurrent_requests": 4,
+        "interval_duration": 0
+    },
+    "sources.HanzeResearchObjectResource": {
+        "concurrent_requests": 4
+    },
+    "sources.HvaPureResource": {
+        "concurrent_requests": 4
+    },
+    "sources.BuasPureResource": {
+        "concurrent_requests": 4
+    },
+}
@@ -1,4 +1,5 @@
 from copy import copy
+from functools import partial
 from invoke import Context
 
 from django.conf import settings
@@ -8,12 +9,23 @@ from django.contrib.sites.models import Site
 from core.constants import HarvestStages, Repositories
 from core.logging import HarvestLogger
 from core.models import Dataset, Harvest, DatasetVersion
-from core.utils.harvest import prepare_harvest
+from core.utils.harvest import prepare_harvest, harvest_in_parallel
 from core.constants import MINIMAL_EDUCATIONAL_LEVEL_BY_DOMAIN
 from harvester.celery import app
 from harvester.settings import environment
 
 
+def harvest_repository_metadata(dataset, repository):
+    try:
+        call_command("harvest_metadata", f"--dataset={dataset.name}", f"--repository={repository}")
+    except CommandError as exc:
+        logger = HarvestLogger(dataset, "harvest_task", {
+            "dataset": dataset.name,
+            "repository": repository
+        })
+        logger.error(str(exc))
+
+
 @app.task(name="harvest")
 def harvest(reset=False, no_promote=False, report_dataset_version=False):
 
@@ -24,21 +36,17 @@ def harvest(reset=False, no_promote=False, report_dataset_version=False):
     for dataset in Dataset.objects.filter(is_active=True):
         # Preparing dataset state and deletes old model instances
         prepare_harvest(dataset, reset=reset)
-        # First we call the commands that will query the repository interfaces
+        # First we call the commands that will query the repository interfaces, all repositories at the same time
         repositories = [
             Repositories.EDUREP, Repositories.SHAREKIT, Repositories.ANATOMY_TOOL,
             Repositories.HANZE, Repositories.HAN, Repositories.HKU, Repositories.GREENI, Repositories.HVA,
             Repositories.BUAS
         ]
-        for repository in repositories:
-            try:
-                call_command("harvest_metadata", f"--dataset={dataset.name}", f"--repository={repository}")
-            except CommandError as exc:
-                logger = HarvestLogger(dataset, "harvest_task", {
-                    "dataset": dataset.name,
-                    "repository": repository
-                })
-                logger.error(str(exc))
+        harvest_in_parallel(
+            partial(harvest_repository_metadata, dataset),
+            repositories,
+            settings.HARVEST_METADATA_CONCURRENCY
+        )
 
         # After getting all the metadata we'll download content
         call_command("harvest_basic_content", f"--dataset={dataset.name}", "--async")
@@ -48,7 +56,7 @@ def harvest(reset=False, no_promote=False, report_dataset_version=False):
         # Generate the thumbnails
         call_command("generate_previews", f"--dataset={dataset.name}", "--async")
         # Based on the dataset and site we push to search engine
-        index_command = ["index_dataset_version", f"--dataset={dataset.name}"]
+        index_command = ["index_dataset_version", f"--dataset={dataset.name}", "--bulk-build"]
         if no_promote or not dataset.is_latest:
             index_command += ["--no-promote"]
         if reset:
@@ -0,0 +1,47 @@
+from threading import current_thread, main_thread
+
+from django.test import SimpleTestCase, override_settings
+
+from core.utils.harvest import harvest_in_parallel, get_harvest_politeness
+
+
+def get_thread(item):
+    return item, current_thread() is main_thread()
+
+
+def fail_on_odd(item):
+    if item % 2:
+        raise ValueError(f"Odd item {item}")
+    return item
+
+
+class TestHarvestInParallel(SimpleTestCase):
+
+    def test_harvest_in_parallel(self):
+        results = harvest_in_parallel(get_thread, range(5), 3)
+        self.assertEqual([item for item, is_main in results], [0, 1, 2, 3, 4], "Expected results to keep item order")
+        self.assertFalse(any(is_main for item, is_main in results), "Expected items to get handled by threads")
+
+    def test_harvest_in_current_thread(self):
+        results = harvest_in_parallel(get_thread, [0], 3)
+        self.assertEqual(results, [(0, True)], "Expected a single item to get handled in the current thread")
+        results = harvest_in_parallel(get_thread, range(3), 1)
+        self.assertEqual(results, [(0, True), (1, True), (2, True)])
+
+    def test_harvest_in_parallel_errors(self):
+        with self.assertRaises(ValueError):
+            harvest_in_parallel(fail_on_odd, range(4), 2)
+
+    @override_settings(HARVEST_POLITENESS={
+        "default": {"concurrent_sets": 1, "interval_duration": 0},
+        "edurep.EdurepOAIPMH": {"interval_duration": 100}
+    })
+    def test_get_harvest_politeness(self):
+        self.assertEqual(get_harvest_politeness("edurep.EdurepOAIPMH"), {
+            "concurrent_sets": 1,
+            "interval_duration": 100
+        })
+        self.assertEqual(get_harvest_politeness("sharekit.SharekitMetadataHarvest"), {
+            "concurrent_sets": 1,
+            "interval_duration": 0
+        })
@@ -0,0 +1,60 @@
+import os
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from harvester.utils.oaipmh import (iterparse_elements, get_oaipmh_resumption_token, get_oaipmh_error_code,
+                                    OAIPMH_RECORD_TAG, OAIPMH_EXTERNAL_ID, OAIPMH_RECORD_STATE)
+
+
+def read_edurep_fixture(file_name):
+    with open(os.path.join(settings.BASE_DIR, "edurep", "fixtures", file_name)) as fixture_file:
+        return fixture_file.read()
+
+
+class TestOAIPMHUtils(SimpleTestCase):
+
+    def test_iterparse_records(self):
+        body = read_edurep_fixture("edurep-oaipmh.initial.0.xml")
+        records = [
+            (OAIPMH_EXTERNAL_ID(record), OAIPMH_RECORD_STATE(record),)
+            for record in iterparse_elements(body, OAIPMH_RECORD_TAG)
+        ]
+        self.assertEqual(len(records), 9)
+        self.assertEqual(
+            records[0],
+            ("surfsharekit:oai:surfsharekit.nl:3d2940a0-9573-412e-8fa2-067c55e2a72f", "deleted",)
+        )
+        self.assertEqual(
+            records[1],
+            ("surfsharekit:oai:surfsharekit.nl:5af0e26f-c4d2-4ddd-94ab-7dd0bd531751", "active",)
+        )
+
+    def test_iterparse_clears_records(self):
+        body = read_edurep_fixture("edurep-oaipmh.initial.0.xml")
+        previous = None
+        for record in iterparse_elements(body, OAIPMH_RECORD_TAG):
+            if previous is not None:
+                self.assertEqual(len(previous), 0)
+                preceding = list(record.itersiblings(preceding=True))
+                self.assertEqual(preceding, [previous], "Expected only the cleared previous record before record")
+            previous = record
+
+    def test_get_oaipmh_resumption_token(self):
+        body = read_edurep_fixture("edurep-oaipmh.initial.0.xml")
+        self.assertEqual(
+            get_oaipmh_resumption_token(body),
+            "c1576069959151499|u|f1970-01-01T00:00:00Z|mlom|ssurf"
+        )
+        body = read_edurep_fixture("edurep-oaipmh.initial.1.xml")
+        self.assertIsNone(get_oaipmh_resumption_token(body))
+        self.assertIsNone(get_oaipmh_resumption_token(""))
+
+    def test_get_oaipmh_error_code(self):
+        body = read_edurep_fixture("edurep-oaipmh.initial.0.xml")
+        self.assertIsNone(get_oaipmh_error_code(body))
+        body = '<?xml version="1.0" encoding="UTF-8"?>' \
+               '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">' \
+               '<error code="noRecordsMatch">No records</error>' \
+               '</OAI-PMH>'
+        self.assertEqual(get_oaipmh_error_code(body), "noRecordsMatch")
@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+
+from harvester.utils.extraction import cache_per_record, record_cache_disabled
+
+
+class CountingExtractor(object):
+
+    calls = 0
+
+    @classmethod
+    @cache_per_record
+    def get_title(cls, node):
+        cls.calls += 1
+        return node["title"]
+
+    @classmethod
+    @cache_per_record
+    def get_keywords(cls, node):
+        cls.calls += 1
+        return [{"keyword": keyword} for keyword in node["keywords"]]
+
+
+class TestCachePerRecord(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        CountingExtractor.calls = 0
+
+    def test_cache_per_record(self):
+        first = {"title": "first"}
+        second = {"title": "second"}
+        self.assertEqual(CountingExtractor.get_title(first), "first")
+        self.assertEqual(CountingExtractor.get_title(first), "first")
+        self.assertEqual(CountingExtractor.calls, 1)
+        self.assertEqual(CountingExtractor.get_title(second), "second")
+        self.assertEqual(CountingExtractor.calls, 2)
+        # Only the current record is kept, so moving back to a record computes again
+        self.assertEqual(CountingExtractor.get_title(first), "first")
+        self.assertEqual(CountingExtractor.calls, 3)
+
+    def test_record_cache_disabled(self):
+        record = {"title": "title"}
+        with record_cache_disabled():
+            CountingExtractor.get_title(record)
+            CountingExtractor.get_title(record)
+        self.assertEqual(CountingExtractor.calls, 2)
+
+    def test_cache_per_record_copies(self):
+        record = {"keywords": ["first"]}
+        keywords = CountingExtractor.get_keywords(record)
+        keywords.append({"keyword": "second"})
+        keywords[0]["keyword"] = "modified"
+        self.assertEqual(CountingExtractor.get_keywords(record), [{"keyword": "first"}],
+                         "Expected modifications by callers to not change cached values")
+        self.assertEqual(CountingExtractor.calls, 1)
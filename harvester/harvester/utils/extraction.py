@@ -1,10 +1,58 @@
 import logging
+from copy import deepcopy
+from functools import wraps
+from threading import local
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.apps import apps
 
 
 logger = logging.getLogger("harvester")
+_record_cache = local()
+
+
+def cache_per_record(method):
+    """
+    Decorates extraction methods to compute their value only once for every record.
+    The record (a JSON node or an XML element) should be the last positional argument of the method.
+    Values are kept until a cached method gets called with another record in the same thread.
+    Other arguments are part of the cache key, but objects that aren't strings or numbers are compared by identity.
+
+    Every caller gets its own copy of a cached value, because objectives may modify the values they receive.
+    """
+    @wraps(method)
+    def cached_method(*args):
+        if not getattr(_record_cache, "is_enabled", True):
+            return method(*args)
+        record = args[-1]
+        current = getattr(_record_cache, "current", None)
+        if current is None or current[0] is not record:
+            current = (record, {},)
+            _record_cache.current = current
+        key = (method,) + tuple(
+            arg if isinstance(arg, (str, int, float, type, type(None))) else id(arg)
+            for arg in args[:-1]
+        )
+        values = current[1]
+        if key not in values:
+            values[key] = method(*args)
+        return deepcopy(values[key])
+    return cached_method
+
+
+@contextmanager
+def record_cache_disabled():
+    """
+    Disables cache_per_record in the current thread. Useful for measuring the effect of the cache.
+    """
+    is_enabled = getattr(_record_cache, "is_enabled", True)
+    _record_cache.is_enabled = False
+    _record_cache.current = None
+    try:
+        yield
+    finally:
+        _record_cache.is_enabled = is_enabled
 
 
 def prepare_seed(seed):
@@ -18,9 +66,12 @@ def prepare_seed(seed):
         seed["state"] = "skipped"
 
 
-def get_harvest_seeds(repository, set_specification, latest_update, include_deleted=True, include_no_url=False):
+def iterate_harvest_seeds(repository, set_specification, latest_update, include_deleted=True,
+                          include_no_url=False):
     """
-    Extracts metadata from HarvestHttpResource
+    Extracts metadata from HarvestHttpResource and yields prepared seeds one by one.
+    Resources are read and extracted while seeds get consumed,
+    which means that only the seeds being processed by the caller need to be in memory.
 
     Currently supports Sharekit and Edurep
     More information on Edurep: https://developers.wiki.kennisnet.nl/index.php/Edurep:Hoofdpagina
@@ -31,18 +82,25 @@ def get_harvest_seeds(repository, set_specification, latest_update, include_dele
     else:
         results = RepositoryResource.objects.extract_seeds(latest_update)
 
-    seeds = []
     for seed in results:
         # In many cases it doesn't make sense to try and process files without a URL
         # So by default we skip these seeds,
         # but some seeds that group together materials do not have files/URLs and you can include these
         if seed["state"] == "active" and not seed["url"] and not include_no_url:
             continue
-        seeds.append(seed)
-    # Now we'll mark any invalid seeds as deleted to make sure they disappear
-    # Invalid seeds have a copyright or are of insufficient education level
-    for seed in seeds:
+        # Now we'll mark any invalid seeds as deleted to make sure they disappear
+        # Invalid seeds have a copyright or are of insufficient education level
         prepare_seed(seed)
-    # And we return the seeds based on whether to include deleted or not
-    return seeds if include_deleted else \
-        [result for result in seeds if result.get("state", "active") == "active"]
+        # And we yield the seeds based on whether to include deleted or not
+        if not include_deleted and seed.get("state", "active") != "active":
+            continue
+        yield seed
+
+
+def get_harvest_seeds(repository, set_specification, latest_update, include_deleted=True, include_no_url=False):
+    """
+    Returns all seeds from iterate_harvest_seeds as a list.
+    Use iterate_harvest_seeds when processing large sets.
+    """
+    return list(iterate_harvest_seeds(repository, set_specification, latest_update,
+                                      include_deleted=include_deleted, include_no_url=include_no_url))
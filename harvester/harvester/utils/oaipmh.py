@@ -0,0 +1,123 @@
+from io import BytesIO
+
+from lxml import etree
+from bs4 import BeautifulSoup
+
+from datagrowth.processors import ExtractProcessor
+
+
+OAIPMH_NAMESPACE = "http://www.openarchives.org/OAI/2.0/"
+OAIPMH_NAMESPACES = {
+    "oai": OAIPMH_NAMESPACE
+}
+OAIPMH_RECORD_TAG = f"{{{OAIPMH_NAMESPACE}}}record"
+OAIPMH_RESUMPTION_TOKEN_TAG = f"{{{OAIPMH_NAMESPACE}}}resumptionToken"
+OAIPMH_ERROR_TAG = f"{{{OAIPMH_NAMESPACE}}}error"
+
+
+def iterparse_elements(body, tags):
+    """
+    Parses an XML body incrementally and yields elements with the given tags one at a time.
+    Elements get cleared once the caller moves on to the next element,
+    so memory usage stays constant regardless of the size of the body.
+    """
+    if not body:
+        return
+    encoding = None
+    if isinstance(body, str):  # bodies are stored as text, so any encoding declaration no longer applies
+        body = body.encode("utf-8")
+        encoding = "utf-8"
+    elements = etree.iterparse(BytesIO(body), events=("end",), tag=tags, encoding=encoding, recover=True,
+                               huge_tree=True)
+    for event, element in elements:
+        yield element
+        element.clear(keep_tail=True)
+        parent = element.getparent()
+        while parent is not None and element.getprevious() is not None:
+            del parent[0]
+
+
+def find_oaipmh_element(body, tag):
+    # Records get passed through iterparse_elements to clear them while looking for the tag
+    for element in iterparse_elements(body, (OAIPMH_RECORD_TAG, tag,)):
+        if element.tag == tag:
+            return element
+
+
+def get_oaipmh_resumption_token(body):
+    resumption_token = find_oaipmh_element(body, OAIPMH_RESUMPTION_TOKEN_TAG)
+    if resumption_token is None or not resumption_token.text:
+        return
+    return resumption_token.text
+
+
+def get_oaipmh_error_code(body):
+    error = find_oaipmh_element(body, OAIPMH_ERROR_TAG)
+    if error is None:
+        return
+    return error.get("code")
+
+
+class RecordSelector(object):
+    """
+    A namespace aware XPath expression that gets compiled once and evaluated against the lxml element of a record.
+    Empty results get replaced by the default.
+    """
+
+    def __init__(self, path, default=None, namespaces=None):
+        self.path = path
+        self.default = default
+        self.xpath = etree.XPath(path, namespaces=namespaces or OAIPMH_NAMESPACES, smart_strings=False)
+
+    def __call__(self, element):
+        value = self.xpath(element)
+        return value if value else self.default
+
+    def __repr__(self):
+        return f"RecordSelector({self.path})"
+
+
+OAIPMH_EXTERNAL_ID = RecordSelector("normalize-space(oai:header/oai:identifier)")
+OAIPMH_RECORD_STATE = RecordSelector("string(oai:header/@status)", default="active")
+
+
+class OAIPMHExtractProcessor(ExtractProcessor):
+    """
+    Extracts OAI-PMH records one at a time from the body of a resource, without parsing the entire body at once.
+    The "@" of the objective should be the (namespaced) tag of the records.
+
+    Objective values that are a RecordSelector get evaluated against the lxml element of a record.
+    Other objective values should be methods that take a soup and el argument, like for the ExtractProcessor.
+    By default these methods receive None and the lxml element of the record.
+    When the "record_soup" configuration is True these methods receive a BeautifulSoup of the current record instead,
+    which allows extraction methods written for BeautifulSoup to work unchanged.
+    This is slow and only HAN and Greeni still need it, until their extraction gets ported to XPath.
+    """
+
+    @staticmethod
+    def get_record_soup(element):
+        soup = BeautifulSoup(etree.tostring(element, with_tail=False), "lxml")
+        return soup, soup.find("record")
+
+    def extract_from_resource(self, resource):
+        if not resource.success:
+            return []
+        return self.extract_records(resource.body)
+
+    def extract_records(self, body):
+        assert self.config.objective, \
+            "OAIPMHExtractProcessor.extract_records expects an objective to extract in the configuration."
+        record_soup = self.config.get("record_soup", False)
+        for element in iterparse_elements(body, self._at):
+            result = {}
+            soup, el = None, element
+            needs_soup = record_soup
+            for name, objective in self._objective.items():
+                if isinstance(objective, RecordSelector):
+                    result[name] = objective(element)
+                    continue
+                if needs_soup:
+                    soup, el = self.get_record_soup(element)
+                    needs_soup = False
+                result[name] = objective(soup, el)
+            yield result
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
 
 
 class MetadataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'metadata'
+
+    def ready(self):
+        from metadata.models import MetadataValue, MetadataField, MetadataTranslation, clear_metadata_tree_snapshots
+        from metadata.utils.normalization import clear_root_values
+        post_save.connect(clear_root_values, sender=MetadataValue, dispatch_uid="metadata_value_saved")
+        post_delete.connect(clear_root_values, sender=MetadataValue, dispatch_uid="metadata_value_deleted")
+        # Any change to metadata through the admin should be visible in the metadata tree
+        for model in [MetadataValue, MetadataField, MetadataTranslation]:
+            model_name = model.get_name()
+            post_save.connect(clear_metadata_tree_snapshots, sender=model,
+                              dispatch_uid=f"{model_name}_saved_tree_snapshots")
+            post_delete.connect(clear_metadata_tree_snapshots, sender=model,
+                                dispatch_uid=f"{model_name}_deleted_tree_snapshots")
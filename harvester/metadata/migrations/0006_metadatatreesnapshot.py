@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sites', '0002_alter_domain_unique'),
+        ('metadata', '0005_studyvocabularyresource'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetadataTreeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tree', models.JSONField(default=list)),
+                ('etag', models.CharField(max_length=40)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('site', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='sites.site')),
+            ],
+        ),
+    ]
@@ -2,3 +2,4 @@ from metadata.models.translation import MetadataTranslation, MetadataTranslation
 from metadata.models.value import MetadataValue, MetadataValueSerializer
 from metadata.models.field import MetadataField, MetadataFieldSerializer
 from metadata.models.study_vocabulary import StudyVocabularyResource
+from metadata.models.tree import MetadataTreeSnapshot, clear_metadata_tree_snapshots
@@ -4,6 +4,7 @@ from rest_framework import serializers
 
 from search.clients import get_opensearch_client
 from metadata.models import MetadataTranslation, MetadataTranslationSerializer, MetadataValueSerializer
+from metadata.models.value import get_max_children
 
 
 class MetadataFieldManager(models.Manager):
@@ -70,13 +71,13 @@ class MetadataFieldSerializer(serializers.ModelSerializer):
         return None
 
     def get_children(self, obj):
-        site_id = self.context["request"].GET.get("site_id", 1)
+        site_id = self.context["site_id"] if "site_id" in self.context else \
+            self.context["request"].GET.get("site_id", 1)
         children = obj.metadatavalue_set.filter(deleted_at__isnull=True, site__id=site_id) \
             .select_related("translation") \
             .get_cached_trees()
         children.sort(key=lambda child: child.frequency, reverse=True)
-        max_children = self.context["request"].GET.get("max_children", "")
-        max_children = int(max_children) if max_children else None
+        max_children = get_max_children(self.context)
         return MetadataValueSerializer(children, many=True, context=self.context).data[:max_children]
 
     def get_children_count(self, obj):
@@ -0,0 +1,68 @@
+import json
+from hashlib import sha1
+
+from django.db import models
+from django.contrib.sites.models import Site
+
+from metadata.models import MetadataField, MetadataFieldSerializer
+
+
+def truncate_children(nodes, max_children):
+    """
+    Returns a copy of serialized metadata nodes where every node has at most max_children children.
+    Children are already sorted by frequency, so this gives the same result as serializing with max_children.
+    """
+    return [
+        dict(node, children=truncate_children(node["children"][:max_children], max_children))
+        for node in nodes
+    ]
+
+
+class MetadataTreeSnapshotManager(models.Manager):
+
+    def build(self, site_id):
+        fields = MetadataField.objects.filter(is_hidden=False).select_related("translation")
+        context = {"site_id": site_id, "max_children": None}
+        tree = json.loads(json.dumps(MetadataFieldSerializer(fields, many=True, context=context).data))
+        etag = sha1(json.dumps(tree, sort_keys=True).encode("utf-8")).hexdigest()
+        if not Site.objects.filter(id=site_id).exists():
+            return self.model(site_id=site_id, tree=tree, etag=etag)
+        snapshot, created = self.update_or_create(site_id=site_id, defaults={"tree": tree, "etag": etag})
+        return snapshot
+
+    def get_or_build(self, site_id):
+        """
+        Returns the stored snapshot for a site or builds it when it doesn't exist.
+        The tree itself only gets loaded when it is accessed.
+        """
+        snapshot = self.defer("tree").filter(site_id=site_id).first()
+        if snapshot is None:
+            snapshot = self.build(site_id)
+        return snapshot
+
+
+class MetadataTreeSnapshot(models.Model):
+    """
+    Holds the serialized metadata tree for a site.
+    Serializing the tree from the MPTT tables takes hundreds of queries,
+    so it only happens after metadata changes and the result is served from here.
+    """
+
+    objects = MetadataTreeSnapshotManager()
+
+    site = models.OneToOneField(Site, on_delete=models.CASCADE)
+    tree = models.JSONField(default=list)
+    etag = models.CharField(max_length=40)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def get_tree(self, max_children=None):
+        if max_children is None:
+            return self.tree
+        return truncate_children(self.tree, max_children)
+
+    def __str__(self):
+        return f"{self.site} ({self.etag})"
+
+
+def clear_metadata_tree_snapshots(*args, **kwargs):
+    MetadataTreeSnapshot.objects.all().delete()
@@ -68,6 +68,16 @@ class MetadataValue(MPTTModel):
         unique_together = ("field", "value", "site",)
 
 
+def get_max_children(context):
+    """
+    Returns the max_children value from a serializer context or from the request in the context.
+    """
+    if "max_children" in context:
+        return context["max_children"]
+    max_children = context["request"].GET.get("max_children", "")
+    return int(max_children) if max_children else None
+
+
 class MetadataValueSerializer(serializers.ModelSerializer):
 
     children = serializers.SerializerMethodField()
@@ -80,8 +90,7 @@ class MetadataValueSerializer(serializers.ModelSerializer):
         if obj.is_leaf_node():
             return []
         children = sorted(obj.get_children(), key=lambda child: child.frequency, reverse=True)
-        max_children = self.context["request"].GET.get("max_children", "")
-        max_children = int(max_children) if max_children else None
+        max_children = get_max_children(self.context)
         return MetadataValueSerializer(children, many=True, context=self.context).data[:max_children]
 
     def get_children_count(self, obj):
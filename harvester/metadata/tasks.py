@@ -8,8 +8,9 @@ from celery import current_app as app
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.utils.notifications import send_admin_notification
 from core.constants import SITE_SHORTHAND_BY_DOMAIN
-from metadata.models import MetadataField, MetadataValue, MetadataTranslation
+from metadata.models import MetadataField, MetadataValue, MetadataTranslation, MetadataTreeSnapshot
 from metadata.utils.translate import fetch_eduterm_translations, fetch_edustandaard_translations, translate_with_deepl
+from metadata.utils.normalization import clear_root_values
 
 
 def _translate_metadata_value(field, value):
@@ -78,6 +79,7 @@ def sync_metadata(**kwargs):
         MetadataTranslation.objects.bulk_create(translation_inserts)
         MetadataValue.objects.bulk_create(metadata_inserts)
         MetadataValue.objects.rebuild()
+        clear_root_values()  # bulk operations and rebuilds don't send signals
         if metadata_inserts:
             has_metadata_inserts = True
 
@@ -89,3 +91,7 @@ def sync_metadata(**kwargs):
 
     in_30_days = now() + timedelta(days=30)
     MetadataValue.objects.filter(deleted_at__gte=in_30_days).delete()
+
+    # Precomputes the metadata tree, which counts frequencies across sites
+    for site in Site.objects.all():
+        MetadataTreeSnapshot.objects.build(site.id)
@@ -1,8 +1,10 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 
 from django.contrib.auth.models import User
 
-from metadata.models import MetadataField, MetadataValue
+from metadata.models import MetadataField, MetadataValue, MetadataTreeSnapshot
 
 
 class TestMetadataTreeView(TestCase):
@@ -59,3 +61,28 @@ class TestMetadataTreeView(TestCase):
         material_types = next(field for field in data if field["value"] == "material_types")
         material_type_document = next(child for child in material_types["children"] if child["value"] == "document")
         self.assertIsNotNone(material_type_document)
+
+    def test_metadata_tree_view_snapshot(self):
+        response = self.client.get("/api/v1/metadata/tree/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(MetadataTreeSnapshot.objects.count(), 1)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+        # Serving the tree from a snapshot shouldn't touch the metadata tables
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/v1/metadata/tree/?max_children=1")
+        for query in context.captured_queries:
+            self.assertNotIn("metadata_metadatavalue", query["sql"])
+            self.assertNotIn("metadata_metadatafield", query["sql"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        for field in response.json():
+            self.assertLessEqual(len(field["children"]), 1)
+        response = self.client.get("/api/v1/metadata/tree/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Changes to metadata should update the tree
+        MetadataValue.objects.filter(field__name="technical_type", value="document").first().delete()
+        self.assertEqual(MetadataTreeSnapshot.objects.count(), 0)
+        response = self.client.get("/api/v1/metadata/tree/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
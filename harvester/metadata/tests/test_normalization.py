@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from metadata.models import MetadataValue
+from metadata.utils.normalization import normalize_values, get_root_values, clear_root_values
+
+
+class TestNormalizeValues(TestCase):
+
+    fixtures = ["test-metadata-edusources"]
+
+    def setUp(self):
+        super().setUp()
+        clear_root_values()
+
+    def test_normalize_values(self):
+        normalized = normalize_values(
+            "learning_material_disciplines",
+            ["economie", "c001f86a-4f8f-4420-bd78-381c615ecedc", "aarde_milieu", "does-not-exist"]
+        )
+        self.assertEqual(normalized, {"economie_bedrijf", "aarde_milieu"})
+
+    def test_normalize_values_queries(self):
+        with self.assertNumQueries(1):
+            normalize_values("learning_material_disciplines", ["economie"])
+            normalize_values("learning_material_disciplines", ["aarde_milieu"])
+        with self.assertNumQueries(0):
+            normalize_values("learning_material_disciplines", ["economie"])
+
+    def test_invalidation(self):
+        self.assertEqual(get_root_values("learning_material_disciplines")["economie"], {"economie_bedrijf"})
+        economie = MetadataValue.objects.get(field__name="learning_material_disciplines", value="economie")
+        aarde_milieu = MetadataValue.objects.get(field__name="learning_material_disciplines", value="aarde_milieu")
+        economie.move_to(aarde_milieu)
+        economie.save()
+        self.assertEqual(get_root_values("learning_material_disciplines")["economie"], {"aarde_milieu"},
+                         "Expected saving a metadata value to invalidate the lookup table")
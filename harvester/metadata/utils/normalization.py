@@ -0,0 +1,45 @@
+from collections import defaultdict
+
+from metadata.models import MetadataValue
+
+
+_root_values_by_field = {}
+
+
+def load_root_values(field_name):
+    """
+    Creates a lookup table from metadata values to the values of their root nodes with a single query.
+    Values that exist for multiple sites may have multiple roots.
+    """
+    nodes = MetadataValue.objects.filter(field__name=field_name).values_list("value", "tree_id", "level")
+    roots = {
+        tree_id: value
+        for value, tree_id, level in nodes
+        if level == 0
+    }
+    root_values = defaultdict(set)
+    for value, tree_id, level in nodes:
+        root_values[value].add(roots.get(tree_id, value))
+    return dict(root_values)
+
+
+def get_root_values(field_name):
+    """
+    Returns the root values lookup table for a field.
+    The table gets loaded once per process and stays cached until clear_root_values gets called.
+    """
+    if field_name not in _root_values_by_field:
+        _root_values_by_field[field_name] = load_root_values(field_name)
+    return _root_values_by_field[field_name]
+
+
+def normalize_values(field_name, values):
+    root_values = get_root_values(field_name)
+    normalized = set()
+    for value in values:
+        normalized.update(root_values.get(value, []))
+    return normalized
+
+
+def clear_root_values(*args, **kwargs):  # can be used as a signal receiver
+    _root_values_by_field.clear()
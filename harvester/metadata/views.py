@@ -1,10 +1,14 @@
 from django.views.decorators.gzip import gzip_page
 from django.utils.decorators import method_decorator
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import generics
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
 from harvester.schema import HarvesterSchema
-from metadata.models import MetadataField, MetadataFieldSerializer, MetadataValue, MetadataValueSerializer
+from metadata.models import (MetadataField, MetadataFieldSerializer, MetadataValue, MetadataValueSerializer,
+                             MetadataTreeSnapshot)
 
 
 @method_decorator(gzip_page, name="dispatch")
@@ -46,12 +50,30 @@ class MetadataTreeView(generics.ListAPIView):
 
     **frequency**: How many results match this node in the entire dataset.
 
+    The tree gets computed after metadata changes. Responses include ETag and Last-Modified headers,
+    which can be used to make conditional requests.
+
     """
     queryset = MetadataField.objects.filter(is_hidden=False).select_related("translation")
     serializer_class = MetadataFieldSerializer
     schema = HarvesterSchema()
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        site_id = request.GET.get("site_id", 1)
+        max_children = request.GET.get("max_children", "")
+        max_children = int(max_children) if max_children else None
+        snapshot = MetadataTreeSnapshot.objects.get_or_build(site_id)
+        etag = f'"{snapshot.etag}-{max_children}"'
+        last_modified = int(snapshot.updated_at.timestamp()) if snapshot.updated_at else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = Response(snapshot.get_tree(max_children))
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
 
 @method_decorator(gzip_page, name="dispatch")
 class MetadataFieldValuesView(generics.ListAPIView):
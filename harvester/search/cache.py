@@ -0,0 +1,45 @@
+import logging
+from uuid import uuid4
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from django.conf import settings
+
+from search.clients import get_or_create_client
+
+
+logger = logging.getLogger("harvester")
+
+
+def get_search_cache():
+    """
+    Returns a Redis client for the search response cache or None when caching is disabled.
+    Only the search service caches responses. It stores them under keys that contain the generation token,
+    which the harvester replaces to invalidate responses. See surf.apps.core.cache in the service.
+    """
+    if not settings.SEARCH_CACHE_REDIS_URL:
+        return
+    return get_or_create_client(
+        ("search_cache", settings.SEARCH_CACHE_REDIS_URL,),
+        lambda: Redis.from_url(settings.SEARCH_CACHE_REDIS_URL)
+    )
+
+
+def _get_generation_key(alias_prefix):
+    return f"search:generation:{alias_prefix}"
+
+
+def invalidate_search_cache(alias_prefix):
+    """
+    Invalidates all cached search responses for aliases with the given prefix.
+    Old responses don't get deleted, but a new generation token makes sure they are no longer used.
+    They will expire on their own.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return
+    try:
+        cache.set(_get_generation_key(alias_prefix), uuid4().hex)
+    except RedisError as exc:
+        logger.warning(f"Failed to invalidate search cache for '{alias_prefix}': {exc}")
@@ -1,3 +1,7 @@
+import os
+from threading import Lock
+
+from requests.adapters import HTTPAdapter
 from opensearchpy import OpenSearch, RequestsHttpConnection
 
 from django.conf import settings
@@ -5,41 +9,94 @@ from django.conf import settings
 from search_client import SearchClient
 
 
+_clients = {}
+_clients_lock = Lock()
+
+
+def get_or_create_client(key, create_client):
+    """
+    Returns a client from a process wide registry and only creates the client when it is first needed.
+    Clients are registered per process id, because connection pools can't be shared between forked workers.
+    """
+    registry_key = (os.getpid(),) + tuple(key)
+    client = _clients.get(registry_key, None)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(registry_key, None)
+        if client is None:
+            for stale_key in [stale_key for stale_key in _clients.keys() if stale_key[0] != registry_key[0]]:
+                del _clients[stale_key]
+            client = create_client()
+            _clients[registry_key] = client
+    return client
+
+
+def clear_clients():
+    with _clients_lock:
+        _clients.clear()
+
+
+class PooledRequestsHttpConnection(RequestsHttpConnection):
+    """
+    Keeps connections alive in a pool with a configurable size.
+    The default requests pool holds 10 connections, which may be more or less than a worker is able to use.
+    """
+
+    def __init__(self, *args, pool_maxsize=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize or settings.OPENSEARCH_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
 def get_search_client(document_type=None, alias_prefix=None):
     document_type = document_type or settings.DOCUMENT_TYPE
-    kwargs = {}
-    if "amazonaws.com" in settings.OPENSEARCH_HOST:
-        kwargs["basic_auth"] = ("supersurf", settings.OPENSEARCH_PASSWORD,)
-        kwargs["verify_certs"] = settings.OPENSEARCH_VERIFY_CERTS
-    return SearchClient(
-        settings.OPENSEARCH_HOST,
-        document_type,
-        alias_prefix if alias_prefix else settings.OPENSEARCH_ALIAS_PREFIX,
-        search_results_key="results",
-        **kwargs
+    alias_prefix = alias_prefix if alias_prefix else settings.OPENSEARCH_ALIAS_PREFIX
+
+    def create_search_client():
+        kwargs = {}
+        if "amazonaws.com" in settings.OPENSEARCH_HOST:
+            kwargs["basic_auth"] = ("supersurf", settings.OPENSEARCH_PASSWORD,)
+            kwargs["verify_certs"] = settings.OPENSEARCH_VERIFY_CERTS
+        return SearchClient(
+            settings.OPENSEARCH_HOST,
+            document_type,
+            alias_prefix,
+            search_results_key="results",
+            **kwargs
+        )
+
+    return get_or_create_client(
+        ("search_client", settings.OPENSEARCH_HOST, document_type, alias_prefix,),
+        create_search_client
     )
 
 
 def get_opensearch_client():
 
-    opensearch_url = settings.OPENSEARCH_HOST
-    protocol_config = {}
-    if opensearch_url.startswith("https"):
-        protocol_config = {
-            "scheme": "https",
-            "port": 443,
-            "use_ssl": True,
-            "verify_certs": settings.OPENSEARCH_VERIFY_CERTS,
-        }
-
-    if settings.IS_AWS:
-        http_auth = ("supersurf", settings.OPENSEARCH_PASSWORD)
-    else:
-        http_auth = (None, None)
-
-    return OpenSearch(
-        [opensearch_url],
-        http_auth=http_auth,
-        connection_class=RequestsHttpConnection,
-        **protocol_config
-    )
+    def create_opensearch_client():
+        opensearch_url = settings.OPENSEARCH_HOST
+        protocol_config = {}
+        if opensearch_url.startswith("https"):
+            protocol_config = {
+                "scheme": "https",
+                "port": 443,
+                "use_ssl": True,
+                "verify_certs": settings.OPENSEARCH_VERIFY_CERTS,
+            }
+
+        if settings.IS_AWS:
+            http_auth = ("supersurf", settings.OPENSEARCH_PASSWORD)
+        else:
+            http_auth = (None, None)
+
+        return OpenSearch(
+            [opensearch_url],
+            http_auth=http_auth,
+            connection_class=PooledRequestsHttpConnection,
+            pool_maxsize=settings.OPENSEARCH_POOL_SIZE,
+            **protocol_config
+        )
+
+    return get_or_create_client(("opensearch", settings.OPENSEARCH_HOST,), create_opensearch_client)
@@ -10,6 +10,7 @@ from datagrowth.processors import ExtractProcessor
 from datagrowth.utils import reach
 
 from core.constants import HIGHER_EDUCATION_LEVELS
+from harvester.utils.extraction import cache_per_record
 
 
 class SharekitMetadataExtraction(ExtractProcessor):
@@ -34,6 +35,7 @@ class SharekitMetadataExtraction(ExtractProcessor):
         return access_rights
 
     @classmethod
+    @cache_per_record
     def get_files(cls, node):
         default_copyright = SharekitMetadataExtraction.get_copyright(node)
         files = node["attributes"].get("files", []) or []
@@ -167,10 +169,11 @@ class SharekitMetadataExtraction(ExtractProcessor):
         return consortium
 
     @classmethod
+    @cache_per_record
     def get_publishers(cls, node):
         publishers = node["attributes"].get("publishers", []) or []
-        if isinstance(publishers, str):
-            publishers = [publishers]
+        # Copies the publishers to never modify the record
+        publishers = [publishers] if isinstance(publishers, str) else list(publishers)
         keywords = node["attributes"].get("keywords", []) or []
         # Check HBOVPK tags
         hbovpk_keywords = [keyword for keyword in keywords if keyword and "hbovpk" in keyword.lower()]
@@ -187,6 +190,7 @@ class SharekitMetadataExtraction(ExtractProcessor):
         return publisher_datetime.year
 
     @classmethod
+    @cache_per_record
     def get_lom_educational_levels(cls, node):
         educational_levels = node["attributes"].get("educationalLevels", [])
         if not educational_levels:
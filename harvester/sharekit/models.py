@@ -25,8 +25,7 @@ class SharekitMetadataHarvestManager(models.Manager):
         })
         prc = SharekitMetadataExtraction(config=extract_config)
 
-        results = []
-        for harvest in queryset:
+        for harvest in queryset.iterator(chunk_size=1):  # resources are large, so we load them one by one
             seed_resource = {
                 "resource": f"{harvest._meta.app_label}.{harvest._meta.model_name}",
                 "id": harvest.id,
@@ -34,8 +33,7 @@ class SharekitMetadataHarvestManager(models.Manager):
             }
             for seed in prc.extract_from_resource(harvest):
                 seed["seed_resource"] = seed_resource
-                results.append(seed)
-        return results
+                yield seed
 
 
 class SharekitMetadataHarvest(HarvestHttpResource):
@@ -62,6 +60,23 @@ class SharekitMetadataHarvest(HarvestHttpResource):
             "page[number]": next_url.query_dict["page[number]"]
         }
 
+    def remaining_parameters(self):
+        content_type, data = self.content
+        next_link = data["links"].get("next", None)
+        last_link = data["links"].get("last", None)
+        if not next_link:
+            return []
+        if not last_link:
+            return None
+        next_number = int(URLObject(next_link).query_dict["page[number]"])
+        last_number = int(URLObject(last_link).query_dict["page[number]"])
+        return [
+            {
+                "page[number]": str(number)
+            }
+            for number in range(next_number, last_number + 1)
+        ]
+
     def handle_errors(self):
         content_type, data = self.content
         if data and not len(data.get("data", [])):
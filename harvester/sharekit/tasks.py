@@ -10,9 +10,10 @@ from datagrowth.resources.http.tasks import send
 from datagrowth.utils.iterators import ibatch
 
 from harvester.tasks.base import DatabaseConnectionResetTask
-from harvester.utils.extraction import get_harvest_seeds
+from harvester.utils.extraction import iterate_harvest_seeds
 from core.constants import Repositories, HarvestStages
 from core.models import Harvest, Dataset, DatasetVersion
+from core.logging import HarvestLogger
 
 
 logger = logging.getLogger("harvester")
@@ -61,15 +62,21 @@ def sync_sharekit_metadata():
         if len(err) or not len(scc):
             continue
         # Now parse the metadata and update current Collection for this Harvest
-        seeds = get_harvest_seeds(
+        seeds = iterate_harvest_seeds(
             Repositories.SHAREKIT,
             set_specification,
             harvest.latest_update_at,
             include_no_url=True
         )
         collection = dataset_version.collection_set.filter(name=harvest.source.spec).last()
+        changed_count = 0
+        unchanged_count = 0
         for seeds_batch in ibatch(seeds, batch_size=32):
-            collection.update(seeds_batch, "external_id")
+            batch_changed_count = collection.update(seeds_batch, "external_id")
+            changed_count += batch_changed_count
+            unchanged_count += len(seeds_batch) - batch_changed_count
+        harvest_logger = HarvestLogger(latest_active_dataset.name, "sync_sharekit_metadata", {})
+        harvest_logger.report_changes(f"documents.upsert.{set_specification}", changed_count, unchanged_count)
         # Last but not least we update the harvest update time to get a different delta later
         harvest.latest_update_at = current_time
         harvest.save()
@@ -2,7 +2,7 @@ from datetime import datetime
 
 from django.utils.timezone import make_aware
 
-from harvester.utils.extraction import get_harvest_seeds
+from harvester.utils.extraction import get_harvest_seeds, record_cache_disabled
 from core.constants import Repositories
 from core.tests.base import SeedExtractionTestCase
 from sharekit.tests.factories import SharekitMetadataHarvestFactory
@@ -95,6 +95,14 @@ class TestGetHarvestSeedsSharekit(SeedExtractionTestCase):
         self.assertEqual(seeds[2]['publishers'], ['SURFnet'])
         self.assertEqual(seeds[4]['publishers'], ['SURFnet'])
 
+    def test_publishers_do_not_modify_record(self):
+        node = {"attributes": {"publishers": ["SURFnet"], "keywords": ["HBOVPK"]}}
+        with record_cache_disabled():
+            for _ in range(2):
+                publishers = SharekitMetadataExtraction.get_publishers(node)
+                self.assertEqual(publishers, ["SURFnet", "HBO Verpleegkunde"])
+        self.assertEqual(node["attributes"]["publishers"], ["SURFnet"])
+
     def test_consortium(self):
         seeds = self.seeds
         self.assertEqual(seeds[0]['consortium'], 'Projectgroep Vaktherapie')
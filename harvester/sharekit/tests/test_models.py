@@ -64,6 +64,14 @@ class TestSharekitMetadataHarvest(TestCase):
             f"https://{self.base_url}filter[modified][GE]=1970-01-01T00:00:00Z&page[size]=25&page[number]=2"
         )
 
+    def test_create_remaining_requests(self):
+        first = SharekitMetadataHarvestFactory()
+        remaining_requests = first.create_remaining_requests()
+        self.assertEqual(len(remaining_requests), 1)
+        self.assertEqual(remaining_requests[0], first.create_next_request())
+        last = SharekitMetadataHarvestFactory(number=1)
+        self.assertEqual(last.create_remaining_requests(), [])
+
     def test_handle_no_content(self):
         empty = SharekitMetadataHarvestFactory(is_empty=True)
         empty.handle_errors()
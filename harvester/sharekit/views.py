@@ -45,9 +45,10 @@ def edit_document_webhook(request, channel, secret):
     # Commit changes to the database
     dataset_version = DatasetVersion.objects.get_current_version()
     collection = dataset_version.collection_set.filter(name=channel).last()
-    collection.update([seed], "external_id")
+    changed_count = collection.update([seed], "external_id")
     # Finish webhook request
     logger = HarvestLogger(dataset_version.dataset.name, "edit_document_webhook", {})
+    logger.report_changes("documents.upsert", changed_count, 1 - changed_count)
     logger.report_material(
         seed["external_id"],
         state=seed["state"],
@@ -6,6 +6,8 @@ from django.conf import settings
 
 from datagrowth.processors import ExtractProcessor
 
+from harvester.utils.extraction import cache_per_record
+
 
 class BuasMetadataExtraction(ExtractProcessor):
 
@@ -49,6 +51,7 @@ class BuasMetadataExtraction(ExtractProcessor):
         }
 
     @classmethod
+    @cache_per_record
     def get_files(cls, node):
         if "electronicVersions" not in node:
             return []
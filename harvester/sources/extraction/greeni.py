@@ -7,6 +7,8 @@ import vobject
 from django.conf import settings
 from django.utils.text import slugify
 
+from harvester.utils.extraction import cache_per_record
+
 
 SET_SPEC_TO_PROVIDER = {
     "PUBVHL": {
@@ -51,10 +53,6 @@ class GreeniDataExtraction(object):
         card = "\n".join(field.strip() for field in el.text.strip().split("\n"))
         return vobject.readOne(card)
 
-    @classmethod
-    def get_oaipmh_records(cls, soup):
-        return soup.find_all('record')
-
     @classmethod
     def get_oaipmh_external_id(cls, soup, el):
         return el.find('identifier').text.strip()
@@ -123,6 +121,7 @@ class GreeniDataExtraction(object):
         }
 
     @classmethod
+    @cache_per_record
     def get_files(cls, soup, el):
         file_resources = cls.find_resources(el, "file")
         link_resources = cls.find_resources(el, "link")
@@ -6,6 +6,8 @@ import vobject
 from django.conf import settings
 from django.utils.text import slugify
 
+from harvester.utils.extraction import cache_per_record
+
 
 class HanDataExtraction(object):
 
@@ -40,10 +42,6 @@ class HanDataExtraction(object):
         card = "\n".join(field.strip() for field in el.text.strip().split("\n"))
         return vobject.readOne(card)
 
-    @classmethod
-    def get_oaipmh_records(cls, soup):
-        return soup.find_all('record')
-
     @classmethod
     def get_oaipmh_external_id(cls, soup, el):
         return el.find('identifier').text.strip()
@@ -112,6 +110,7 @@ class HanDataExtraction(object):
         }
 
     @classmethod
+    @cache_per_record
     def get_files(cls, soup, el):
         file_resources = cls.find_resources(el, "file")
         link_resources = cls.find_resources(el, "link")
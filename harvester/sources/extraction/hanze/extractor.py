@@ -7,6 +7,7 @@ from django.conf import settings
 
 from datagrowth.processors import ExtractProcessor
 
+from harvester.utils.extraction import cache_per_record
 from sources.extraction.hanze.research_themes import ASJC_TO_RESEARCH_THEME
 
 
@@ -50,6 +51,7 @@ class HanzeResourceObjectExtraction(ExtractProcessor):
         }
 
     @classmethod
+    @cache_per_record
     def get_files(cls, node):
         electronic_versions = node.get("electronicVersions", []) + node.get("additionalFiles", [])
         if not electronic_versions:
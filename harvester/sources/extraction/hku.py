@@ -7,6 +7,8 @@ from django.conf import settings
 
 from datagrowth.processors import ExtractProcessor
 
+from harvester.utils.extraction import cache_per_record
+
 
 FILE_TYPE_TO_MIME_TYPE = {
     "TEXT": "application/pdf",
@@ -60,6 +62,7 @@ class HkuMetadataExtraction(ExtractProcessor):
     #############################
 
     @classmethod
+    @cache_per_record
     def get_files(cls, node):
         document = node["document"]
         if not document:
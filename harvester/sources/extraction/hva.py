@@ -6,6 +6,8 @@ from django.conf import settings
 
 from datagrowth.processors import ExtractProcessor
 
+from harvester.utils.extraction import cache_per_record
+
 
 class HvaMetadataExtraction(ExtractProcessor):
 
@@ -47,6 +49,7 @@ class HvaMetadataExtraction(ExtractProcessor):
         }
 
     @classmethod
+    @cache_per_record
     def get_files(cls, node):
         electronic_versions = node.get("electronicVersions", []) + node.get("additionalFiles", [])
         if not electronic_versions:
@@ -30,8 +30,7 @@ class BuasPureResourceManager(models.Manager):
         })
         prc = ExtractProcessor(config=extract_config)
 
-        results = []
-        for harvest in queryset:
+        for harvest in queryset.iterator(chunk_size=1):  # resources are large, so we load them one by one
             seed_resource = {
                 "resource": f"{harvest._meta.app_label}.{harvest._meta.model_name}",
                 "id": harvest.id,
@@ -39,8 +38,7 @@ class BuasPureResourceManager(models.Manager):
             }
             for seed in prc.extract_from_resource(harvest):
                 seed["seed_resource"] = seed_resource
-                results.append(seed)
-        return results
+                yield seed
 
 
 class BuasPureResource(HarvestHttpResource):
@@ -76,6 +74,18 @@ class BuasPureResource(HarvestHttpResource):
             "offset": offset + size
         }
 
+    def remaining_parameters(self):
+        content_type, data = self.content
+        page_info = data["pageInformation"]
+        size = page_info["size"]
+        return [
+            {
+                "size": size,
+                "offset": offset
+            }
+            for offset in range(page_info["offset"] + size, data["count"], size)
+        ]
+
     class Meta:
         verbose_name = "BUAS Pure harvest"
         verbose_name_plural = "BUAS Pure harvests"
@@ -33,8 +33,7 @@ class HkuMetadataResourceManager(models.Manager):
         })
         prc = ExtractProcessor(config=extract_config)
 
-        results = []
-        for harvest in queryset:
+        for harvest in queryset.iterator(chunk_size=1):  # resources are large, so we load them one by one
             seed_resource = {
                 "resource": f"{harvest._meta.app_label}.{harvest._meta.model_name}",
                 "id": harvest.id,
@@ -42,8 +41,7 @@ class HkuMetadataResourceManager(models.Manager):
             }
             for seed in prc.extract_from_resource(harvest):
                 seed["seed_resource"] = seed_resource
-                results.append(seed)
-        return results
+                yield seed
 
 
 class HkuMetadataResource(HarvestHttpResource):
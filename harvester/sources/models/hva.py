@@ -33,8 +33,7 @@ class HvaPureResourceManager(models.Manager):
         })
         prc = ExtractProcessor(config=extract_config)
 
-        results = []
-        for harvest in queryset:
+        for harvest in queryset.iterator(chunk_size=1):  # resources are large, so we load them one by one
             seed_resource = {
                 "resource": f"{harvest._meta.app_label}.{harvest._meta.model_name}",
                 "id": harvest.id,
@@ -42,8 +41,7 @@ class HvaPureResourceManager(models.Manager):
             }
             for seed in prc.extract_from_resource(harvest):
                 seed["seed_resource"] = seed_resource
-                results.append(seed)
-        return results
+                yield seed
 
 
 class HvaPureResource(HarvestHttpResource):
@@ -75,6 +73,18 @@ class HvaPureResource(HarvestHttpResource):
             "offset": offset + size
         }
 
+    def remaining_parameters(self):
+        content_type, data = self.content
+        page_info = data["pageInformation"]
+        size = page_info["size"]
+        return [
+            {
+                "size": size,
+                "offset": offset
+            }
+            for offset in range(page_info["offset"] + size, data["count"], size)
+        ]
+
     class Meta:
         verbose_name = "HvA Pure harvest"
         verbose_name_plural = "HvA Pure harvests"
@@ -19,9 +19,39 @@ def get_metadata_tree_mock(*args, **kwargs):
     mock = MagicMock()
     mock.json = MagicMock(return_value=METADATA_TREE)
     mock.status_code = 200
+    mock.headers = {"ETag": '"metadata-tree"'}
     return mock
 
 
+def get_search_client_mock():
+    """
+    Returns a search client that finds every material, except materials with an external id starting with "missing".
+    """
+    def get_materials_by_id(external_ids, page_size=10):
+        return {
+            "records": [
+                {"external_id": external_id}
+                for external_id in external_ids[:page_size] if not external_id.startswith("missing")
+            ]
+        }
+
+    client = MagicMock()
+    client.get_materials_by_id.side_effect = get_materials_by_id
+    return client
+
+
+def patch_search_client(test_case, target):
+    """
+    Replaces get_search_client at target with a function returning get_search_client_mock for the test.
+    Returns the mocked search client.
+    """
+    client = get_search_client_mock()
+    search_client_patch = patch(target, return_value=client)
+    search_client_patch.start()
+    test_case.addCleanup(search_client_patch.stop)
+    return client
+
+
 # Fake a logged in user by setting surf_token in the local storage
 def login(self, user):
     token, created = SessionToken.objects.get_or_create(user=user)
@@ -0,0 +1,50 @@
+import os
+import atexit
+from threading import Lock, Thread
+
+
+class BackgroundFlusher(object):
+    """
+    Base class for buffers that get written by a background thread in every process.
+
+    Derived classes implement flush to write the buffer and _flush_continuously as target of the thread.
+    Buffers and locks inherited from a parent process can't be used after a fork,
+    so derived classes replace them in reset_after_fork.
+    Whatever is left in the buffer gets flushed when the process exits.
+    """
+
+    thread_name = None
+    flush_interval = None
+
+    def __init__(self):
+        self._start_lock = Lock()
+        self._flush_pid = None
+        self._is_exit_registered = False
+
+    def flush(self):
+        raise NotImplementedError("BackgroundFlusher should implement flush")
+
+    def _flush_continuously(self):
+        raise NotImplementedError("BackgroundFlusher should implement _flush_continuously")
+
+    def reset_after_fork(self):
+        pass
+
+    def start_flushing(self):
+        """
+        Starts the background thread for the current process. Nothing gets started without a flush interval.
+        """
+        pid = os.getpid()
+        if not self.flush_interval or self._flush_pid == pid:
+            return
+        with self._start_lock:
+            if self._flush_pid == pid:
+                return
+            if self._flush_pid is not None:
+                self.reset_after_fork()
+            self._flush_pid = pid
+            Thread(target=self._flush_continuously, name=self.thread_name, daemon=True).start()
+            # Exit handlers get inherited by forked processes, so they only need to get registered once
+            if not self._is_exit_registered:
+                atexit.register(self.flush)
+                self._is_exit_registered = True
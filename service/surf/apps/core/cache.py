@@ -0,0 +1,77 @@
+import json
+import logging
+from hashlib import sha1
+from uuid import uuid4
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from django.conf import settings
+
+from search_client import DocumentTypes
+
+
+logger = logging.getLogger(__name__)
+_search_caches = {}
+
+
+def get_search_cache():
+    """
+    Returns a Redis client for the search response cache or None when caching is disabled.
+    The harvester uses the same Redis database to invalidate responses by replacing generation tokens.
+    """
+    if not settings.SEARCH_CACHE_REDIS_URL:
+        return
+    # Redis clients are thread safe and reset their connection pool when used in a forked process
+    if settings.SEARCH_CACHE_REDIS_URL not in _search_caches:
+        _search_caches[settings.SEARCH_CACHE_REDIS_URL] = Redis.from_url(settings.SEARCH_CACHE_REDIS_URL)
+    return _search_caches[settings.SEARCH_CACHE_REDIS_URL]
+
+
+def _get_generation_key(alias_prefix):
+    # The harvester replaces this token in search.cache.invalidate_search_cache, so keys need to stay equal
+    return f"search:generation:{alias_prefix}"
+
+
+def get_search_cache_key(cache, alias_prefix, document_type, search_kwargs):
+    generation_key = _get_generation_key(alias_prefix)
+    cache.set(generation_key, uuid4().hex, nx=True)
+    generation = cache.get(generation_key).decode("utf-8")
+    # The order of filters and filter items doesn't influence search results, so we normalise it
+    filters = [
+        {"external_id": search_filter["external_id"], "items": sorted(search_filter["items"], key=str)}
+        for search_filter in search_kwargs.get("filters", None) or []
+    ]
+    filters.sort(key=lambda search_filter: search_filter["external_id"])
+    search_request = dict(search_kwargs, filters=filters)
+    if search_request.get("drilldown_names", None):
+        search_request["drilldown_names"] = sorted(search_request["drilldown_names"])
+    search_hash = sha1(json.dumps(search_request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    # Other projects may use the same Redis database, so keys get namespaced with the project that creates them
+    return f"search:response:service:{alias_prefix}:{document_type}:{generation}:{search_hash}"
+
+
+def search_with_cache(client, document_type=None, alias_prefix=None, **search_kwargs):
+    """
+    Executes client.search with the given keyword arguments,
+    unless a response to an equivalent search is cached for the current documents behind the aliases.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return client.search(**search_kwargs)
+    document_type = document_type or DocumentTypes.LEARNING_MATERIAL
+    alias_prefix = alias_prefix or settings.OPENSEARCH_ALIAS_PREFIX
+    try:
+        cache_key = get_search_cache_key(cache, alias_prefix, document_type, search_kwargs)
+        cached_response = cache.get(cache_key)
+    except RedisError as exc:
+        logger.warning(f"Failed to read search cache: {exc}")
+        return client.search(**search_kwargs)
+    if cached_response is not None:
+        return json.loads(cached_response)
+    response = client.search(**search_kwargs)
+    try:
+        cache.set(cache_key, json.dumps(response), ex=settings.SEARCH_CACHE_TIMEOUT)
+    except (RedisError, TypeError) as exc:
+        logger.warning(f"Failed to write search cache: {exc}")
+    return response
@@ -1,16 +1,45 @@
+import os
+from threading import Lock
+
 from django.conf import settings
 
 from search_client import SearchClient, DocumentTypes
 
 
+_search_clients = {}
+_search_clients_lock = Lock()
+
+
 def get_search_client(alias_prefix=None):
-    kwargs = {}
-    if "amazonaws.com" in settings.OPENSEARCH_HOST:
-        kwargs["basic_auth"] = ("supersurf", settings.OPENSEARCH_PASSWORD,)
-        kwargs["verify_certs"] = settings.OPENSEARCH_VERIFY_CERTS
-    return SearchClient(
-        settings.OPENSEARCH_HOST,
-        DocumentTypes.LEARNING_MATERIAL,
-        alias_prefix if alias_prefix else settings.OPENSEARCH_ALIAS_PREFIX,
-        **kwargs
-    )
+    """
+    Returns a SearchClient that gets shared between requests handled by the current process.
+    Creating a client per request would open a new connection pool, and new connections, for every search.
+    """
+    alias_prefix = alias_prefix if alias_prefix else settings.OPENSEARCH_ALIAS_PREFIX
+    client_key = (os.getpid(), settings.OPENSEARCH_HOST, alias_prefix,)
+    client = _search_clients.get(client_key, None)
+    if client is not None:
+        return client
+    with _search_clients_lock:
+        client = _search_clients.get(client_key, None)
+        if client is None:
+            # Clients from a parent process can't be used after a fork
+            for stale_key in [stale_key for stale_key in _search_clients.keys() if stale_key[0] != client_key[0]]:
+                del _search_clients[stale_key]
+            kwargs = {}
+            if "amazonaws.com" in settings.OPENSEARCH_HOST:
+                kwargs["basic_auth"] = ("supersurf", settings.OPENSEARCH_PASSWORD,)
+                kwargs["verify_certs"] = settings.OPENSEARCH_VERIFY_CERTS
+            client = SearchClient(
+                settings.OPENSEARCH_HOST,
+                DocumentTypes.LEARNING_MATERIAL,
+                alias_prefix,
+                **kwargs
+            )
+            _search_clients[client_key] = client
+    return client
+
+
+def clear_search_clients():
+    with _search_clients_lock:
+        _search_clients.clear()
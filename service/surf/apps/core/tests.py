@@ -1,6 +1,11 @@
+from threading import Event
+from unittest.mock import patch
+
 from django.test import SimpleTestCase
 from django.test import Client
 
+from surf.apps.core.background import BackgroundFlusher
+
 
 class TestCore(SimpleTestCase):
 
@@ -9,3 +14,53 @@ class TestCore(SimpleTestCase):
         response = client.get("/health")
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response.json()['healthy'])
+
+
+class EventFlusher(BackgroundFlusher):
+
+    thread_name = "test-flusher"
+    flush_interval = 1
+
+    def __init__(self):
+        super().__init__()
+        self.starts = 0
+        self.resets = 0
+        self.started = Event()
+
+    def flush(self):
+        pass
+
+    def _flush_continuously(self):
+        self.starts += 1
+        self.started.set()
+
+    def reset_after_fork(self):
+        self.resets += 1
+
+
+@patch("surf.apps.core.background.atexit.register")
+class TestBackgroundFlusher(SimpleTestCase):
+
+    def test_start_flushing(self, register_mock):
+        flusher = EventFlusher()
+        flusher.start_flushing()
+        flusher.start_flushing()
+        self.assertTrue(flusher.started.wait(1))
+        self.assertEqual(flusher.starts, 1, "Expected one thread per process")
+        self.assertEqual(flusher.resets, 0)
+        self.assertEqual(register_mock.call_count, 1)
+        # A forked process should reset its buffers and start its own thread
+        flusher._flush_pid = -1
+        flusher.started.clear()
+        flusher.start_flushing()
+        self.assertTrue(flusher.started.wait(1))
+        self.assertEqual(flusher.starts, 2)
+        self.assertEqual(flusher.resets, 1)
+        self.assertEqual(register_mock.call_count, 1, "Expected exit handler to get inherited after a fork")
+
+    def test_start_flushing_without_interval(self, register_mock):
+        flusher = EventFlusher()
+        flusher.flush_interval = None
+        flusher.start_flushing()
+        self.assertFalse(flusher.started.wait(0.1))
+        self.assertEqual(register_mock.call_count, 0)
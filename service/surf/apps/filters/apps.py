@@ -1,6 +1,5 @@
 from django.conf import settings
 from django.apps import AppConfig
-from django.core.cache import cache
 
 from surf.apps.filters.metadata import MetadataTree
 
@@ -8,17 +7,15 @@ from surf.apps.filters.metadata import MetadataTree
 class FiltersConfig(AppConfig):
 
     name = 'surf.apps.filters'
+    _metadata = None
 
     @property
     def metadata(self):
-        cache_key = f"filters.metadata&site={settings.SITE_SLUG}"
-        metadata = cache.get(cache_key, None)
-        if metadata is not None:
-            return metadata
-        metadata = MetadataTree(
-            harvester_url=settings.HARVESTER_API,
-            api_token=settings.HARVESTER_API_KEY,
-            warm_up_cache=True
-        )
-        cache.set(cache_key, metadata, 60*60)
-        return metadata
+        # Every process holds one MetadataTree, which loads from a shared cache and keeps itself up to date
+        if self._metadata is None:
+            self._metadata = MetadataTree(
+                harvester_url=settings.HARVESTER_API,
+                api_token=settings.HARVESTER_API_KEY
+            )
+        self._metadata.start_refreshing()
+        return self._metadata
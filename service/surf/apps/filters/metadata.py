@@ -1,60 +1,185 @@
+import os
+import logging
+from time import time, sleep
+from threading import Lock, Thread
 from collections import defaultdict
 import requests
 
 from django.conf import settings
-from django.utils.functional import cached_property
+from django.core.cache import cache as shared_cache
+
+
+logger = logging.getLogger("service")
+
+
+class MetadataTreeVersion(object):
+    """
+    Holds a version of the metadata tree together with all lookups derived from it.
+    Versions are never modified after creation, which allows MetadataTree to swap them in one go.
+    """
+
+    def __init__(self, tree, partial_tree, changed_at=None):
+        self.tree = tree
+        self.partial_tree = partial_tree
+        self.changed_at = changed_at
+        self.cache = self._build_cache(tree)
+        self.translations = {
+            field["value"]: {
+                value: child["translation"]
+                for value, child in self.cache[field["value"]].items()
+            }
+            for field in tree
+        }
+
+    @staticmethod
+    def _build_cache(tree):
+        cache = defaultdict(dict)
+
+        def _cache_children(field_name, children):
+            for child in children:
+                cache[field_name][child["value"]] = child
+                _cache_children(field_name, child["children"])
+
+        for field in tree:
+            field_name = field["value"]
+            cache[field_name]["_field"] = field
+            _cache_children(field_name, field["children"])
+
+        return cache
 
 
 class MetadataTree(object):
+    """
+    Provides the metadata tree from the harvester and lookups derived from it.
+
+    The tree gets shared between processes through the Django cache.
+    Processes load the tree from there and only contact the harvester when the shared tree is due for a refresh.
+    The harvester gets asked for changes with conditional requests.
+    Once the tree is loaded a background thread keeps it up to date,
+    so that requests never wait for the harvester after the first load.
+    """
 
     harvester_url = None
     api_token = None
 
-    def __init__(self, harvester_url, api_token, warm_up_cache=False):
+    def __init__(self, harvester_url, api_token, warm_up_cache=False, refresh_interval=None):
         self.harvester_url = harvester_url
         self.api_token = api_token
+        self.refresh_interval = refresh_interval
+        self._version = None
+        self._refresh_lock = Lock()
+        self._refresh_pid = None
         if warm_up_cache:
             self._warm_up_cache = self.translations  # result should be ignored as it only fills the cache
 
-    def _fetch(self, url):
-        response = requests.get(url, headers={"Authorization": f"Token {self.api_token}"})
+    @property
+    def shared_cache_key(self):
+        return f"filters.metadata&site={settings.SITE_SLUG}"
+
+    def _fetch(self, url, etag=None):
+        headers = {"Authorization": f"Token {self.api_token}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        response = requests.get(url, headers=headers)
+        if response.status_code == requests.status_codes.codes.not_modified:
+            return None, etag
         if response.status_code != requests.status_codes.codes.ok:
             raise ValueError(f"Failed request: {response.status_code}")
-        return response.json()
+        return response.json(), response.headers.get("ETag", None)
 
-    @cached_property
-    def tree(self):
-        return self._fetch(f"{self.harvester_url}metadata/tree/?site_id={settings.SITE_ID}")
+    def _fetch_version(self, current):
+        tree, etag = self._fetch(
+            f"{self.harvester_url}metadata/tree/?site_id={settings.SITE_ID}",
+            etag=current["etag"] if current else None
+        )
+        partial_tree, partial_etag = self._fetch(
+            f"{self.harvester_url}metadata/tree/?site_id={settings.SITE_ID}&max_children=20",
+            etag=current["partial_etag"] if current else None
+        )
+        refreshed_at = time()
+        is_changed = current is None or tree is not None or partial_tree is not None
+        return {
+            "tree": tree if tree is not None else current["tree"],
+            "partial_tree": partial_tree if partial_tree is not None else current["partial_tree"],
+            "etag": etag,
+            "partial_etag": partial_etag,
+            "refreshed_at": refreshed_at,
+            "changed_at": refreshed_at if is_changed else current["changed_at"]
+        }
 
-    @cached_property
-    def partial_tree(self):
-        return self._fetch(f"{self.harvester_url}metadata/tree/?site_id={settings.SITE_ID}&max_children=20")
+    def refresh(self, force=False):
+        """
+        Loads the latest shared version of the metadata tree.
+        When the shared version is older than the refresh interval it gets updated from the harvester first.
+        Only one process at a time will contact the harvester.
+        """
+        with self._refresh_lock:
+            shared = shared_cache.get(self.shared_cache_key, None)
+            refresh_interval = self.refresh_interval or settings.METADATA_TREE_REFRESH_INTERVAL or 0
+            is_outdated = shared is None or force or shared["refreshed_at"] + refresh_interval < time()
+            refresh_lock_key = f"{self.shared_cache_key}&lock"
+            if is_outdated and shared_cache.add(refresh_lock_key, os.getpid(), timeout=60):
+                try:
+                    shared = self._fetch_version(shared)
+                    shared_cache.set(self.shared_cache_key, shared, None)
+                except (requests.RequestException, ValueError) as exc:
+                    if shared is None:
+                        raise
+                    logger.warning(f"Failed to update metadata tree, continuing with previous version: {exc}")
+                finally:
+                    shared_cache.delete(refresh_lock_key)
+            elif shared is None:  # another process is fetching, but we can't continue without a tree
+                shared = self._fetch_version(None)
+            if self._version is None or self._version.changed_at != shared["changed_at"]:
+                self._version = MetadataTreeVersion(
+                    shared["tree"],
+                    shared["partial_tree"],
+                    changed_at=shared["changed_at"]
+                )
+        return self._version
 
-    @cached_property
-    def cache(self):
-        cache = defaultdict(dict)
+    def _refresh_continuously(self):
+        while True:
+            sleep(self.refresh_interval or settings.METADATA_TREE_REFRESH_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as exc:
+                logger.warning(f"Failed to refresh metadata tree: {exc}")
 
-        def _cache_children(field_name, children):
-            for child in children:
-                cache[field_name][child["value"]] = child
-                _cache_children(field_name, child["children"])
+    def start_refreshing(self):
+        """
+        Starts a background thread for the current process that keeps the tree up to date.
+        """
+        if not (self.refresh_interval or settings.METADATA_TREE_REFRESH_INTERVAL):
+            return
+        pid = os.getpid()
+        if self._refresh_pid == pid:
+            return
+        self._refresh_pid = pid
+        Thread(target=self._refresh_continuously, name="metadata-tree-refresh", daemon=True).start()
 
-        for field in self.tree:
-            field_name = field["value"]
-            cache[field_name]["_field"] = field
-            _cache_children(field_name, field["children"])
+    @property
+    def version(self):
+        version = self._version
+        if version is None:
+            version = self.refresh()
+        return version
 
-        return cache
+    @property
+    def tree(self):
+        return self.version.tree
+
+    @property
+    def partial_tree(self):
+        return self.version.partial_tree
+
+    @property
+    def cache(self):
+        return self.version.cache
 
-    @cached_property
+    @property
     def translations(self):
-        return {
-            field["value"]: {
-                value: child["translation"]
-                for value, child in self.cache[field["value"]].items()
-            }
-            for field in self.tree
-        }
+        return self.version.translations
 
     def get_field(self, field_name):
         return self.cache[field_name]["_field"]
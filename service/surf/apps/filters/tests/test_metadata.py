@@ -0,0 +1,50 @@
+from unittest.mock import patch, MagicMock
+from copy import deepcopy
+
+from django.test import TestCase
+from django.core.cache import cache
+
+from surf.apps.filters.metadata import MetadataTree
+from e2e_tests.helpers import METADATA_TREE, get_metadata_tree_mock
+
+
+def get_not_modified_mock(*args, **kwargs):
+    mock = MagicMock()
+    mock.status_code = 304
+    mock.headers = {}
+    return mock
+
+
+class TestMetadataTree(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_refresh(self):
+        metadata = MetadataTree("http://localhost:8888/", "token", refresh_interval=60)
+        with patch("surf.apps.filters.metadata.requests.get", new=get_metadata_tree_mock):
+            version = metadata.version
+        self.assertEqual(version.tree, METADATA_TREE)
+        self.assertIn("technical_type", version.translations)
+        # Other processes should load the shared tree without contacting the harvester
+        other_metadata = MetadataTree("http://localhost:8888/", "token", refresh_interval=60)
+        with patch("surf.apps.filters.metadata.requests.get") as get_mock:
+            self.assertEqual(other_metadata.tree, METADATA_TREE)
+            self.assertEqual(get_mock.call_count, 0)
+        # Refreshes that don't yield changes should keep the current version
+        with patch("surf.apps.filters.metadata.requests.get", side_effect=get_not_modified_mock) as get_mock:
+            self.assertIs(metadata.refresh(force=True), version)
+            self.assertEqual(get_mock.call_count, 2)
+            for args, kwargs in get_mock.call_args_list:
+                self.assertEqual(kwargs["headers"]["If-None-Match"], '"metadata-tree"')
+        # Changes should replace the version with all its derived lookups
+        changed_tree = deepcopy(METADATA_TREE)
+        changed_tree.pop()
+        changed_tree_mock = get_metadata_tree_mock()
+        changed_tree_mock.json = MagicMock(return_value=changed_tree)
+        with patch("surf.apps.filters.metadata.requests.get", return_value=changed_tree_mock):
+            changed_version = metadata.refresh(force=True)
+        self.assertIsNot(changed_version, version)
+        self.assertEqual(metadata.tree, changed_tree)
+        self.assertNotIn(METADATA_TREE[-1]["value"], metadata.translations)
@@ -0,0 +1,176 @@
+"""
+This module contains the write-behind buffer for material and share counters.
+"""
+
+import logging
+from time import sleep
+from uuid import uuid4
+from threading import Lock
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from surf.apps.core.background import BackgroundFlusher
+from surf.apps.materials.models import Material, SharedResourceCounter
+
+
+logger = logging.getLogger(__name__)
+
+
+MATERIAL_COUNTER_FIELDS = ["view_count", "applaud_count", "star_1", "star_2", "star_3", "star_4", "star_5"]
+
+
+class CounterBuffer(BackgroundFlusher):
+    """
+    Collects increments of Material and SharedResourceCounter counters in memory
+    and writes them to the database as aggregated deltas.
+
+    Popular materials get viewed, applauded and shared many times in a short period.
+    Updating their rows for every request makes requests wait for each other on row locks.
+    Instead a background thread for the current process writes all increments at once with two queries.
+    Reads should merge pending increments to make sure users see the result of their own actions.
+    """
+
+    thread_name = "counter-buffer"
+
+    def __init__(self, flush_interval=None):
+        super().__init__()
+        self.flush_interval = flush_interval or settings.COUNTER_BUFFER_FLUSH_INTERVAL
+        self.material_deltas = defaultdict(Counter)
+        self.share_deltas = {}
+        self._lock = Lock()
+        self._flush_lock = Lock()
+
+    def increase_material_counter(self, external_id, field, amount=1):
+        assert field in MATERIAL_COUNTER_FIELDS, f"Unknown material counter: {field}"
+        self.start_flushing()
+        with self._lock:
+            self.material_deltas[external_id][field] += amount
+        if not self.flush_interval:
+            self.flush()
+
+    def increase_share_counter(self, resource_type, resource_id, share_type, amount=1):
+        counter_key = SharedResourceCounter.create_counter_key(resource_type, resource_id, share_type=share_type)
+        self.start_flushing()
+        with self._lock:
+            delta, resource = self.share_deltas.get(counter_key, (0, (resource_type, str(resource_id), share_type,),))
+            self.share_deltas[counter_key] = (delta + amount, resource,)
+        if not self.flush_interval:
+            self.flush()
+
+    def merge_material(self, material):
+        """
+        Adds pending increments to the counter fields of a Material without saving it.
+        """
+        with self._lock:
+            deltas = self.material_deltas.get(material.external_id, None)
+            deltas = dict(deltas) if deltas else {}
+        for field, delta in deltas.items():
+            setattr(material, field, getattr(material, field) + delta)
+        return material
+
+    def merge_share_counters(self, counters_by_resource, resource_type):
+        """
+        Adds pending increments to counters of resources with the given type.
+        Unsaved SharedResourceCounter instances get added for counters that don't exist yet.
+        """
+        with self._lock:
+            pending = {
+                counter_key: share_delta
+                for counter_key, share_delta in self.share_deltas.items()
+                if share_delta[1][0] == resource_type and share_delta[1][1] in counters_by_resource
+            }
+        for resource_id, counters in counters_by_resource.items():
+            for counter in counters:
+                delta, _ = pending.pop(counter.counter_key, (0, None,))
+                counter.counter_value += delta
+        for counter_key, (delta, resource) in pending.items():
+            resource_type, resource_id, share_type = resource
+            counters_by_resource[resource_id].append(
+                SharedResourceCounter(counter_key=counter_key, counter_value=delta, extra=share_type,
+                                      resource_type=resource_type, resource_id=resource_id, share_type=share_type)
+            )
+        return counters_by_resource
+
+    def _update_materials(self, material_deltas):
+        table = connection.ops.quote_name(Material._meta.db_table)
+        columns = [
+            connection.ops.quote_name(Material._meta.get_field(field).column)
+            for field in MATERIAL_COUNTER_FIELDS
+        ]
+        updates = ", ".join(f"{column} = {table}.{column} + deltas.{column}" for column in columns)
+        row_placeholder = "(" + ", ".join(["%s"] * (len(columns) + 1)) + ")"
+        parameters = []
+        for external_id, deltas in material_deltas.items():
+            parameters += [external_id] + [deltas[field] for field in MATERIAL_COUNTER_FIELDS]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET {updates} "
+                f"FROM (VALUES {', '.join([row_placeholder] * len(material_deltas))}) "
+                f"AS deltas (external_id, {', '.join(columns)}) "
+                f"WHERE {table}.external_id = deltas.external_id",
+                parameters
+            )
+
+    def _upsert_share_counters(self, share_deltas):
+        table = connection.ops.quote_name(SharedResourceCounter._meta.db_table)
+        parameters = []
+        for counter_key, (delta, resource) in share_deltas.items():
+            resource_type, resource_id, share_type = resource
+            parameters += [uuid4(), counter_key, delta, share_type, resource_type, resource_id, share_type]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (id, counter_key, counter_value, extra, resource_type, resource_id, share_type) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(share_deltas))} "
+                f"ON CONFLICT (counter_key) "
+                f"DO UPDATE SET counter_value = {table}.counter_value + EXCLUDED.counter_value",
+                parameters
+            )
+
+    def flush(self):
+        """
+        Writes all pending increments to the database. Returns the number of updated counters.
+        """
+        with self._flush_lock:
+            with self._lock:
+                material_deltas, self.material_deltas = self.material_deltas, defaultdict(Counter)
+                share_deltas, self.share_deltas = self.share_deltas, {}
+            if not material_deltas and not share_deltas:
+                return 0
+            try:
+                with transaction.atomic():
+                    if material_deltas:
+                        self._update_materials(material_deltas)
+                    if share_deltas:
+                        self._upsert_share_counters(share_deltas)
+            except Exception:
+                # Increments get written with the next flush instead
+                with self._lock:
+                    for external_id, deltas in material_deltas.items():
+                        self.material_deltas[external_id].update(deltas)
+                    for counter_key, (delta, resource) in share_deltas.items():
+                        pending_delta, _ = self.share_deltas.get(counter_key, (0, None,))
+                        self.share_deltas[counter_key] = (pending_delta + delta, resource,)
+                raise
+            return len(material_deltas) + len(share_deltas)
+
+    def _flush_continuously(self):
+        while True:
+            sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.warning(f"Failed to write counters to the database: {exc}")
+            finally:
+                connection.close()
+
+    def reset_after_fork(self):
+        # Pending increments of a parent process get written by that process
+        self.material_deltas = defaultdict(Counter)
+        self.share_deltas = {}
+        self._lock = Lock()
+        self._flush_lock = Lock()
+
+
+counter_buffer = CounterBuffer()
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
 from django.utils.timezone import make_aware
 
+from surf.apps.core.search import get_search_client
 from surf.apps.materials.models import Material
 
 
@@ -14,14 +15,41 @@ class Command(BaseCommand):
     """
     Command to check and update the materials.
     We keep track of materials for metrics mostly.
+    Materials get checked in batches with a single search per batch,
+    which is the batched equivalent of Material.sync_info.
     """
     help = 'Updates the materials through Open Search'
 
+    def add_arguments(self, parser):
+        parser.add_argument('-b', '--batch-size', type=int, default=100)
+
+    @staticmethod
+    def sync_batch(client, materials, now):
+        external_ids = list({material.external_id for material in materials})
+        response = client.get_materials_by_id(external_ids, page_size=len(external_ids))
+        found_ids = {record["external_id"] for record in response.get("records", [])}
+        updates = []
+        for material in materials:
+            if material.external_id in found_ids and material.deleted_at:
+                # we restore materials if they reappear in an index
+                material.deleted_at = None
+                updates.append(material)
+            elif material.external_id not in found_ids and not material.deleted_at:
+                material.deleted_at = now
+                updates.append(material)
+        Material.objects.bulk_update(updates, ["deleted_at"])
+        return updates
+
     def handle(self, *args, **options):
         logger.info('Starting materials sync')
+        batch_size = options["batch_size"]
         now = make_aware(datetime.utcnow())
         thirty_days_ago = now - timedelta(days=30)
         Material.objects.filter(deleted_at__lte=thirty_days_ago).delete()
-        for material in Material.objects.all():
-            material.sync_info()
-        logger.info('Successfully synced the materials')
+        client = get_search_client()
+        update_count = 0
+        materials = list(Material.objects.order_by("id")[:batch_size])
+        while materials:
+            update_count += len(self.sync_batch(client, materials, now))
+            materials = list(Material.objects.filter(id__gt=materials[-1].id).order_by("id")[:batch_size])
+        logger.info(f'Successfully synced the materials, updated {update_count} materials')
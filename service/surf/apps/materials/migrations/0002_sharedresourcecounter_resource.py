@@ -0,0 +1,53 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+def parse_counter_key(counter_key, share_type=None):
+    # Resource ids may contain the separator, so keys get split with the share type stored in extra
+    resource_type, resource_id = counter_key[:-2].split("__", 1)
+    share_suffix = f"__{share_type}"
+    if share_type and resource_id.endswith(share_suffix):
+        return resource_type, resource_id[:-len(share_suffix)], share_type
+    return resource_type, resource_id, None
+
+
+def backfill_counter_resources(apps, schema_editor):
+    SharedResourceCounter = apps.get_model("materials", "SharedResourceCounter")
+    counters = []
+    for counter in SharedResourceCounter.objects.filter(resource_type__isnull=True).iterator():
+        counter.resource_type, counter.resource_id, counter.share_type = \
+            parse_counter_key(counter.counter_key, share_type=counter.extra)
+        counters.append(counter)
+    SharedResourceCounter.objects.bulk_update(counters, ["resource_type", "resource_id", "share_type"],
+                                              batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials', '0001_squashed_0006_strip_themes_and_disciplines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharedresourcecounter',
+            name='resource_type',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='sharedresourcecounter',
+            name='resource_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='sharedresourcecounter',
+            name='share_type',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sharedresourcecounter',
+            index=models.Index(fields=['resource_type', 'resource_id'], name='materials_s_resourc_0e4d58_idx'),
+        ),
+        migrations.RunPython(backfill_counter_resources, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,9 @@
 This module contains implementation of models for materials app.
 """
 
+from collections import defaultdict
+
 from django.db import models as django_models
-from django.db.models import F
 from django.utils import timezone
 from django_enumfield import enum
 
@@ -131,33 +132,48 @@ class CollectionMaterial(django_models.Model):
         ]
 
 
+class SharedResourceCounterManager(django_models.Manager):
+
+    def get_counters_by_resource(self, resource_type, resource_ids):
+        """
+        Fetches the counters for many resources of the same type with one query.
+
+        :param resource_type: the type of resources
+        :param resource_ids: the identifiers of resources
+        :return: dictionary with resource ids as keys and a list of counters as values
+        """
+        resource_ids = [str(resource_id) for resource_id in resource_ids]
+        counters_by_resource = defaultdict(list)
+        for resource_id in resource_ids:
+            counters_by_resource[resource_id] = []
+        counters = self.get_queryset() \
+            .filter(resource_type=resource_type, resource_id__in=resource_ids) \
+            .order_by("counter_key")
+        for counter in counters:
+            counters_by_resource[counter.resource_id].append(counter)
+        return counters_by_resource
+
+
 class SharedResourceCounter(UUIDModel):
     """
     Implementation of model for counter of shared resource.
     This model is used to store counter values for different shared objects.
+    The resource columns hold the parts of the counter key to be able to lookup counters with an index.
     """
 
+    objects = SharedResourceCounterManager()
+
     counter_key = django_models.CharField(max_length=255, unique=True)
     counter_value = django_models.IntegerField(default=0)
     extra = django_models.CharField(max_length=255, null=True, blank=True)
+    resource_type = django_models.CharField(max_length=50, null=True, blank=True)
+    resource_id = django_models.CharField(max_length=255, null=True, blank=True)
+    share_type = django_models.CharField(max_length=255, null=True, blank=True)
 
-    @staticmethod
-    def increase_counter(counter_key, extra=None):
-        """
-        Increases the counter value by its key
-        :param counter_key: key of counter
-        :param extra: extra data for counter
-        """
-
-        if not counter_key:
-            return
-
-        c, _ = SharedResourceCounter.objects.get_or_create(
-            counter_key=counter_key,
-            defaults=dict(extra=extra))
-
-        c.counter_value = F('counter_value') + 1
-        c.save()
+    class Meta:
+        indexes = [
+            django_models.Index(fields=["resource_type", "resource_id"])
+        ]
 
     @staticmethod
     def create_counter_key(resource_type, resource_id, share_type=None):
@@ -10,6 +10,7 @@ from surf.apps.filters.serializers import MpttFilterItemSerializer
 from surf.apps.materials.models import (RESOURCE_TYPE_COLLECTION, Collection,
                                         Material, PublishStatus,
                                         SharedResourceCounter)
+from surf.apps.materials.counters import counter_buffer
 from search_client.serializers import LearningMaterialResultSerializer, ResearchProductResultSerializer
 
 
@@ -193,17 +194,25 @@ class CollectionSerializer(serializers.ModelSerializer):
     sharing_counters = serializers.SerializerMethodField()
     position = serializers.IntegerField(required=False)
 
-    @staticmethod
-    def get_sharing_counters(obj):
-        counter_key = SharedResourceCounter.create_counter_key(
-            RESOURCE_TYPE_COLLECTION,
-            str(obj.id))
-
-        qs = SharedResourceCounter.objects.filter(
-            counter_key__contains=counter_key)
-
-        return SharedResourceCounterSerializer(many=True).to_representation(
-            qs.all())
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sharing_counters = {}
+
+    def get_sharing_counters(self, obj):
+        collection_id = str(obj.id)
+        if collection_id not in self._sharing_counters:
+            # Counters for all collections in a list get fetched at once
+            collections = self.parent.instance if isinstance(self.parent, serializers.ListSerializer) else None
+            collection_ids = {collection_id}
+            collection_ids.update(str(collection.id) for collection in collections or [])
+            counters_by_resource = SharedResourceCounter.objects.get_counters_by_resource(
+                RESOURCE_TYPE_COLLECTION,
+                collection_ids
+            )
+            self._sharing_counters.update(
+                counter_buffer.merge_share_counters(counters_by_resource, RESOURCE_TYPE_COLLECTION)
+            )
+        return SharedResourceCounterSerializer(many=True).to_representation(self._sharing_counters[collection_id])
 
     def validate(self, attrs):
         if not self.get_materials_count(self.instance) and attrs.get("publish_status", None) == PublishStatus.PUBLISHED:
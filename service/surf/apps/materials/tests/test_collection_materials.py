@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from surf.apps.materials.models import Material, CollectionMaterial
+from surf.apps.materials.views.collection import CollectionViewSet
+from e2e_tests.helpers import patch_search_client
+from e2e_tests.factories import CollectionFactory, MaterialFactory
+
+
+class TestAddCollectionMaterials(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.collection = CollectionFactory.create()
+        existing = MaterialFactory.create(external_id="existing:1")
+        CollectionMaterial.objects.create(collection=self.collection, material=existing, position=1)
+        MaterialFactory.create(external_id="existing:2")
+        self.search_client = patch_search_client(self, "surf.apps.materials.views.collection.get_search_client")
+
+    def test_add_materials(self):
+        external_ids = ["existing:1", "existing:2", "missing:1"] + [f"new:{ix}" for ix in range(4)]
+        materials = [
+            {"external_id": external_id, "position": ix}
+            for ix, external_id in enumerate(external_ids)
+        ]
+        # Materials lookup, materials insert and collection materials insert
+        with self.assertNumQueries(3):
+            CollectionViewSet._add_materials(self.collection, materials, batch_size=5)
+        self.assertEqual(self.search_client.get_materials_by_id.call_count, 2, "Expected one search per batch")
+        self.assertFalse(Material.objects.filter(external_id="missing:1").exists())
+        self.assertEqual(Material.objects.filter(external_id__startswith="new:").count(), 4)
+        self.assertEqual(
+            dict(self.collection.collectionmaterial_set.values_list("material__external_id", "position")),
+            {"existing:1": 1, "existing:2": 1, "new:0": 3, "new:1": 4, "new:2": 5, "new:3": 6},
+            "Expected materials that are already in the collection to keep their position"
+        )
@@ -0,0 +1,90 @@
+from importlib import import_module
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from surf.apps.materials.models import Material, SharedResourceCounter
+from surf.apps.materials.counters import CounterBuffer
+from e2e_tests.factories import MaterialFactory
+
+
+# Counter keys only get parsed by the migration that fills the resource fields of existing counters
+parse_counter_key = import_module("surf.apps.materials.migrations.0002_sharedresourcecounter_resource") \
+    .parse_counter_key
+
+
+@patch.object(CounterBuffer, "start_flushing", MagicMock())
+class TestCounterBuffer(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.material = MaterialFactory.create(external_id="external:1", view_count=10, applaud_count=0)
+        SharedResourceCounter.objects.create(
+            counter_key="material__external:1__link__", counter_value=3, extra="link",
+            resource_type="material", resource_id="external:1", share_type="link"
+        )
+        self.counter_buffer = CounterBuffer(flush_interval=60)
+
+    def test_increase_counters(self):
+        for ix in range(3):
+            self.counter_buffer.increase_material_counter("external:1", "view_count")
+            self.counter_buffer.increase_share_counter("material", "external:1", "link")
+        self.counter_buffer.increase_material_counter("external:1", "star_4")
+        self.counter_buffer.increase_share_counter("material", "external:1", "email")
+        self.material.refresh_from_db()
+        self.assertEqual(self.material.view_count, 10, "Expected increments to not get written before a flush")
+        # Pending increments should be visible when merged
+        material = self.counter_buffer.merge_material(Material.objects.get(external_id="external:1"))
+        self.assertEqual(material.view_count, 13)
+        self.assertEqual(material.get_avg_star_rating(), 4)
+        counters_by_resource = self.counter_buffer.merge_share_counters(
+            SharedResourceCounter.objects.get_counters_by_resource("material", ["external:1"]),
+            "material"
+        )
+        counters = counters_by_resource["external:1"]
+        self.assertEqual({counter.extra: counter.counter_value for counter in counters}, {"link": 6, "email": 1})
+        # All increments should get written with two queries inside a savepoint
+        with self.assertNumQueries(4):
+            self.assertEqual(self.counter_buffer.flush(), 3)
+        self.material.refresh_from_db()
+        self.assertEqual(self.material.view_count, 13)
+        self.assertEqual(self.material.star_4, 2)
+        self.assertEqual(
+            dict(SharedResourceCounter.objects.values_list("share_type", "counter_value")),
+            {"link": 6, "email": 1}
+        )
+        self.assertEqual(self.counter_buffer.flush(), 0, "Expected no pending increments after a flush")
+
+    def test_increase_counters_without_interval(self):
+        with self.settings(COUNTER_BUFFER_FLUSH_INTERVAL=None):
+            counter_buffer = CounterBuffer()
+            counter_buffer.increase_material_counter("external:1", "applaud_count")
+        self.material.refresh_from_db()
+        self.assertEqual(self.material.applaud_count, 1, "Expected increments to get written immediately")
+
+
+class TestSharedResourceCounter(TestCase):
+
+    def test_parse_counter_key(self):
+        self.assertEqual(
+            parse_counter_key("material__edurep:1__2__link__", share_type="link"),
+            ("material", "edurep:1__2", "link",)
+        )
+        self.assertEqual(
+            parse_counter_key("collection__1__"),
+            ("collection", "1", None,)
+        )
+
+    def test_get_counters_by_resource(self):
+        for external_id in ["external:1", "external:10"]:
+            SharedResourceCounter.objects.create(
+                counter_key=SharedResourceCounter.create_counter_key("material", external_id, share_type="link"),
+                resource_type="material", resource_id=external_id, share_type="link"
+            )
+        with self.assertNumQueries(1):
+            counters_by_resource = SharedResourceCounter.objects.get_counters_by_resource(
+                "material",
+                ["external:1", "external:2"]
+            )
+        self.assertEqual(len(counters_by_resource["external:1"]), 1, "Expected only exact resource id matches")
+        self.assertEqual(counters_by_resource["external:2"], [])
@@ -0,0 +1,44 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from surf.apps.materials.utils import SearchQueryLog
+
+
+@patch.object(SearchQueryLog, "start_flushing", MagicMock())
+class TestSearchQueryLog(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = MagicMock()
+        self.client.indices.exists.return_value = False
+        search_client = MagicMock(client=self.client)
+        get_search_client_patch = patch("surf.apps.materials.utils.get_search_client", return_value=search_client)
+        get_search_client_patch.start()
+        self.addCleanup(get_search_client_patch.stop)
+
+    def test_log(self):
+        search_query_log = SearchQueryLog(buffer_size=2, batch_size=2)
+        for ix in range(3):
+            search_query_log.log(ix, f"query {ix}", [])
+        self.assertEqual(search_query_log.queue.qsize(), 2)
+        self.assertEqual(search_query_log.dropped, 1, "Expected queries to get dropped when the buffer is full")
+        self.assertEqual(self.client.index.call_count, 0, "Expected logging to not contact OpenSearch")
+        self.assertEqual(self.client.bulk.call_count, 0, "Expected logging to not contact OpenSearch")
+
+    def test_flush(self):
+        search_query_log = SearchQueryLog(buffer_size=10, batch_size=2)
+        for ix in range(3):
+            search_query_log.log(ix, f"query {ix}", [])
+        self.assertEqual(search_query_log.flush(), 3)
+        self.assertEqual(self.client.indices.create.call_count, 1)
+        self.assertEqual(self.client.bulk.call_count, 2, "Expected queries to get written in batches")
+        first_body = self.client.bulk.call_args_list[0].kwargs["body"]
+        self.assertEqual(first_body[0], {"index": {"_index": "search-results"}})
+        self.assertEqual(first_body[1]["query"], "query 0")
+        self.assertEqual(first_body[1]["number_of_results"], 0)
+        self.assertEqual(first_body[1]["filters"], [])
+        self.assertEqual(search_query_log.flush(), 0, "Expected empty buffer after flush")
+        search_query_log.log(1, "query", [])
+        search_query_log.flush()
+        self.assertEqual(self.client.indices.create.call_count, 1, "Expected index to get created only once")
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils.timezone import now
+
+from surf.apps.materials.models import Material
+from e2e_tests.helpers import patch_search_client
+from e2e_tests.factories import MaterialFactory
+
+
+class TestSyncMaterials(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.search_client = patch_search_client(
+            self,
+            "surf.apps.materials.management.commands.sync_materials.get_search_client"
+        )
+        for ix in range(5):
+            MaterialFactory.create(external_id=f"existing:{ix}")
+        MaterialFactory.create(external_id="missing:1")
+        MaterialFactory.create(external_id="existing:deleted", deleted_at=now() - timedelta(days=1))
+        MaterialFactory.create(external_id="missing:deleted", deleted_at=now() - timedelta(days=1))
+        MaterialFactory.create(external_id="missing:outdated", deleted_at=now() - timedelta(days=31))
+
+    def test_sync_materials(self):
+        call_command("sync_materials", batch_size=3)
+        self.assertEqual(self.search_client.get_materials_by_id.call_count, 3, "Expected one search per batch")
+        self.assertFalse(Material.objects.filter(external_id="missing:outdated").exists())
+        self.assertEqual(
+            set(Material.objects.filter(deleted_at__isnull=True).values_list("external_id", flat=True)),
+            {f"existing:{ix}" for ix in range(5)} | {"existing:deleted"}
+        )
+        self.assertEqual(
+            set(Material.objects.filter(deleted_at__isnull=False).values_list("external_id", flat=True)),
+            {"missing:1", "missing:deleted"}
+        )
@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from surf.apps.filters.metadata import MetadataTree
+from surf.apps.materials.utils import add_extra_parameters_to_materials
+from e2e_tests.factories import CommunityFactory, CollectionFactory, MaterialFactory
+from e2e_tests.helpers import get_metadata_tree_mock
+
+
+def get_search_material(external_id):
+    return {
+        "external_id": external_id,
+        "authors": [{"name": "Pythagoras"}],
+        "lom_educational_levels": [],
+        "studies": []
+    }
+
+
+@patch("surf.apps.filters.metadata.requests.get", new=get_metadata_tree_mock)
+@override_settings(PROJECT="edusources")
+class TestAddExtraParametersToMaterials(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ethics = CommunityFactory.create(name="Ethiek")
+        math = CommunityFactory.create(name="Wiskunde")
+        ethics_collection = CollectionFactory.create(communities=[ethics])
+        math_collection = CollectionFactory.create(communities=[math])
+        cls.external_ids = [f"external:{ix}" for ix in range(20)]
+        for ix, external_id in enumerate(cls.external_ids):
+            collections = [ethics_collection] if ix % 2 else [ethics_collection, math_collection]
+            MaterialFactory.create(external_id=external_id, collections=collections)
+
+    def setUp(self):
+        super().setUp()
+        self.metadata = MetadataTree("http://localhost:8888/", "token", warm_up_cache=True)
+
+    def test_add_extra_parameters_to_materials(self):
+        materials = [get_search_material(external_id) for external_id in self.external_ids[:2]]
+        materials.append(get_search_material("unknown:id"))
+        materials = add_extra_parameters_to_materials(self.metadata, materials)
+        even, odd, unknown = materials
+        self.assertEqual(even["view_count"], 104)
+        self.assertEqual(even["applaud_count"], 2)
+        self.assertEqual(even["avg_star_rating"], 4)
+        self.assertEqual(even["count_star_rating"], 1)
+        self.assertEqual(even["authors"], ["Pythagoras"])
+        self.assertEqual(len(even["communities"]), 2)
+        self.assertEqual(len(odd["communities"]), 1)
+        for community in even["communities"] + odd["communities"]:
+            self.assertEqual(set(community["title_translations"].keys()), {"nl", "en"})
+        self.assertEqual(unknown["view_count"], 0)
+        self.assertEqual(unknown["communities"], [])
+
+    def test_query_count(self):
+        for page_size in [1, 5, 20]:
+            materials = [get_search_material(external_id) for external_id in self.external_ids[:page_size]]
+            # Materials, communities and community details should each take one query
+            with self.assertNumQueries(3):
+                add_extra_parameters_to_materials(self.metadata, materials)
@@ -1,12 +1,48 @@
+import logging
 import datetime
+from queue import Queue, Empty, Full
+from time import sleep
+from threading import Lock
 from functools import reduce
+from collections import defaultdict
 
 from django.conf import settings
 from django.apps import apps
+from django.db.models import F
 
 from surf.apps.core.search import get_search_client
+from surf.apps.core.background import BackgroundFlusher
 from surf.apps.communities.models import Community
 from surf.apps.materials.models import Material
+from surf.apps.materials.counters import counter_buffer
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_communities_by_material(external_ids):
+    """
+    Fetches the communities for all materials at once.
+    Communities are found through the collections that hold the materials.
+
+    :param external_ids: the external ids of the materials
+    :return: dictionary with external ids as keys and a list of serialized communities as values
+    """
+    communities = Community.objects \
+        .filter(collections__materials__external_id__in=external_ids) \
+        .annotate(material_external_id=F("collections__materials__external_id")) \
+        .prefetch_related("community_details") \
+        .distinct()
+    communities_by_material = defaultdict(list)
+    for community in communities:
+        communities_by_material[community.material_external_id].append({
+            "id": community.id,
+            "title_translations": {
+                details.language_code.lower(): details.title
+                for details in community.community_details.all()
+            }
+        })
+    return communities_by_material
 
 
 def add_extra_parameters_to_materials(metadata, materials):
@@ -14,6 +50,7 @@ def add_extra_parameters_to_materials(metadata, materials):
     Add additional parameters for materials (bookmark, number of applauds,
     number of views)
     NB: this gets added to deleted materials as well, but as they were being found still that seems good
+    The amount of queries made is the same for any number of materials.
 
     :param metadata: the metadata tree to get some extra information from
     :param materials: array of materials
@@ -22,15 +59,20 @@ def add_extra_parameters_to_materials(metadata, materials):
     if settings.PROJECT != "edusources":
         return materials
 
+    external_ids = [m["external_id"] for m in materials]
     material_objects = {
         material.external_id: material
-        for material in Material.objects.filter(external_id__in=(m["external_id"] for m in materials))
+        for material in Material.objects.filter(external_id__in=external_ids)
     }
+    communities_by_material = get_communities_by_material(external_ids)
+    educational_level_translations = metadata.translations["lom_educational_levels"]
+    study_translations = metadata.translations["studies"]
 
     for m in materials:
         material_object = material_objects.get(m["external_id"], None)
 
         if material_object:
+            material_object = counter_buffer.merge_material(material_object)
             m["view_count"] = material_object.view_count
             m["applaud_count"] = material_object.applaud_count
             m["avg_star_rating"] = material_object.get_avg_star_rating()
@@ -38,27 +80,13 @@ def add_extra_parameters_to_materials(metadata, materials):
         else:
             m["view_count"] = m["applaud_count"] = m["avg_star_rating"] = m["count_star_rating"] = 0
 
-        educational_level_translations = metadata.translations["lom_educational_levels"]
         m["lom_educational_levels"] = [
             educational_level_translations[educational_level_id]
             for educational_level_id in m.get("lom_educational_levels", [])
         ]
 
-        communities = Community.objects.filter(
-            collections__materials__external_id=m["external_id"])
+        m["communities"] = communities_by_material.get(m["external_id"], [])
 
-        m["communities"] = [
-            {
-                "id": community.id,
-                "title_translations": {
-                    details.language_code.lower(): details.title
-                    for details in community.community_details.all()
-                }
-            }
-            for community in communities.prefetch_related("community_details").distinct().all()
-        ]
-
-        study_translations = metadata.translations["studies"]
         m["studies"] = [
             {
                 "id": study_id,
@@ -128,18 +156,94 @@ def create_search_results_index(client):
     client.indices.create('search-results', body=body)
 
 
+class SearchQueryLog(BackgroundFlusher):
+    """
+    Logs search queries to the search-results index without adding latency to searches.
+
+    Queries get added to an in-memory buffer and a background thread for the current process
+    writes them to OpenSearch in bulk. The index gets created once by that thread when it starts.
+    When the buffer is full, because OpenSearch is slow or unavailable, new queries get dropped.
+    """
+
+    index = "search-results"
+    thread_name = "search-query-log"
+
+    def __init__(self, buffer_size=None, flush_interval=None, batch_size=None):
+        super().__init__()
+        self.buffer_size = buffer_size or settings.SEARCH_QUERY_LOG_BUFFER_SIZE
+        self.flush_interval = flush_interval or settings.SEARCH_QUERY_LOG_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.SEARCH_QUERY_LOG_BATCH_SIZE
+        self.queue = Queue(maxsize=self.buffer_size)
+        self.dropped = 0
+        self._flush_lock = Lock()
+        self._is_bootstrapped = False
+
+    def log(self, number_of_results, query, filters):
+        self.start_flushing()
+        event = {
+            "timestamp": datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat(),
+            "number_of_results": number_of_results,
+            "query": query,
+            "filters": filters
+        }
+        try:
+            self.queue.put_nowait(event)
+        except Full:
+            self.dropped += 1
+
+    def bootstrap(self, client):
+        if not client.indices.exists(index=self.index):
+            create_search_results_index(client)
+        self._is_bootstrapped = True
+
+    def flush(self, events=None):
+        """
+        Writes given and buffered queries to OpenSearch in batches. Returns the number of written queries.
+        """
+        with self._flush_lock:
+            events = list(events or [])
+            while True:
+                try:
+                    events.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            if not events:
+                return 0
+            client = get_search_client().client
+            if not self._is_bootstrapped:
+                self.bootstrap(client)
+            for start in range(0, len(events), self.batch_size):
+                body = []
+                for event in events[start:start + self.batch_size]:
+                    event["filters"] = _get_translated_filters(event["filters"])
+                    body += [{"index": {"_index": self.index}}, event]
+                client.bulk(body=body)
+            if self.dropped:
+                logger.warning(f"Dropped {self.dropped} search queries, because the search query log buffer was full")
+                self.dropped = 0
+            return len(events)
+
+    def _flush_continuously(self):
+        while True:
+            # Waits for a first query, to prevent idle processes from connecting to OpenSearch
+            event = self.queue.get()
+            # Gives other queries some time to arrive, so they get written together
+            sleep(self.flush_interval)
+            try:
+                self.flush([event])
+            except Exception as exc:
+                logger.warning(f"Failed to write search queries to OpenSearch: {exc}")
+
+    def reset_after_fork(self):
+        self.queue = Queue(maxsize=self.buffer_size)
+        self._flush_lock = Lock()
+
+
+search_query_log = SearchQueryLog()
+
+
 def add_search_query_to_log(number_of_results, query, filters):
-    api_client = get_search_client()
-    if not api_client.client.indices.exists(index='search-results'):
-        create_search_results_index(api_client.client)
-
-    document = {
-        'timestamp': datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat(),
-        'number_of_results': number_of_results,
-        'query': query,
-        'filters': _get_translated_filters(filters)
-    }
-    api_client.client.index('search-results', body=document)
+    search_query_log.log(number_of_results, query, filters)
 
 
 def _get_translated_filters(filters):
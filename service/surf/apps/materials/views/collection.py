@@ -17,7 +17,6 @@ from surf.apps.materials.models import (
     Collection,
     Material,
     CollectionMaterial,
-    SharedResourceCounter,
     RESOURCE_TYPE_COLLECTION
 )
 from surf.apps.materials.serializers import (
@@ -26,7 +25,8 @@ from surf.apps.materials.serializers import (
     MaterialShortSerializer,
     CollectionMaterialPositionSerializer,
 )
-from surf.apps.materials.utils import add_extra_parameters_to_materials, get_material_details_by_id
+from surf.apps.materials.counters import counter_buffer
+from surf.apps.materials.utils import add_extra_parameters_to_materials
 from surf.apps.materials.filters import CollectionFilter
 
 
@@ -77,12 +77,7 @@ class CollectionViewSet(ModelViewSet):
         shared = request.GET.get("shared")
         if shared:
             # increase sharing counter
-            counter_key = SharedResourceCounter.create_counter_key(
-                RESOURCE_TYPE_COLLECTION,
-                str(instance.id),
-                share_type=shared)
-
-            SharedResourceCounter.increase_counter(counter_key, extra=shared)
+            counter_buffer.increase_share_counter(RESOURCE_TYPE_COLLECTION, str(instance.id), shared)
 
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -157,24 +152,47 @@ class CollectionViewSet(ModelViewSet):
         return Response(res)
 
     @staticmethod
-    def _add_materials(instance, materials):
+    def _add_materials(instance, materials, batch_size=100):
         """
         Add materials to collection
+        Materials get validated with one search per batch and all database changes are made in bulk.
+        Materials that can't be found or are already part of the collection get ignored.
         :param instance: collection instance
         :param materials: added materials
+        :param batch_size: the amount of materials to validate with a single search
         :return:
         """
 
-        for material in materials:
-            m_external_id = material["external_id"]
-            m_position = material["position"]
-
-            details = get_material_details_by_id(m_external_id)
-            if not details:
-                continue
-
-            m, _ = Material.objects.update_or_create(external_id=m_external_id)
-            CollectionMaterial.objects.create(collection=instance, material=m, position=m_position)
+        client = get_search_client()
+        external_ids = list(dict.fromkeys(material["external_id"] for material in materials))
+        found_ids = set()
+        for start in range(0, len(external_ids), batch_size):
+            batch = external_ids[start:start + batch_size]
+            response = client.get_materials_by_id(batch, page_size=len(batch))
+            found_ids.update(record["external_id"] for record in response.get("records", []))
+
+        material_objects = {
+            material.external_id: material
+            for material in Material.objects.filter(external_id__in=found_ids)
+        }
+        new_materials = [
+            Material(external_id=external_id)
+            for external_id in found_ids if external_id not in material_objects
+        ]
+        Material.objects.bulk_create(new_materials)
+        material_objects.update({material.external_id: material for material in new_materials})
+
+        CollectionMaterial.objects.bulk_create(
+            [
+                CollectionMaterial(
+                    collection=instance,
+                    material=material_objects[material["external_id"]],
+                    position=material["position"]
+                )
+                for material in materials if material["external_id"] in found_ids
+            ],
+            ignore_conflicts=True
+        )
 
     @staticmethod
     def _delete_materials(instance, materials):
@@ -1,8 +1,8 @@
-from django.db.models import F
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
 from surf.apps.materials.models import Material
+from surf.apps.materials.counters import counter_buffer
 
 
 class MaterialRatingAPIView(APIView):
@@ -12,18 +12,9 @@ class MaterialRatingAPIView(APIView):
         external_id = params['external_id']
         star_rating = params['star_rating']
         material_object = Material.objects.get(external_id=external_id, deleted_at=None)
-        if star_rating == 1:
-            material_object.star_1 = F('star_1') + 1
-        if star_rating == 2:
-            material_object.star_2 = F('star_2') + 1
-        if star_rating == 3:
-            material_object.star_3 = F('star_3') + 1
-        if star_rating == 4:
-            material_object.star_4 = F('star_4') + 1
-        if star_rating == 5:
-            material_object.star_5 = F('star_5') + 1
-        material_object.save()
-        material_object.refresh_from_db()
+        if star_rating in [1, 2, 3, 4, 5]:
+            counter_buffer.increase_material_counter(external_id, f"star_{star_rating}")
+        material_object = counter_buffer.merge_material(material_object)
         return Response(material_object.get_avg_star_rating())
 
 
@@ -33,7 +24,6 @@ class MaterialApplaudAPIView(APIView):
         params = request.data.get('params')
         external_id = params['external_id']
         material_object = Material.objects.get(external_id=external_id, deleted_at=None)
-        material_object.applaud_count = F('applaud_count') + 1
-        material_object.save()
-        material_object.refresh_from_db()
+        counter_buffer.increase_material_counter(external_id, "applaud_count")
+        material_object = counter_buffer.merge_material(material_object)
         return Response(material_object.applaud_count)
@@ -2,7 +2,7 @@ import logging
 
 from django.conf import settings
 from django.apps import apps
-from django.db.models import F, QuerySet
+from django.db.models import QuerySet
 from django.shortcuts import Http404
 
 from rest_framework.response import Response
@@ -11,6 +11,7 @@ from rest_framework.generics import CreateAPIView, ListAPIView
 from rest_framework.permissions import AllowAny
 
 from surf.apps.core.search import get_search_client
+from surf.apps.core.cache import search_with_cache
 from surf.apps.core.schema import SearchSchema
 from surf.apps.filters.serializers import MpttFilterItemSerializer
 from surf.apps.materials.models import Material, SharedResourceCounter, RESOURCE_TYPE_MATERIAL
@@ -21,6 +22,7 @@ from surf.apps.materials.serializers import (
     MaterialShortSerializer,
     SharedResourceCounterSerializer
 )
+from surf.apps.materials.counters import counter_buffer
 from surf.apps.materials.utils import (
     add_extra_parameters_to_materials,
     get_material_details_by_id,
@@ -87,7 +89,7 @@ class MaterialSearchAPIView(CreateAPIView):
 
         client = get_search_client()
 
-        res = client.search(**data)
+        res = search_with_cache(client, **data)
         records = res["records"]
         records = add_extra_parameters_to_materials(filters_app.metadata, records)
 
@@ -171,7 +173,8 @@ class MaterialAPIView(APIView):
         else:
             # return overview of newest Materials
             client = get_search_client()
-            res = client.search(
+            res = search_with_cache(
+                client,
                 search_text='',
                 ordering="-publisher_date",
                 page_size=_MATERIALS_COUNT_IN_OVERVIEW,
@@ -213,17 +216,11 @@ def _get_material_by_external_id(request, external_id, shared=None, count_view=F
         material.sync_info()
     # increase unique view counter
     if count_view:
-        material.view_count = F('view_count') + 1
-        material.save()
+        counter_buffer.increase_material_counter(external_id, "view_count")
 
     if shared:
         # increase share counter
-        counter_key = SharedResourceCounter.create_counter_key(
-            RESOURCE_TYPE_MATERIAL,
-            external_id,
-            share_type=shared)
-
-        SharedResourceCounter.increase_counter(counter_key, extra=shared)
+        counter_buffer.increase_share_counter(RESOURCE_TYPE_MATERIAL, external_id, shared)
 
     rv = get_material_details_by_id(external_id)
     rv = add_extra_parameters_to_materials(filters_app.metadata, rv)
@@ -234,13 +231,18 @@ def _get_material_by_external_id(request, external_id, shared=None, count_view=F
 def _add_share_counters_to_materials(materials):
     """
     Add share counter values for materials.
+    The amount of queries made is the same for any number of materials.
     :param materials: array of materials
     :return: updated array of materials
     """
+    counters_by_material = SharedResourceCounter.objects.get_counters_by_resource(
+        RESOURCE_TYPE_MATERIAL,
+        [m["external_id"] for m in materials]
+    )
+    counters_by_material = counter_buffer.merge_share_counters(counters_by_material, RESOURCE_TYPE_MATERIAL)
     for m in materials:
-        key = SharedResourceCounter.create_counter_key(RESOURCE_TYPE_MATERIAL, m["external_id"])
-        qs = SharedResourceCounter.objects.filter(counter_key__contains=key)
-        m["sharing_counters"] = SharedResourceCounterSerializer(many=True).to_representation(qs.all())
+        counters = counters_by_material[m["external_id"]]
+        m["sharing_counters"] = SharedResourceCounterSerializer(many=True).to_representation(counters)
     return materials
 
 
@@ -9,6 +9,7 @@ from django.views.decorators.clickjacking import xframe_options_exempt
 from rest_framework.exceptions import ValidationError
 
 from surf.apps.core.search import get_search_client
+from surf.apps.core.cache import search_with_cache
 from surf.apps.materials.serializers import SearchSerializer
 from surf.apps.materials.utils import add_extra_parameters_to_materials
 
@@ -38,7 +39,7 @@ def widget_iframe_content(request):
     ]
     data["drilldown_names"] = filters_app.metadata.get_filter_field_names()
     client = get_search_client()
-    res = client.search(**data)
+    res = search_with_cache(client, **data)
     records = res["records"]
     for record in records:
         if not record["published_at"]:
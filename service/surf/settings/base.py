@@ -300,6 +300,31 @@ OPENSEARCH_VERIFY_CERTS = environment.opensearch.verify_certs  # ignored when pr
 OPENSEARCH_PASSWORD = environment.secrets.opensearch.password
 
 
+# Search response cache
+# Responses get stored in a Redis database that is shared between the search service and the harvester.
+# This allows the harvester to invalidate responses whenever indices change.
+# Locally nothing gets cached to prevent stale results while (test) indices get recreated.
+
+SEARCH_CACHE_REDIS_URL = f"redis://{environment.redis.host}/1" if MODE != "localhost" else None
+SEARCH_CACHE_TIMEOUT = 60 * 60
+
+
+# Search query log
+# Search queries get buffered in memory and written to OpenSearch in bulk by a background thread.
+# Queries get dropped when the buffer is full, to never slow down searches when OpenSearch is unavailable.
+
+SEARCH_QUERY_LOG_FLUSH_INTERVAL = 5  # in seconds
+SEARCH_QUERY_LOG_BUFFER_SIZE = 1000
+SEARCH_QUERY_LOG_BATCH_SIZE = 200
+
+
+# Counters
+# Views, applauds, star ratings and shares get counted in memory and written to the database with this interval.
+# During tests counters get written immediately.
+
+COUNTER_BUFFER_FLUSH_INTERVAL = 5 if sys.argv[1:2] != ['test'] else None  # in seconds
+
+
 # Logging
 # https://docs.djangoproject.com/en/2.2/topics/logging/
 # https://docs.sentry.io/
@@ -481,6 +506,9 @@ EDUTERM_API_KEY = None
 DEEPL_API_KEY = None
 HARVESTER_API = environment.django.harvester_api
 HARVESTER_API_KEY = environment.secrets.harvester.api_key
+# The metadata tree from the harvester gets refreshed in the background with this interval (in seconds)
+# During tests the tree is loaded on demand only
+METADATA_TREE_REFRESH_INTERVAL = 5 * 60 if sys.argv[1:2] != ['test'] else None
 
 
 # Site overrides